@@ -4,14 +4,22 @@ from flask_cors import CORS  # Enable cross-origin requests
 from datetime import datetime  # For timestamping
 import uuid  # For unique IDs
 import functools  # For decorators
+import os  # For the data directory setting
+from item_store import ItemStore  # Indexed, persistent item storage
 
 # Programming Lab 4: Flask Project Setup
 app = Flask(__name__)
 CORS(app)
 
-# In-memory data store (temporary, will use DB in Lab 5)
+# In-memory data store: users stay a plain dict, items live in an indexed store
+# persisted to an append-only log + snapshots under LAB4_DATA_DIR
 users = {}
-items = [
+items = ItemStore(
+    os.environ.get('LAB4_DATA_DIR', os.path.join(os.path.dirname(os.path.abspath(__file__)), 'lab4_data')),
+    snapshot_every=int(os.environ.get('LAB4_SNAPSHOT_EVERY', 1000)),
+    fsync=os.environ.get('LAB4_FSYNC', '0') == '1'
+)
+sample_items = [
     {
         'id': str(uuid.uuid4()),
         'title': 'Black Umbrella',
@@ -33,6 +41,9 @@ items = [
         'created_at': datetime.now().isoformat()
     }
 ]
+if not len(items):
+    for sample in sample_items:
+        items.put(sample)
 
 # Programming Lab 4: Improve python code to handle errors and format API responses
 def handle_errors(f):
@@ -115,9 +126,7 @@ def logout():
 def get_items():
     item_type = request.args.get('type')
     search_term = request.args.get('search', '').lower()
-    filtered_items = items
-    if item_type in ['lost', 'found']:
-        filtered_items = [item for item in filtered_items if item['type'] == item_type]
+    filtered_items = items.list(item_type if item_type in ['lost', 'found'] else None)
     if search_term:
         filtered_items = [item for item in filtered_items if search_term in item['title'].lower() or search_term in item['location'].lower() or search_term in item['description'].lower()]
     return format_response(filtered_items, f'{len(filtered_items)} items retrieved')
@@ -125,7 +134,7 @@ def get_items():
 @app.route('/api/items/<item_id>', methods=['GET'])
 @handle_errors
 def get_item(item_id):
-    item = next((item for item in items if item['id'] == item_id), None)
+    item = items.get(item_id)
     if not item:
         return jsonify({'error': 'Item not found'}), 404
     return format_response(item, 'Item retrieved')
@@ -147,7 +156,7 @@ def create_item():
         'date': data.get('date', datetime.now().strftime('%B %d')),
         'created_at': datetime.now().isoformat()
     }
-    items.append(new_item)
+    new_item = items.put(new_item)
     return format_response(new_item, 'Item created', 201)
 
 @app.route('/api/items/<item_id>', methods=['PUT'])
@@ -156,28 +165,29 @@ def update_item(item_id):
     data = request.get_json()
     if not data:
         return jsonify({'error': 'Request body required'}), 400
-    index = next((i for i, item in enumerate(items) if item['id'] == item_id), None)
-    if index is None:
+    item = items.get(item_id)
+    if item is None:
         return jsonify({'error': 'Item not found'}), 404
     validate_item_data(data)
-    items[index].update({
+    updated = items.update(item_id, {
         'title': data['title'].strip(),
         'location': data['location'].strip(),
         'type': data['type'],
         'description': data['description'].strip(),
         'email': data['email'].strip(),
-        'date': data.get('date', items[index]['date']),
+        'date': data.get('date', item['date']),
         'updated_at': datetime.now().isoformat()
     })
-    return format_response(items[index], 'Item updated')
+    if updated is None:
+        return jsonify({'error': 'Item not found'}), 404
+    return format_response(updated, 'Item updated')
 
 @app.route('/api/items/<item_id>', methods=['DELETE'])
 @handle_errors
 def delete_item(item_id):
-    index = next((i for i, item in enumerate(items) if item['id'] == item_id), None)
-    if index is None:
+    deleted = items.delete(item_id)
+    if deleted is None:
         return jsonify({'error': 'Item not found'}), 404
-    deleted = items.pop(index)
     return format_response({'deleted_item': deleted}, 'Item deleted')
 
 @app.route('/api/stats', methods=['GET'])
@@ -185,8 +195,8 @@ def delete_item(item_id):
 def get_stats():
     stats = {
         'total_items': len(items),
-        'lost_items': len([i for i in items if i['type'] == 'lost']),
-        'found_items': len([i for i in items if i['type'] == 'found']),
+        'lost_items': items.count('lost'),
+        'found_items': items.count('found'),
         'total_users': len(users),
         'last_updated': datetime.now().isoformat()
     }
@@ -221,4 +231,4 @@ if __name__ == '__main__':
     print("PUT    /api/items/<id>")
     print("DELETE /api/items/<id>")
     print("GET    /api/stats")
-    app.run(debug=True, host='127.0.0.1', port=5000)
\ No newline at end of file
+    app.run(debug=True, host='127.0.0.1', port=5000, threaded=True)
\ No newline at end of file
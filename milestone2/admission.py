@@ -0,0 +1,268 @@
+# Admission control: per-client rate limits and a concurrency cap, checked before a request touches the database
+# Each route class (search, writes, login) has a token bucket per client: rate tokens per second, up to
+# burst. A client out of tokens gets 429 with Retry-After set to when its next token arrives. Every admitted
+# request also takes one of max_concurrent slots (by default the connection pool's size plus overflow); when
+# none frees up within the queue timeout the request gets 503 instead of queueing on the pool for
+# DB_POOL_TIMEOUT seconds. The async routes in asgi.py hold no thread while they wait, so they queue on their
+# own, larger async_max_concurrent slots instead, for up to the same timeout without blocking the event loop.
+# Login is limited per IP and per username, everything else per IP.
+# Buckets live in this process, or with ADMISSION_STORE=shared in an anonymous shared mapping that gunicorn
+# --preload workers inherit, so a client gets one budget however its requests are spread over the workers.
+# The slot count and the admitted/shed counters are per process.
+import asyncio
+import hashlib
+import math
+import mmap
+import multiprocessing
+import struct
+import threading
+import time
+from collections import OrderedDict
+from flask import g, request, jsonify
+
+ROUTE_CLASSES = ('search', 'writes', 'login')
+WRITE_METHODS = ('POST', 'PUT', 'PATCH', 'DELETE')
+# Monitoring routes, and the change feed (a stream holds no connection but would hold a slot for hours)
+EXEMPT_PATHS = frozenset({
+    '/', '/api/items/stream', '/api/admission', '/api/metrics', '/api/cache', '/api/pool', '/api/replicas',
+    '/api/events', '/api/group-commit', '/api/jobs'
+})
+
+def route_class(method, path, args):
+    """The budget a request is charged to, or None for reads that only count against the concurrency cap."""
+    if method == 'POST' and path == '/api/login':
+        return 'login'
+    if method in WRITE_METHODS:
+        return 'writes'
+    if path == '/api/search' or (path == '/api/items' and args.get('search')):
+        return 'search'
+    return None
+
+def client_ip(remote_addr, forwarded_for, trusted_proxies):
+    """The client address; behind trusted_proxies proxies, the one the outermost of them saw."""
+    if trusted_proxies and forwarded_for:
+        hops = [hop.strip() for hop in forwarded_for.split(',') if hop.strip()]
+        if hops:
+            return hops[max(0, len(hops) - trusted_proxies)]
+    return remote_addr or 'unknown'
+
+def take_token(tokens, updated, rate, burst, now):
+    """(tokens left, seconds to wait) for one request against a bucket last seen at updated; 0 wait means admitted."""
+    tokens = min(burst, tokens + (now - updated) * rate)
+    if tokens >= 1:
+        return tokens - 1, 0.0
+    return tokens, (1 - tokens) / rate
+
+class MemoryBucketStore:
+    """Buckets in a dict, least recently seen dropped past max_keys (a dropped client comes back with a full bucket)."""
+    name = 'memory'
+
+    def __init__(self, max_keys=100000):
+        self.max_keys = max_keys
+        self._buckets = OrderedDict()  # key -> (tokens, updated)
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._buckets)
+
+    def take(self, key, rate, burst, now):
+        with self._lock:
+            tokens, updated = self._buckets.pop(key, (burst, now))
+            tokens, wait = take_token(tokens, updated, rate, burst, now)
+            self._buckets[key] = (tokens, now)
+            if len(self._buckets) > self.max_keys:
+                self._buckets.popitem(last=False)
+        return wait
+
+class SharedBucketStore:
+    """Buckets in fixed slots of an anonymous shared mapping, shared with processes forked after it was made.
+
+    A key hashes to a slot and probes a few after it; when all are taken the least recently seen is reused.
+    """
+    name = 'shared'
+    SLOT = struct.Struct('<Qdd')  # key hash (0 = empty), tokens, updated (monotonic, same clock in every process)
+    PROBES = 4
+
+    def __init__(self, slots=65536):
+        self.slots = slots
+        self._map = mmap.mmap(-1, slots * self.SLOT.size)  # MAP_SHARED, so forked workers see each other's writes
+        self._lock = multiprocessing.Lock()
+
+    def __len__(self):
+        return sum(1 for key_hash, _, _ in self.SLOT.iter_unpack(self._map) if key_hash)
+
+    def take(self, key, rate, burst, now):
+        key_hash = int.from_bytes(hashlib.blake2b(key.encode(), digest_size=8).digest(), 'little') | 1
+        first = key_hash % self.slots
+        # A worker killed inside this section would leave the lock held; admit rather than wait on it
+        if not self._lock.acquire(timeout=0.05):
+            return 0.0
+        try:
+            victim = None
+            for probe in range(self.PROBES):
+                offset = (first + probe) % self.slots * self.SLOT.size
+                slot_hash, tokens, updated = self.SLOT.unpack_from(self._map, offset)
+                if slot_hash == key_hash:
+                    break
+                if victim is None or slot_hash == 0 or updated < victim[1]:
+                    victim = (offset, updated if slot_hash else -math.inf)
+            else:
+                offset, tokens, updated = victim[0], burst, now
+            tokens, wait = take_token(tokens, updated, rate, burst, now)
+            self.SLOT.pack_into(self._map, offset, key_hash, tokens, now)
+        finally:
+            self._lock.release()
+        return wait
+
+class Admission:
+    def __init__(self, budgets, store, max_concurrent=0, queue_timeout=0.0, retry_after=1, trusted_proxies=0,
+                 async_max_concurrent=0):
+        self.budgets = budgets  # route class -> (tokens per second, burst); a rate of 0 means no limit
+        self.store = store
+        self.max_concurrent = max_concurrent  # 0 means no cap
+        self.async_max_concurrent = async_max_concurrent  # same, for admit_async()
+        self.queue_timeout = queue_timeout
+        self.retry_after = retry_after  # seconds, sent with a 503
+        self.trusted_proxies = trusted_proxies
+        self._slots = threading.BoundedSemaphore(max_concurrent) if max_concurrent else None
+        self._async_slots = asyncio.BoundedSemaphore(async_max_concurrent) if async_max_concurrent else None
+        self._lock = threading.Lock()
+        self.in_flight = 0
+        self.peak_in_flight = 0
+        self.counts = {name: {"admitted": 0, "limited": 0, "busy": 0} for name in (*ROUTE_CLASSES, 'other')}
+
+    def _count(self, name, outcome):
+        with self._lock:
+            self.counts[name or 'other'][outcome] += 1
+
+    def _limit(self, name, keys):
+        rate, burst = self.budgets.get(name, (0, 0))
+        if rate:
+            now = time.monotonic()
+            wait = max(self.store.take(f"{name}:{key}", rate, burst, now) for key in keys)
+            if wait:
+                self._count(name, 'limited')
+                return 429, max(1, math.ceil(wait))
+        return None
+
+    def _enter(self, name):
+        with self._lock:
+            self.counts[name or 'other']["admitted"] += 1
+            self.in_flight += 1
+            self.peak_in_flight = max(self.peak_in_flight, self.in_flight)
+
+    def _leave(self):
+        with self._lock:
+            self.in_flight -= 1
+
+    def admit(self, name, keys):
+        """None when the request may go ahead, and must call release() when done; else (status, retry_after)."""
+        rejection = self._limit(name, keys)
+        if rejection is not None:
+            return rejection
+        if self._slots is not None and not self._slots.acquire(timeout=self.queue_timeout):
+            self._count(name, 'busy')
+            return 503, self.retry_after
+        self._enter(name)
+        return None
+
+    def release(self):
+        self._leave()
+        if self._slots is not None:
+            self._slots.release()
+
+    async def admit_async(self, name, keys):
+        """admit() for coroutines, on the async slots; must call release_async() when done."""
+        rejection = self._limit(name, keys)
+        if rejection is not None:
+            return rejection
+        if self._async_slots is not None:
+            try:
+                await asyncio.wait_for(self._async_slots.acquire(), self.queue_timeout)
+            except asyncio.TimeoutError:
+                self._count(name, 'busy')
+                return 503, self.retry_after
+        self._enter(name)
+        return None
+
+    def release_async(self):
+        self._leave()
+        if self._async_slots is not None:
+            self._async_slots.release()
+
+    def stats(self):
+        with self._lock:
+            counts = {name: dict(outcomes) for name, outcomes in self.counts.items()}
+            in_flight, peak = self.in_flight, self.peak_in_flight
+        return {
+            "store": self.store.name,
+            "tracked_buckets": len(self.store),
+            "max_concurrent": self.max_concurrent,
+            "async_max_concurrent": self.async_max_concurrent,
+            "in_flight": in_flight,
+            "peak_in_flight": peak,
+            "budgets": {name: {"rate_per_second": rate, "burst": burst} for name, (rate, burst) in self.budgets.items()},
+            "shed": sum(outcomes["limited"] + outcomes["busy"] for outcomes in counts.values()),
+            "classes": counts
+        }
+
+def client_keys(name, ip, username=None):
+    keys = [f"ip:{ip}"]
+    if name == 'login' and username:
+        keys.append(f"user:{username.strip().lower()}")
+    return keys
+
+def rejection_payload(status, retry_after):
+    error = "Too many requests" if status == 429 else "Server busy"
+    return {"error": error, "retry_after": retry_after}
+
+def install_admission(app, admission):
+    """Check every non-exempt request before its view runs, and give its slot back when it ends."""
+
+    @app.before_request
+    def admit_request():
+        if request.method == 'OPTIONS' or request.path in EXEMPT_PATHS:
+            return None
+        name = route_class(request.method, request.path, request.args)
+        ip = client_ip(request.remote_addr, request.headers.get('X-Forwarded-For'), admission.trusted_proxies)
+        username = None
+        if name == 'login':
+            username = (request.get_json(silent=True) or {}).get('username')
+            username = username if isinstance(username, str) else None
+        rejection = admission.admit(name, client_keys(name, ip, username))
+        if rejection is not None:
+            status, retry_after = rejection
+            return jsonify(rejection_payload(status, retry_after)), status, {'Retry-After': str(retry_after)}
+        g.admitted = True
+        return None
+
+    # Runs after a streamed body (exports) is done, since those views keep the request context
+    @app.teardown_request
+    def release_request(exception):
+        if g.pop('admitted', False):
+            admission.release()
+
+def admission_from_config(config):
+    name = config['ADMISSION_STORE']
+    if name == 'shared':
+        store = SharedBucketStore(config['ADMISSION_MAX_CLIENTS'])
+    elif name == 'memory':
+        store = MemoryBucketStore(config['ADMISSION_MAX_CLIENTS'])
+    else:
+        raise ValueError(f"Unknown ADMISSION_STORE {name!r} (expected memory or shared)")
+    max_concurrent = config['ADMISSION_MAX_CONCURRENT']
+    if max_concurrent is None:
+        max_concurrent = config['DB_POOL_SIZE'] + config['DB_MAX_OVERFLOW']
+    return Admission(
+        {
+            'search': (config['ADMISSION_SEARCH_RATE'], config['ADMISSION_SEARCH_BURST']),
+            'writes': (config['ADMISSION_WRITE_RATE'], config['ADMISSION_WRITE_BURST']),
+            'login': (config['ADMISSION_LOGIN_RATE'], config['ADMISSION_LOGIN_BURST'])
+        },
+        store,
+        max_concurrent=max_concurrent,
+        queue_timeout=config['ADMISSION_QUEUE_TIMEOUT_MS'] / 1000,
+        retry_after=config['ADMISSION_RETRY_AFTER'],
+        trusted_proxies=config['ADMISSION_TRUSTED_PROXIES'],
+        async_max_concurrent=config['ADMISSION_ASYNC_MAX_CONCURRENT']
+    )
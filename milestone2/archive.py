@@ -0,0 +1,56 @@
+# Hot/cold split of the items table
+# Resolved items and anything past the age limit move from items to items_archive in small batches, so the
+# hot table (and its indexes, search index, stats counters and match index) only holds what listings show.
+# Reads leave the archive alone unless they pass ?include_archived=true.
+import time
+from datetime import datetime, timedelta
+from sqlalchemy import select, insert, delete, func, literal, or_, and_, DateTime
+
+def include_archived(args):
+    return args.get('include_archived', '').lower() in ('1', 'true', 'yes')
+
+def archive_condition(Item, now, resolved_after_days, after_days):
+    """Rows due for the archive: resolved and resolved_after_days old, or after_days old whatever the status."""
+    # items is AUTOINCREMENT on SQLite (a sequence on PostgreSQL), so a moved row's id is never handed out again
+    return or_(
+        and_(Item.status == 'resolved', Item.created_at < now - timedelta(days=resolved_after_days)),
+        Item.created_at < now - timedelta(days=after_days)
+    )
+
+def archive_batch(engine, Item, ArchivedItem, condition, batch_size, now):
+    """Move up to batch_size due rows in one transaction; returns their ids."""
+    hot, cold = Item.__table__, ArchivedItem.__table__
+    names = [column.name for column in cold.columns if column.name not in ('archived_at', 'updated_at')]
+    with engine.begin() as conn:
+        # SKIP LOCKED lets several movers (or a mover and a row being edited) run without waiting on each other
+        ids = conn.execute(
+            select(hot.c.id).where(condition).limit(batch_size).with_for_update(skip_locked=True)
+        ).scalars().all()
+        if not ids:
+            return []
+        # updated_at is the batch's own commit time, so an export pulled between two batches misses neither
+        conn.execute(insert(cold).from_select(
+            names + ['archived_at', 'updated_at'],
+            select(*[hot.c[name] for name in names], literal(now, DateTime), literal(datetime.utcnow(), DateTime))
+            .where(hot.c.id.in_(ids))
+        ))
+        conn.execute(delete(hot).where(hot.c.id.in_(ids)))
+    return ids
+
+def archive_items(engine, Item, ArchivedItem, resolved_after_days, after_days, batch_size=500, pause_ms=50):
+    """Move every due row, one short transaction per batch with a pause in between; yields each batch's ids."""
+    now = datetime.utcnow()
+    condition = archive_condition(Item, now, resolved_after_days, after_days)
+    while True:
+        ids = archive_batch(engine, Item, ArchivedItem, condition, batch_size, now)
+        if ids:
+            yield ids
+        if len(ids) < batch_size:
+            return
+        time.sleep(pause_ms / 1000)
+
+def archived_counts(conn, ArchivedItem):
+    """{(type, status): count} for the archive, in the same shape as stats.counts_from()."""
+    status = func.coalesce(ArchivedItem.status, 'active')
+    rows = conn.execute(select(ArchivedItem.type, status, func.count()).group_by(ArchivedItem.type, status))
+    return {(row[0], row[1]): row[2] for row in rows}
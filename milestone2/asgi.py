@@ -0,0 +1,326 @@
+# ASGI entry point for high-concurrency read traffic
+# Usage (from milestone2/): uvicorn asgi:app --workers 4 --host 0.0.0.0 --port 5001
+# pip install starlette uvicorn a2wsgi asyncpg aiosqlite
+#
+# The hot read routes (item list, item detail, search, stats) run as coroutines on an async SQLAlchemy
+# engine, so one process can hold thousands of requests waiting on the database instead of one per
+# thread. They return the same bodies as the Flask views, share the response cache that the Flask write
+# routes invalidate and are checked by the same admission control (rate limits, concurrency cap) first.
+# /api/items/stream (SSE) is a coroutine per subscriber on the same loop, and
+# /api/autocomplete is answered from the in-memory prefix index without leaving the loop.
+# Every other route is the Flask app itself, run on a thread pool.
+import functools
+import importlib.util
+import logging
+import os
+import sys
+import time
+from contextlib import asynccontextmanager
+from contextvars import ContextVar
+
+from a2wsgi import WSGIMiddleware
+from sqlalchemy import event, select
+from sqlalchemy.ext.asyncio import create_async_engine
+from sqlalchemy.pool import NullPool
+from starlette.applications import Starlette
+from starlette.responses import Response, StreamingResponse
+from starlette.routing import Route, Mount
+
+APP_DIR = os.path.dirname(os.path.abspath(__file__))
+if APP_DIR not in sys.path:
+    sys.path.insert(0, APP_DIR)
+
+from admission import route_class, client_ip, client_keys, rejection_payload
+from archive import include_archived
+from cache import make_key
+from dates import filter_dates
+from events import async_stream, last_event_id
+from pagination import parse_limit, page_query, page_result
+from pooling import is_statement_timeout
+from replicas import sticky
+from search import apply_search, search_terms
+from stats import counts_from, summarize
+
+# 'Lab 5 app.py' is not importable by name because of the spaces
+_spec = importlib.util.spec_from_file_location('lab5_app', os.path.join(APP_DIR, 'Lab 5 app.py'))
+lab5_app = importlib.util.module_from_spec(_spec)
+_spec.loader.exec_module(lab5_app)
+
+Item = lab5_app.Item
+metrics = lab5_app.metrics
+response_cache = lab5_app.response_cache
+flask_app = lab5_app.create_app()
+logger = logging.getLogger('asgi')
+
+ASYNC_DRIVERS = {'postgresql': 'postgresql+asyncpg', 'sqlite': 'sqlite+aiosqlite'}
+
+def create_engine_for(app, bind_key=None):
+    """Async engine on the same database as the Flask app (or one of its replica binds), with the same pool settings."""
+    with app.app_context():
+        # Flask-SQLAlchemy resolves relative SQLite paths against the instance folder
+        url = lab5_app.db.engines[bind_key].url
+    url = url.set(drivername=ASYNC_DRIVERS.get(url.get_backend_name(), url.drivername))
+    config = app.config
+    if url.get_backend_name() == 'sqlite':
+        return create_async_engine(url)
+    if config['DB_PGBOUNCER']:
+        # Transaction pooling can't keep asyncpg's per-connection prepared statements
+        return create_async_engine(url, poolclass=NullPool, connect_args={'statement_cache_size': 0})
+    return create_async_engine(
+        url,
+        pool_size=config['DB_POOL_SIZE'],
+        max_overflow=config['DB_MAX_OVERFLOW'],
+        pool_timeout=config['DB_POOL_TIMEOUT'],
+        pool_recycle=config['DB_POOL_RECYCLE'],
+        pool_pre_ping=config['DB_POOL_PRE_PING']
+    )
+
+engine = create_engine_for(flask_app)
+# Replicas picked by the Flask app's router, so health checks and round-robin are shared with the WSGI routes
+router = flask_app.extensions.get('replicas')
+# Same budgets as the Flask routes, which the mounted app still checks for itself; the async routes have their
+# own concurrency cap (ADMISSION_ASYNC_MAX_CONCURRENT), since a waiting coroutine holds no thread
+admission = flask_app.extensions.get('admission')
+replica_engines = {key: create_engine_for(flask_app, key) for key in (router.engines if router else ())}
+
+# Per-request [statement count, SQL seconds, serialization seconds] for /api/metrics and Server-Timing
+request_timings = ContextVar('request_timings', default=None)
+# Replica bind key for the current request, None for the primary
+read_bind = ContextVar('read_bind', default=None)
+
+def _count_statement(conn, cursor, statement, parameters, context, executemany):
+    timings = request_timings.get()
+    started = getattr(context, '_metrics_started', None)  # set by the metrics module's engine listener
+    if timings is not None and started is not None:
+        timings[0] += 1
+        timings[1] += time.perf_counter() - started
+
+all_engines = [engine, *replica_engines.values()]
+for async_engine in all_engines:
+    event.listen(async_engine.sync_engine, 'after_cursor_execute', _count_statement)
+
+@asynccontextmanager
+async def connection(timeout_key='DB_STATEMENT_TIMEOUT_MS'):
+    async with replica_engines.get(read_bind.get(), engine).begin() as conn:
+        timeout = flask_app.config[timeout_key]
+        if timeout and conn.dialect.name == 'postgresql':
+            await conn.exec_driver_sql(f"SET LOCAL statement_timeout = {int(timeout)}")
+        yield conn
+
+def json_response(payload, status=200):
+    # Same encoder, compact separators and trailing newline as Flask's jsonify()
+    started = time.perf_counter()
+    body = flask_app.json.dumps(payload, separators=(',', ':')) + '\n'
+    timings = request_timings.get()
+    if timings is not None:
+        timings[2] += time.perf_counter() - started
+    return Response(body, status_code=status, media_type='application/json')
+
+async def admission_rejection(request):
+    """The 429/503 response when admission control turns the request away; otherwise it now holds a slot."""
+    if admission is None:
+        return None
+    name = route_class(request.method, request.url.path, request.query_params)
+    remote_addr = request.client.host if request.client else None
+    ip = client_ip(remote_addr, request.headers.get('x-forwarded-for'), admission.trusted_proxies)
+    rejection = await admission.admit_async(name, client_keys(name, ip))
+    if rejection is None:
+        return None
+    status, retry_after = rejection
+    response = json_response(rejection_payload(status, retry_after), status)
+    response.headers['Retry-After'] = str(retry_after)
+    return response
+
+def database_error(request, route, e):
+    logger.exception("Unhandled error in %s %s", request.method, request.url.path)
+    metrics.record_error(request.method, route, e)
+    if is_statement_timeout(e):
+        return json_response({"error": "Query timed out"}, 503)
+    return json_response({"error": "Database error occurred"}, 500)
+
+def endpoint(route, tags):
+    """Metrics under the Flask route label, plus the shared response cache for 200s."""
+    def decorator(handler):
+        @functools.wraps(handler)
+        async def wrapper(request):
+            if include_archived(request.query_params):
+                # Archive reads are rare and cold; the Flask views merge in items_archive
+                return wsgi_app
+            started = time.perf_counter()
+            rejection = await admission_rejection(request)
+            if rejection is not None:
+                metrics.record(request.method, route, rejection.status_code,
+                               time.perf_counter() - started, 0, 0.0, 0.0, len(rejection.body))
+                return rejection
+            try:
+                return await serve(request, started)
+            finally:
+                if admission is not None:
+                    admission.release_async()
+
+        async def serve(request, started):
+            timings = [0, 0.0, 0.0]
+            request_timings.set(timings)
+            # Recent writers read from the primary and skip the cache, as in the Flask views
+            recent_writer = sticky(request.cookies)
+            read_bind.set(router.choose() if router is not None and not recent_writer else None)
+
+            key = make_key(request.url.path, request.query_params.multi_items())
+            hit = None if recent_writer else response_cache.get(key)
+            if hit is not None:
+                body, status, mimetype = hit
+                response = Response(body, status_code=status, media_type=mimetype, headers={'X-Cache': 'HIT'})
+            else:
+                view_tags = tuple(tags(**request.path_params))
+                versions = response_cache.versions(view_tags)
+                try:
+                    response = await handler(request, **request.path_params)
+                except Exception as e:
+                    response = database_error(request, route, e)
+                if response.status_code == 200 and not recent_writer:
+                    response_cache.set(key, response.body, 200, response.media_type, view_tags, versions)
+                response.headers['X-Cache'] = 'MISS'
+
+            latency = time.perf_counter() - started
+            sql_count, sql_time, serialize_time = timings
+            metrics.record(request.method, route, response.status_code,
+                           latency, sql_count, sql_time, serialize_time, len(response.body))
+            app_time = max(latency - sql_time - serialize_time, 0.0)
+            response.headers['Server-Timing'] = (
+                f'db;dur={sql_time * 1000:.2f};desc="{sql_count} queries", '
+                f'serialize;dur={serialize_time * 1000:.2f}, '
+                f'app;dur={app_time * 1000:.2f}, '
+                f'total;dur={latency * 1000:.2f}'
+            )
+            return response
+        return wrapper
+    return decorator
+
+@endpoint('/api/items', tags=lambda: ['item-lists'])
+async def get_items(request):
+    args = request.query_params
+    try:
+        search = args.get('search', '')
+        cursor = args.get('cursor')
+        limit = parse_limit(args.get('limit'))
+        fields = lab5_app.item_list_serializer.parse_fields(args.get('fields'))
+
+        query, to_dict = lab5_app.item_list_serializer.statement(fields)
+        query = lab5_app.filter_item_list(query, args)
+
+        async with connection() as conn:
+            if search:
+                terms = search_terms(search)
+                if not terms:
+                    return json_response({"items": [], "next_cursor": None})
+                query, rank = apply_search(conn.dialect.name, query, Item, terms)
+                keys = [(rank, False), (Item.id, True)]
+            else:
+                keys = [(Item.created_at, True), (Item.id, True)]
+            result = await conn.execute(page_query(query, keys, cursor, limit))
+            rows, next_cursor = page_result(result.all(), keys, limit)
+
+        return json_response({
+            "items": [to_dict(row) for row in rows],
+            "next_cursor": next_cursor
+        })
+    except ValueError as e:
+        return json_response({"error": str(e)}, 400)
+
+@endpoint('/api/items/<int:item_id>', tags=lambda item_id: [f'item:{item_id}'])
+async def get_item(request, item_id):
+    async with connection() as conn:
+        item = (await conn.execute(select(Item.__table__).where(Item.id == item_id))).first()
+    if not item:
+        return json_response({"error": "Item not found"}, 404)
+    return json_response(lab5_app.item_detail(item))
+
+@endpoint('/api/stats', tags=lambda: ['stats'])
+async def get_stats(request):
+    async with connection() as conn:
+        stats = summarize(await conn.run_sync(counts_from))
+        latest_item = (await conn.execute(select(Item.__table__).order_by(Item.id.desc()).limit(1))).first()
+    return json_response(lab5_app.stats_payload(stats, latest_item))
+
+@endpoint('/api/search', tags=lambda: ['item-lists'])
+async def search_items(request):
+    args = request.query_params
+    query = args.get('q', '')
+    item_type = args.get('type')
+
+    if not query:
+        return json_response({"error": "Search query parameter 'q' is required"}, 400)
+
+    try:
+        limit = parse_limit(args.get('limit'))
+        fields = lab5_app.search_serializer.parse_fields(args.get('fields'))
+    except ValueError as e:
+        return json_response({"error": str(e)}, 400)
+
+    items_query, to_dict = lab5_app.search_serializer.statement(fields)
+
+    if item_type and item_type in ['lost', 'found']:
+        items_query = items_query.filter(Item.type == item_type)
+    elif item_type:
+        return json_response({"error": "Type must be 'lost' or 'found'"}, 400)
+
+    try:
+        items_query = filter_dates(items_query, args, Item)
+    except ValueError as e:
+        return json_response({"error": str(e)}, 400)
+
+    terms = search_terms(query)
+    if not terms:
+        return json_response([])
+
+    async with connection('SEARCH_STATEMENT_TIMEOUT_MS') as conn:
+        items_query, rank = apply_search(conn.dialect.name, items_query, Item, terms)
+        result = await conn.execute(items_query.order_by(rank, Item.id.desc()).limit(limit))
+        rows = result.all()
+
+    return json_response([to_dict(row) for row in rows])
+
+async def autocomplete(request):
+    # The Flask view builds the index on first use; after that it's memory only, with stale contents served
+    # while a background thread rebuilds them
+    if lab5_app.autocomplete_index.built_at is None:
+        return wsgi_app
+    lab5_app.ensure_autocomplete_index(flask_app)
+    started = time.perf_counter()
+    try:
+        response = json_response(lab5_app.autocomplete_payload(request.query_params))
+    except ValueError as e:
+        response = json_response({"error": str(e)}, 400)
+    metrics.record(request.method, '/api/autocomplete', response.status_code,
+                   time.perf_counter() - started, 0, 0.0, 0.0, len(response.body))
+    return response
+
+async def stream_items(request):
+    # A subscriber is one suspended coroutine, so idle streams cost memory, not threads
+    return StreamingResponse(
+        async_stream(flask_app.extensions['events'], last_event_id(request.headers, request.query_params)),
+        media_type='text/event-stream',
+        headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'}
+    )
+
+@asynccontextmanager
+async def lifespan(app):
+    yield
+    for async_engine in all_engines:
+        await async_engine.dispose()
+
+wsgi_app = WSGIMiddleware(flask_app, workers=int(os.environ.get('WSGI_THREADS', 10)))
+
+app = Starlette(
+    routes=[
+        Route('/api/items', get_items, methods=['GET']),
+        Route('/api/items/stream', stream_items, methods=['GET']),
+        Route('/api/items/{item_id:int}', get_item, methods=['GET']),
+        Route('/api/stats', get_stats, methods=['GET']),
+        Route('/api/search', search_items, methods=['GET']),
+        Route('/api/autocomplete', autocomplete, methods=['GET']),
+        # Writes and the remaining reads: the Flask app on a thread pool
+        Mount('/', app=wsgi_app)
+    ],
+    lifespan=lifespan
+)
@@ -0,0 +1,171 @@
+# Typeahead completions for the search box
+# One sorted array per field of '<suffix>\0<value>' entries, where the suffixes start at each word of the
+# value, so 'wal' completes 'Black Leather Wallet'. A prefix lookup is a bisect plus a scan of the matching
+# run, ranked by how many items carry each value. Prefixes of common words match long runs, so their top
+# results are memoized, and writes adjust those lists as they update the index.
+import bisect
+import heapq
+import sys
+import threading
+import time
+
+FIELDS = ('title', 'location', 'city')
+MAX_WORDS = 8  # suffixes indexed per value
+MAX_KEY_LENGTH = 40  # suffixes (and prefixes) are compared on their first 40 characters
+MAX_LIMIT = 20  # most completions one lookup returns
+MEMO_DEPTH = 2 * MAX_LIMIT  # memoized lists keep spare entries, so removals don't force a rescan right away
+MEMO_MIN_RUN = 256  # prefixes matching more values than this keep their top list between lookups
+MEMO_MAX_PREFIXES = 20000
+
+def normalize(value):
+    # Interned, so the per-item key tuples share the strings held by the field indexes
+    return sys.intern(' '.join((value or '').lower().split()))
+
+def suffixes(key):
+    words = key.split(' ')[:MAX_WORDS]
+    start = 0
+    for word in words:
+        yield key[start:start + MAX_KEY_LENGTH]
+        start += len(word) + 1
+
+def _rank(entry):
+    count, key = entry
+    return -count, key
+
+class _FieldIndex:
+    __slots__ = ('entries', 'values', 'memo')
+
+    def __init__(self):
+        self.entries = []  # sorted '<suffix>\0<key>'
+        self.values = {}  # key -> [item count, display value]
+        self.memo = {}  # prefix -> exact top [(count, key)], MAX_LIMIT to MEMO_DEPTH long, for prefixes with long runs
+
+    def add(self, key, display):
+        value = self.values.get(key)
+        if value is not None:
+            value[0] += 1
+        else:
+            value = self.values[key] = [1, display]
+            for suffix in suffixes(key):
+                bisect.insort(self.entries, f"{suffix}\0{key}")
+        self._update_memo(key, value[0], increased=True)
+
+    def remove(self, key):
+        value = self.values.get(key)
+        if value is None:
+            return
+        value[0] -= 1
+        if value[0] <= 0:
+            del self.values[key]
+            for suffix in suffixes(key):
+                entry = f"{suffix}\0{key}"
+                i = bisect.bisect_left(self.entries, entry)
+                if i < len(self.entries) and self.entries[i] == entry:
+                    del self.entries[i]
+        self._update_memo(key, value[0], increased=False)
+
+    def _update_memo(self, key, count, increased):
+        """Keep memoized top lists exact after a count change, dropping any that run short."""
+        if not self.memo:
+            return
+        entry = (count, key)
+        prefixes = {suffix[:length] for suffix in suffixes(key) for length in range(1, len(suffix) + 1)}
+        for prefix in prefixes:
+            top = self.memo.get(prefix)
+            if top is None:
+                continue
+            position = next((i for i, (_, top_key) in enumerate(top) if top_key == key), None)
+            if position is not None:
+                del top[position]
+            # Everything outside the list ranks below its last entry, so a value may only (re)enter ahead of it;
+            # one that improved was already ahead of it
+            if count > 0 and ((increased and position is not None) or _rank(entry) < _rank(top[-1])):
+                bisect.insort(top, entry, key=_rank)
+                del top[MEMO_DEPTH:]
+            if len(top) < MAX_LIMIT:
+                del self.memo[prefix]
+
+    def _scan(self, prefix):
+        entries = self.entries
+        keys = set()
+        for i in range(bisect.bisect_left(entries, prefix), len(entries)):
+            entry = entries[i]
+            if not entry.startswith(prefix):
+                break
+            keys.add(entry[entry.index('\0') + 1:])
+        return keys
+
+    def complete(self, prefix, limit):
+        top = self.memo.get(prefix)
+        if top is None:
+            keys = self._scan(prefix)
+            values = self.values
+            top = heapq.nsmallest(MEMO_DEPTH, ((values[key][0], key) for key in keys), key=_rank)
+            if len(keys) > MEMO_MIN_RUN:
+                if len(self.memo) >= MEMO_MAX_PREFIXES:
+                    del self.memo[next(iter(self.memo))]
+                self.memo[prefix] = top
+        return [{"value": self.values[key][1], "count": count} for count, key in top[:limit]]
+
+class PrefixIndex:
+    """Thread-safe completions for item titles, locations and cities, ranked by item count."""
+
+    def __init__(self):
+        self._fields = {field: _FieldIndex() for field in FIELDS}
+        self._items = {}  # id -> (title key, location key, city key), to undo an item's counts
+        self._lock = threading.RLock()
+        self.built_at = None
+
+    def __len__(self):
+        return len(self._items)
+
+    def add(self, item_id, title, location, city):
+        """Index an item, replacing what was indexed for it before (an edited title)."""
+        with self._lock:
+            self._remove(item_id)
+            keys = []
+            for field, display in zip(FIELDS, (title, location, city)):
+                key = normalize(display)
+                if key:
+                    self._fields[field].add(key, ' '.join(display.split()))
+                keys.append(key)
+            self._items[item_id] = tuple(keys)
+
+    def remove(self, item_id):
+        with self._lock:
+            self._remove(item_id)
+
+    def _remove(self, item_id):
+        keys = self._items.pop(item_id, None)
+        if keys is None:
+            return
+        for field, key in zip(FIELDS, keys):
+            if key:
+                self._fields[field].remove(key)
+
+    def rebuild(self, rows):
+        """Replace the contents with (id, title, location, city) rows, sorting each field once."""
+        fields = {field: _FieldIndex() for field in FIELDS}
+        items = {}
+        for item_id, *displays in rows:
+            keys = []
+            for field, display in zip(FIELDS, displays):
+                key = normalize(display)
+                if key:
+                    value = fields[field].values.setdefault(key, [0, ' '.join(display.split())])
+                    value[0] += 1
+                keys.append(key)
+            items[item_id] = tuple(keys)
+        for index in fields.values():
+            index.entries = sorted(f"{suffix}\0{key}" for key in index.values for suffix in suffixes(key))
+        with self._lock:
+            self._fields, self._items = fields, items
+            self.built_at = time.monotonic()
+
+    def complete(self, field, prefix, limit=10):
+        """Top values of field with a word starting with prefix, as [{"value", "count"}], most common first."""
+        prefix = normalize(prefix)[:MAX_KEY_LENGTH]
+        if not prefix:
+            return []
+        with self._lock:
+            return self._fields[field].complete(prefix, limit)
@@ -0,0 +1 @@
+# Benchmark and load-testing tools for the Lab 5 API (run from milestone2/: python -m benchmarks.<tool>)
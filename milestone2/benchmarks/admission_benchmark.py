@@ -0,0 +1,153 @@
+# Overload benchmark: a few abusive clients flooding search and writes while well-behaved clients browse,
+# against the WSGI app (gunicorn, threaded workers) with admission control off and then on
+# Seed first, then run from milestone2/:
+#   python -m benchmarks.seed --database-url sqlite:///bench.db --items 100000
+#   python -m benchmarks.admission_benchmark --database-url sqlite:///bench.db --abusers 16 --clients 8 --duration 15
+# Abusers never back off (they ignore Retry-After); each well-behaved client sends a request every --interval
+# seconds, inside every budget. Clients are told apart by X-Forwarded-For, as behind a load balancer. The
+# pool is kept small (--pool-size, no overflow) so the abusers can take every connection.
+import argparse
+import json
+import os
+import subprocess
+import sys
+import threading
+import time
+import urllib.request
+from datetime import datetime
+
+from benchmarks.common import APP_DIR, percentile
+from benchmarks.load import HttpClient, RESULTS_DIR
+from benchmarks.synthetic import item_payload, search_term, new_rng
+
+ABUSER_MIX = {'search': 80, 'create': 20}
+CLIENT_MIX = {'list': 50, 'get': 30, 'search': 20}
+
+def start_server(admission, port, args):
+    env = dict(
+        os.environ, DATABASE_URL=args.database_url, CACHE_MAX_ENTRIES='0', ADMISSION='1' if admission else '0',
+        ADMISSION_STORE='shared', ADMISSION_TRUSTED_PROXIES='1', DB_POOL_SIZE=str(args.pool_size), DB_MAX_OVERFLOW='0',
+        DB_POOL_TIMEOUT=str(args.pool_timeout), MATCH_NOTIFY='0'
+    )
+    command = ['gunicorn', '--preload', '-w', str(args.workers), '-k', 'gthread', '--threads', str(args.threads),
+               '-b', f'127.0.0.1:{port}', '--log-level', 'warning', 'wsgi:app']
+    process = subprocess.Popen(command, cwd=APP_DIR, env=env)
+    deadline = time.monotonic() + 30
+    while time.monotonic() < deadline:
+        try:
+            with urllib.request.urlopen(f'http://127.0.0.1:{port}/api/items?limit=1&fields=id', timeout=1) as response:
+                return process, json.loads(response.read())['items']
+        except OSError:
+            time.sleep(0.2)
+    process.terminate()
+    raise SystemExit(f"server did not come up on port {port}")
+
+def send(client, name, rng, max_id, headers):
+    if name == 'search':
+        return client.request('GET', f'/api/search?q={search_term(rng)}', headers=headers)[0]
+    if name == 'create':
+        return client.request('POST', '/api/items', item_payload(rng), headers=headers)[0]
+    if name == 'list':
+        return client.request('GET', '/api/items?limit=20', headers=headers)[0]
+    return client.request('GET', f'/api/items/{rng.randint(1, max_id)}', headers=headers)[0]
+
+def run_client(port, mix, ip, interval, max_id, deadline, samples, seed):
+    client = HttpClient(f'http://127.0.0.1:{port}')
+    rng = new_rng(seed)
+    names, weights = list(mix), list(mix.values())
+    headers = {'X-Forwarded-For': ip}
+    local = []
+    while time.perf_counter() < deadline:
+        started = time.perf_counter()
+        try:
+            status = send(client, rng.choices(names, weights)[0], rng, max_id, headers)
+        except Exception:
+            status = 0  # connection failure or timeout
+        elapsed = time.perf_counter() - started
+        local.append((status, elapsed))
+        if interval:
+            time.sleep(max(0.0, interval - elapsed))
+    samples.extend(local)
+
+def summarize(samples, elapsed):
+    latencies = [seconds * 1000 for _, seconds in samples]
+    served = [status for status, _ in samples if 200 <= status < 500 and status != 429]
+    return {
+        "requests": len(samples),
+        "served": len(served),
+        "served_rps": round(len(served) / elapsed, 1),
+        "rejected_429": sum(1 for status, _ in samples if status == 429),
+        "rejected_503": sum(1 for status, _ in samples if status == 503),
+        "errors": sum(1 for status, _ in samples if status == 0 or (status >= 500 and status != 503)),
+        "p50_ms": round(percentile(latencies, 0.50), 2) if latencies else None,
+        "p99_ms": round(percentile(latencies, 0.99), 2) if latencies else None
+    }
+
+def run_mode(admission, port, args):
+    process, newest = start_server(admission, port, args)
+    max_id = newest[0]['id'] if newest else 1
+    try:
+        abusive, polite = [], []
+        started = time.perf_counter()
+        deadline = started + args.duration
+        threads = [
+            threading.Thread(target=run_client, args=(port, ABUSER_MIX, f'10.0.0.{n % args.abuser_ips + 1}', 0,
+                                                      max_id, deadline, abusive, args.seed + n))
+            for n in range(args.abusers)
+        ] + [
+            threading.Thread(target=run_client, args=(port, CLIENT_MIX, f'192.168.0.{n + 1}', args.interval,
+                                                      max_id, deadline, polite, args.seed + 1000 + n))
+            for n in range(args.clients)
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        elapsed = time.perf_counter() - started
+    finally:
+        process.terminate()
+        process.wait()
+    return {"abusive": summarize(abusive, elapsed), "polite": summarize(polite, elapsed)}
+
+def main():
+    parser = argparse.ArgumentParser(description="Throughput under overload with and without admission control")
+    parser.add_argument('--database-url', required=True, help='seeded file database (not sqlite:// in-memory)')
+    parser.add_argument('--abusers', type=int, default=16, help='flooding client threads')
+    parser.add_argument('--abuser-ips', type=int, default=4, help='addresses the flooding threads share')
+    parser.add_argument('--clients', type=int, default=8, help='well-behaved clients, one address each')
+    parser.add_argument('--interval', type=float, default=0.25, help='seconds between a well-behaved client\'s requests')
+    parser.add_argument('--duration', type=float, default=15, help='seconds per mode')
+    parser.add_argument('--workers', type=int, default=1)
+    parser.add_argument('--threads', type=int, default=16, help='threads per gunicorn worker')
+    parser.add_argument('--pool-size', type=int, default=4, help='connections per worker (no overflow)')
+    parser.add_argument('--pool-timeout', type=float, default=5, help='seconds a request may wait for a connection')
+    parser.add_argument('--port', type=int, default=5201)
+    parser.add_argument('--seed', type=int, default=498)
+    parser.add_argument('--output', help='JSON report path (default: benchmarks/results/admission-<timestamp>.json)')
+    args = parser.parse_args()
+
+    results = {}
+    for offset, mode in enumerate(('off', 'on')):
+        results[mode] = run_mode(mode == 'on', args.port + offset, args)
+
+    print(f"{'admission':>9} {'clients':>8} | {'req':>7} {'served/s':>9} {'429':>6} {'503':>6} {'err':>5} "
+          f"{'p50 ms':>8} {'p99 ms':>8}")
+    for mode, result in results.items():
+        for group in ('abusive', 'polite'):
+            row = result[group]
+            print(f"{mode:>9} {group:>8} | {row['requests']:>7} {row['served_rps']:>9.1f} {row['rejected_429']:>6} "
+                  f"{row['rejected_503']:>6} {row['errors']:>5} {row['p50_ms']:>8.2f} {row['p99_ms']:>8.2f}")
+
+    started_at = datetime.utcnow()
+    output = args.output or os.path.join(RESULTS_DIR, f"admission-{started_at.strftime('%Y%m%d-%H%M%S')}.json")
+    os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+    with open(output, 'w') as f:
+        json.dump({"meta": {"started_at": started_at.isoformat(), "database_url": args.database_url,
+                            "abusers": args.abusers, "abuser_ips": args.abuser_ips, "clients": args.clients,
+                            "interval_seconds": args.interval, "workers": args.workers, "threads": args.threads,
+                            "pool_size": args.pool_size, "duration_seconds": args.duration,
+                            "python": sys.version.split()[0]}, **results}, f, indent=2)
+    print(f"Saved {output}")
+
+if __name__ == '__main__':
+    main()
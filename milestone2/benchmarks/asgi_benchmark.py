@@ -0,0 +1,144 @@
+# Side-by-side read benchmark: the WSGI app (gunicorn, threaded workers) vs the ASGI app (uvicorn)
+# Seed first, then run from milestone2/:
+#   python -m benchmarks.seed --database-url sqlite:///bench.db --items 100000
+#   python -m benchmarks.asgi_benchmark --database-url sqlite:///bench.db --levels 16,64,256,1024 --duration 10
+# Both servers get the same worker count and database; the response cache is off so every request hits it.
+import argparse
+import asyncio
+import json
+import os
+import subprocess
+import sys
+import time
+import urllib.request
+from datetime import datetime
+
+from benchmarks.common import APP_DIR, percentile
+from benchmarks.load import DEFAULT_MIX, RESULTS_DIR
+from benchmarks.synthetic import search_term, new_rng
+
+READ_MIX = {name: DEFAULT_MIX[name] for name in ('list', 'get', 'search', 'stats')}
+
+def server_command(mode, port, workers, threads):
+    if mode == 'wsgi':
+        return ['gunicorn', '-w', str(workers), '-k', 'gthread', '--threads', str(threads),
+                '-b', f'127.0.0.1:{port}', '--log-level', 'warning', 'wsgi:app']
+    return ['uvicorn', 'asgi:app', '--workers', str(workers), '--host', '127.0.0.1', '--port', str(port),
+            '--log-level', 'warning', '--no-access-log']
+
+def start_server(mode, port, args):
+    env = dict(os.environ, DATABASE_URL=args.database_url, CACHE_MAX_ENTRIES='0', ADMISSION='0')
+    process = subprocess.Popen(server_command(mode, port, args.workers, args.threads), cwd=APP_DIR, env=env)
+    deadline = time.monotonic() + 30
+    while time.monotonic() < deadline:
+        try:
+            with urllib.request.urlopen(f'http://127.0.0.1:{port}/api/items?limit=1&fields=id', timeout=1) as response:
+                return process, json.loads(response.read())['items']
+        except OSError:
+            time.sleep(0.2)
+    process.terminate()
+    raise SystemExit(f"{mode} server did not come up on port {port}")
+
+def request_path(name, rng, max_id):
+    if name == 'list':
+        return '/api/items' + rng.choice(['', '?type=lost', '?type=found', '?limit=20'])
+    if name == 'get':
+        return f'/api/items/{rng.randint(1, max_id)}'
+    if name == 'search':
+        return f'/api/search?q={search_term(rng)}'
+    return '/api/stats'
+
+async def fetch(reader, writer, path):
+    writer.write(f'GET {path} HTTP/1.1\r\nHost: bench\r\n\r\n'.encode())
+    await writer.drain()
+    status = int((await reader.readline()).split()[1])
+    length = 0
+    while True:
+        line = await reader.readline()
+        if line in (b'\r\n', b''):
+            break
+        name, _, value = line.decode().partition(':')
+        if name.lower() == 'content-length':
+            length = int(value)
+    await reader.readexactly(length)
+    return status
+
+async def client(port, rng, max_id, deadline, samples):
+    connection = None
+    names, weights = list(READ_MIX), list(READ_MIX.values())
+    while time.perf_counter() < deadline:
+        path = request_path(rng.choices(names, weights)[0], rng, max_id)
+        started = time.perf_counter()
+        try:
+            if connection is None:
+                connection = await asyncio.open_connection('127.0.0.1', port)
+            status = await fetch(*connection, path)
+        except (OSError, asyncio.IncompleteReadError, ValueError, IndexError):
+            status = 0
+            if connection is not None:
+                connection[1].close()
+            connection = None
+        samples.append((status, time.perf_counter() - started))
+    if connection is not None:
+        connection[1].close()
+
+async def run_level(port, concurrency, duration, max_id, seed):
+    samples = []
+    started = time.perf_counter()
+    deadline = started + duration
+    await asyncio.gather(*[
+        client(port, new_rng(seed + i), max_id, deadline, samples) for i in range(concurrency)
+    ])
+    elapsed = time.perf_counter() - started
+    latencies = [seconds * 1000 for _, seconds in samples]
+    return {
+        "concurrency": concurrency,
+        "requests": len(samples),
+        "errors": sum(1 for status, _ in samples if status == 0 or status >= 500),
+        "throughput_rps": round(len(samples) / elapsed, 1),
+        "p50_ms": round(percentile(latencies, 0.50), 2) if latencies else None,
+        "p99_ms": round(percentile(latencies, 0.99), 2) if latencies else None
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare WSGI and ASGI read throughput at rising concurrency")
+    parser.add_argument('--database-url', required=True, help='seeded file database (not sqlite:// in-memory)')
+    parser.add_argument('--levels', default='16,64,256,1024', help='comma-separated client counts')
+    parser.add_argument('--duration', type=float, default=10, help='seconds per level')
+    parser.add_argument('--workers', type=int, default=2, help='server processes for both modes')
+    parser.add_argument('--threads', type=int, default=16, help='threads per gunicorn worker')
+    parser.add_argument('--port', type=int, default=5101)
+    parser.add_argument('--seed', type=int, default=498)
+    parser.add_argument('--output', help='JSON report path (default: benchmarks/results/asgi-<timestamp>.json)')
+    args = parser.parse_args()
+    levels = [int(level) for level in args.levels.split(',')]
+
+    results = {}
+    for offset, mode in enumerate(('wsgi', 'asgi')):
+        port = args.port + offset
+        process, newest = start_server(mode, port, args)
+        max_id = newest[0]['id'] if newest else 1
+        try:
+            results[mode] = [asyncio.run(run_level(port, level, args.duration, max_id, args.seed)) for level in levels]
+        finally:
+            process.terminate()
+            process.wait()
+
+    print(f"{'clients':>8} | {'wsgi req/s':>10} {'p50 ms':>8} {'p99 ms':>8} {'err':>5} | "
+          f"{'asgi req/s':>10} {'p50 ms':>8} {'p99 ms':>8} {'err':>5}")
+    for wsgi, asgi in zip(results['wsgi'], results['asgi']):
+        print(f"{wsgi['concurrency']:>8} | {wsgi['throughput_rps']:>10.1f} {wsgi['p50_ms']:>8.2f} {wsgi['p99_ms']:>8.2f} "
+              f"{wsgi['errors']:>5} | {asgi['throughput_rps']:>10.1f} {asgi['p50_ms']:>8.2f} {asgi['p99_ms']:>8.2f} "
+              f"{asgi['errors']:>5}")
+
+    started_at = datetime.utcnow()
+    output = args.output or os.path.join(RESULTS_DIR, f"asgi-{started_at.strftime('%Y%m%d-%H%M%S')}.json")
+    os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+    with open(output, 'w') as f:
+        json.dump({"meta": {"started_at": started_at.isoformat(), "database_url": args.database_url,
+                            "workers": args.workers, "threads": args.threads, "duration_seconds": args.duration,
+                            "python": sys.version.split()[0]}, **results}, f, indent=2)
+    print(f"Saved {output}")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,85 @@
+# Latency and memory of the typeahead prefix index on a synthetic corpus
+# Usage (from milestone2/): python -m benchmarks.autocomplete_benchmark [--items 100000] [--queries 5000]
+# Reports build time, memory retained by the index (tracemalloc), lookup latency for 1-4 character prefixes
+# as typed into the search box, and the cost of keeping the index (and its memoized top lists) current on
+# each item write.
+import argparse
+import time
+import tracemalloc
+
+from autocomplete import PrefixIndex, FIELDS
+from benchmarks.common import percentile
+from benchmarks.synthetic import item_payload, new_rng
+
+def item_row(item_id, rng):
+    payload = item_payload(rng)
+    location = f"{payload['address']}, {payload['city']} {payload['zipCode']}"
+    return item_id, payload['title'], location, payload['city']
+
+def main():
+    parser = argparse.ArgumentParser(description="Typeahead prefix index latency and memory")
+    parser.add_argument('--items', type=int, default=100000)
+    parser.add_argument('--queries', type=int, default=5000)
+    parser.add_argument('--writes', type=int, default=2000)
+    parser.add_argument('--seed', type=int, default=498)
+    args = parser.parse_args()
+
+    rng = new_rng(args.seed)
+    rows = [item_row(item_id, rng) for item_id in range(1, args.items + 1)]
+
+    index = PrefixIndex()
+    tracemalloc.start()
+    started = time.perf_counter()
+    index.rebuild(rows)
+    build_seconds = time.perf_counter() - started
+    retained, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    print(f"Indexed {args.items} items in {build_seconds:.2f} s, {retained / 1024 / 1024:.1f} MiB retained "
+          f"({retained / 1024 / 1024 * 100000 / args.items:.1f} MiB per 100k items)")
+    for field in FIELDS:
+        entries = index._fields[field]
+        print(f"   {field:<9} {len(entries.values):>7} distinct values  {len(entries.entries):>7} prefix entries")
+
+    # Keystroke sequences: each query word typed one character at a time, up to four characters
+    words = [word.lower() for _, title, location, city in rows[:2000] for word in f"{title} {location} {city}".split()]
+    lookups = []
+    for _ in range(args.queries):
+        word = rng.choice(words)
+        field = rng.choice(FIELDS)
+        lookups += [(field, word[:length]) for length in range(1, min(4, len(word)) + 1)]
+
+    def run_lookups(label):
+        by_length = {}
+        for field, prefix in lookups:
+            started = time.perf_counter()
+            index.complete(field, prefix, 10)
+            by_length.setdefault(len(prefix), []).append((time.perf_counter() - started) * 1000)
+        print(f"{label}:")
+        for length, samples in sorted(by_length.items()):
+            print(f"   {length} chars  p50 {percentile(samples, 0.50):.3f} ms  p99 {percentile(samples, 0.99):.3f} ms  "
+                  f"max {max(samples):.3f} ms")
+
+    # First sight of a prefix scans its run; long runs are memoized, so the same keystrokes again are cheap
+    distinct = list(dict.fromkeys(lookups))
+    started = time.perf_counter()
+    for field, prefix in distinct:
+        index.complete(field, prefix, 10)
+    print(f"first lookup of {len(distinct)} distinct prefixes: {(time.perf_counter() - started) * 1000:.0f} ms total")
+    run_lookups(f"{len(lookups)} keystroke lookups")
+
+    # Write path: a new item, then an edit of its title, then a delete
+    samples = []
+    for item_id in range(args.items + 1, args.items + 1 + args.writes):
+        row = item_row(item_id, rng)
+        started = time.perf_counter()
+        index.add(*row)
+        index.add(item_id, f"{row[1]} edited", row[2], row[3])
+        index.remove(item_id)
+        samples.append((time.perf_counter() - started) * 1000 / 3)
+    print(f"index update per write  p50 {percentile(samples, 0.50):.3f} ms  p99 {percentile(samples, 0.99):.3f} ms")
+    memoized = sum(len(index._fields[field].memo) for field in FIELDS)
+    run_lookups(f"same lookups after {args.writes} writes ({memoized} memoized prefixes kept)")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,33 @@
+# Shared helpers for the benchmark scripts
+import importlib.util
+import os
+import sys
+
+APP_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')
+APP_PATH = os.path.join(APP_DIR, 'Lab 5 app.py')
+
+def load_module():
+    """Import 'Lab 5 app.py' (not importable by name because of the spaces)."""
+    if APP_DIR not in sys.path:
+        sys.path.insert(0, APP_DIR)
+    spec = importlib.util.spec_from_file_location('lab5_app', APP_PATH)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+def load_app(database_url, **config):
+    """Returns (module, app) with the app built by create_app() against the given database.
+
+    Admission control is off unless asked for: every benchmark client shares one address.
+    """
+    module = load_module()
+    config.setdefault('ADMISSION', False)
+    return module, module.create_app(dict(config, SQLALCHEMY_DATABASE_URI=database_url))
+
+def prepare_schema(app_module):
+    """Create tables plus the search and stats machinery, as the init-db command does. Needs an app context."""
+    app_module.init_database()
+
+def percentile(samples, fraction):
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(fraction * len(ordered)))]
@@ -0,0 +1,85 @@
+# Event date (occurred_on) check on a temporary SQLite database
+# Usage (from milestone2/): python -m benchmarks.date_check
+# Checks the backfill of rows saved before the column existed, occurredOn on create, the from/to filters, the
+# day and week histograms, and that both export formats carry occurred_on through to the end of the stream.
+# Exits 1 on any failure.
+import csv
+import io
+import json
+import os
+import sys
+import tempfile
+from datetime import date, datetime
+
+from benchmarks.common import load_app, prepare_schema
+from dates import backfill_occurred_on
+
+def item(title, occurred_on=None):
+    body = {"title": title, "description": f"{title} near the library", "type": "lost", "address": "1 Main St",
+            "city": "Evanston", "zipCode": "60208", "email": "owner@example.com"}
+    if occurred_on:
+        body["occurredOn"] = occurred_on
+    return body
+
+def main():
+    failures = []
+
+    def expect(label, actual, expected):
+        ok = actual == expected
+        print(f"{'ok' if ok else 'FAIL':<5} {label}: {actual}")
+        if not ok:
+            failures.append(label)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        app_module, app = load_app(f"sqlite:///{os.path.join(tmp, 'dates.db')}", CACHE_MAX_ENTRIES=0, MATCH_NOTIFY=False)
+        client = app.test_client()
+        with app.app_context():
+            prepare_schema(app_module)
+            db, Item = app_module.db, app_module.Item
+
+            # Rows from before the column: the display string is read in the year the row was created
+            for title, text, created_at in (("Old wallet", "July 5", datetime(2025, 8, 1)),
+                                            ("Old scarf", "December 30", datetime(2026, 1, 2)),
+                                            ("Old keys", None, datetime(2026, 3, 4, 12))):
+                db.session.add(Item(title=title, description=title, type='lost', location='1 Main St', email='a@b.c',
+                                    date=text, created_at=created_at))
+            db.session.commit()
+            list(backfill_occurred_on(db.engine, Item.__table__))
+            expect("backfill", [(row.title, row.occurred_on, row.date) for row in Item.query.order_by(Item.id)], [
+                ("Old wallet", date(2025, 7, 5), "July 5"),
+                ("Old scarf", date(2025, 12, 30), "December 30"),
+                ("Old keys", date(2026, 3, 4), "March 4")
+            ])
+
+            created = client.post('/api/items', json=item("Red umbrella", "2026-03-02")).get_json()['item']
+            expect("occurredOn on create", (created['occurred_on'], created['date']), ("2026-03-02", "March 2"))
+            expect("future date rejected", client.post('/api/items', json=item("Blue hat", "2999-01-01")).status_code, 400)
+
+            titles = [row['title'] for row in
+                      client.get('/api/items?from=2026-01-01&to=2026-03-31').get_json()['items']]
+            expect("from/to filter", sorted(titles), ["Old keys", "Red umbrella"])
+            expect("bad date", client.get('/api/items?from=yesterday').status_code, 400)
+
+            days = client.get('/api/items/histogram?bucket=day&from=2026-03-01&to=2026-03-07').get_json()
+            expect("day histogram", [bucket['count'] for bucket in days['buckets']], [0, 1, 0, 1, 0, 0, 0])
+            weeks = client.get('/api/items/histogram?bucket=week&from=2026-03-01&to=2026-03-10').get_json()
+            expect("week histogram", [(bucket['start'], bucket['count']) for bucket in weeks['buckets']],
+                   [("2026-02-23", 0), ("2026-03-02", 2), ("2026-03-09", 0)])
+
+            # Exports stream past the 200, so a value the encoder can't handle shows up as a cut-off body
+            lines = client.get('/api/items/export?format=ndjson').get_data(as_text=True).splitlines()
+            rows = [json.loads(line) for line in lines]
+            expect("ndjson export", [row['occurred_on'] for row in rows],
+                   ["2025-07-05", "2025-12-30", "2026-03-04", "2026-03-02"])
+            rows = list(csv.DictReader(io.StringIO(client.get('/api/items/export?format=csv').get_data(as_text=True))))
+            expect("csv export", [row['occurred_on'] for row in rows],
+                   ["2025-07-05", "2025-12-30", "2026-03-04", "2026-03-02"])
+            db.engine.dispose()
+
+    if failures:
+        print(f"{len(failures)} check(s) failed")
+        sys.exit(1)
+    print("Event date checks passed")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,89 @@
+# Incremental export check on a temporary SQLite database
+# Usage (from milestone2/): python -m benchmarks.export_check
+# Pulls a full export, then edits, deletes, archives and bulk-inserts items and checks that a pull resuming from
+# the last row's (updated_at, id) sees each change exactly once, including a pull cut inside a bulk chunk whose
+# rows all share one timestamp. Exits 1 on any failure.
+import csv
+import io
+import json
+import os
+import sys
+import tempfile
+
+from benchmarks.common import load_app, prepare_schema
+from archive import archive_items
+
+def item(title):
+    return {"title": title, "description": f"{title} near the library", "type": "lost", "address": "1 Main St",
+            "city": "Evanston", "zipCode": "60208", "email": "owner@example.com"}
+
+def pull(client, path, cursor=None):
+    query = f"?since={cursor[0]}&since_id={cursor[1]}" if cursor else ""
+    return [json.loads(line) for line in client.get(path + query).get_data(as_text=True).splitlines()]
+
+def cursor_of(row):
+    return row['updated_at'], row['id']
+
+def main():
+    failures = []
+
+    def expect(label, actual, expected):
+        ok = actual == expected
+        print(f"{'ok' if ok else 'FAIL':<5} {label}: {actual}")
+        if not ok:
+            failures.append(label)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        app_module, app = load_app(f"sqlite:///{os.path.join(tmp, 'export.db')}", CACHE_MAX_ENTRIES=0,
+                                   MATCH_NOTIFY=False)
+        client = app.test_client()
+        with app.app_context():
+            prepare_schema(app_module)
+            db, Item, ArchivedItem = app_module.db, app_module.Item, app_module.ArchivedItem
+
+            ids = [client.post('/api/items', json=item(title)).get_json()['item']['id']
+                   for title in ("Red umbrella", "Blue hat", "Green scarf")]
+            rows = pull(client, '/api/items/export')
+            expect("full export", [row['id'] for row in rows], ids)
+            cursor = cursor_of(rows[-1])
+
+            client.put(f'/api/items/{ids[0]}', json={"status": "resolved"})
+            client.delete(f'/api/items/{ids[1]}')
+            list(archive_items(db.engine, Item, ArchivedItem, resolved_after_days=0, after_days=36500))
+            body = '\n'.join(json.dumps(item(f"Bulk item {n}")) for n in range(5))
+            bulk_ids = [result['id'] for result in client.post(
+                '/api/items/bulk', data=body, content_type='application/x-ndjson').get_json()['results']]
+
+            changes = pull(client, '/api/items/export', cursor)
+            expect("deleted row", [(row['id'], row['deleted_at'] is not None, row['title'])
+                                   for row in changes if row['id'] == ids[1]], [(ids[1], True, None)])
+            expect("archived row", [(row['status'], row['archived_at'] is not None)
+                                    for row in changes if row['id'] == ids[0]], [("resolved", True)])
+            expect("bulk rows", [row['id'] for row in changes if row['id'] in bulk_ids], bulk_ids)
+            expect("unchanged row left out", ids[2] in [row['id'] for row in changes], False)
+
+            # A pull that stopped two rows into the bulk chunk resumes with the other three
+            bulk_rows = [row for row in changes if row['id'] in bulk_ids]
+            expect("shared timestamp", len({row['updated_at'] for row in bulk_rows}), 1)
+            resumed = pull(client, '/api/items/export', cursor_of(bulk_rows[1]))
+            expect("resume inside a chunk", [row['id'] for row in resumed], bulk_ids[2:])
+            expect("caught up", pull(client, '/api/items/export', cursor_of(changes[-1])), [])
+
+            report = client.post('/api/reports', json=item("Lost bike")).get_json()['report']
+            cursor = cursor_of(pull(client, '/api/reports/export')[-1])
+            client.delete(f"/api/reports/{report['id']}")
+            expect("deleted report", [(row['id'], row['deleted_at'] is not None)
+                                      for row in pull(client, '/api/reports/export', cursor)], [(report['id'], True)])
+
+            header = next(csv.reader(io.StringIO(client.get('/api/items/export?format=csv').get_data(as_text=True))))
+            expect("csv columns", header[-3:], ['geo_cell', 'archived_at', 'deleted_at'])
+            expect("bad since_id", client.get('/api/items/export?since=2026-01-01&since_id=x').status_code, 400)
+            db.engine.dispose()
+
+    if failures:
+        print(f"{len(failures)} check(s) failed")
+        sys.exit(1)
+    print("Export checks passed")
+
+if __name__ == '__main__':
+    main()
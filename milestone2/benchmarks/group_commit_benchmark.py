@@ -0,0 +1,84 @@
+# Throughput and latency of POST /api/items with per-request commits vs group commit
+# Usage (from milestone2/): python -m benchmarks.group_commit_benchmark [--threads 16] [--requests 200] [--database-url URL]
+# Each mode gets a fresh database (a temporary SQLite file unless --database-url is given) so every commit
+# pays for a real fsync; the request threads share one app, as workers in a threaded server would.
+import argparse
+import os
+import tempfile
+import threading
+import time
+
+from benchmarks.common import load_app, prepare_schema, percentile
+from benchmarks.synthetic import item_payload, new_rng
+
+MODES = [
+    ('per-request', {}),
+    ('group sync', {'GROUP_COMMIT': True, 'GROUP_COMMIT_DURABILITY': 'sync'}),
+    ('group async', {'GROUP_COMMIT': True, 'GROUP_COMMIT_DURABILITY': 'async'})
+]
+
+def run_mode(database_url, config, threads, requests, seed):
+    app_module, app = load_app(database_url, **config)
+    with app.app_context():
+        prepare_schema(app_module)
+
+    latencies, statuses = [], set()
+    lock = threading.Lock()
+    start = threading.Barrier(threads + 1)
+
+    def worker(n):
+        rng = new_rng(seed + n)
+        client = app.test_client()
+        mine = []
+        start.wait()
+        for _ in range(requests):
+            started = time.perf_counter()
+            response = client.post('/api/items', json=item_payload(rng))
+            mine.append((time.perf_counter() - started) * 1000)
+            with lock:
+                statuses.add(response.status_code)
+        with lock:
+            latencies.extend(mine)
+
+    workers = [threading.Thread(target=worker, args=(n,)) for n in range(threads)]
+    for thread in workers:
+        thread.start()
+    start.wait()
+    began = time.perf_counter()
+    for thread in workers:
+        thread.join()
+    elapsed = time.perf_counter() - began
+
+    batch = app.test_client().get('/api/group-commit').get_json()
+    writer = app.extensions.get('group_commit')
+    if writer is not None:
+        writer.stop()
+    with app.app_context():
+        app_module.db.engine.dispose()
+    return {
+        "rps": len(latencies) / elapsed,
+        "p50_ms": percentile(latencies, 0.50),
+        "p99_ms": percentile(latencies, 0.99),
+        "mean_batch": batch.get('mean_batch_size', 1.0),
+        "statuses": sorted(statuses)
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare per-request commits with group commit for item creation")
+    parser.add_argument('--database-url', help='database to use for every mode (default: a fresh SQLite file per mode)')
+    parser.add_argument('--threads', type=int, default=16, help='concurrent request threads')
+    parser.add_argument('--requests', type=int, default=200, help='requests per thread')
+    parser.add_argument('--seed', type=int, default=498)
+    args = parser.parse_args()
+
+    print(f"{args.threads} threads x {args.requests} POST /api/items per mode")
+    print(f"{'mode':<12} {'req/s':>8} {'p50 ms':>8} {'p99 ms':>8} {'rows/commit':>11}  statuses")
+    for label, config in MODES:
+        with tempfile.TemporaryDirectory() as tmp:
+            database_url = args.database_url or f"sqlite:///{os.path.join(tmp, 'group_commit.db')}"
+            result = run_mode(database_url, config, args.threads, args.requests, args.seed)
+        print(f"{label:<12} {result['rps']:>8.1f} {result['p50_ms']:>8.2f} {result['p99_ms']:>8.2f} "
+              f"{result['mean_batch']:>11.1f}  {result['statuses']}")
+
+if __name__ == '__main__':
+    main()
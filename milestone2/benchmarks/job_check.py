@@ -0,0 +1,157 @@
+# Background job queue check on a temporary SQLite database, with mail going to a JSON-lines file
+# Usage (from milestone2/): python -m benchmarks.job_check [--requests 200]
+# Checks the queue on an empty database: one digest per recipient, no repeat email for a pair already
+# notified, retry with backoff after a mail failure and requeue of an expired lease. Then compares POST
+# /api/items latency with match notifications queued (MATCH_NOTIFY=1) against running the same find_matches
+# + email work inside the request, and prints the /api/jobs latency numbers. Exits 1 on any failure.
+import argparse
+import json
+import logging
+import os
+import sys
+import tempfile
+import time
+
+from benchmarks.common import load_app, prepare_schema, percentile
+from benchmarks.synthetic import item_payload, new_rng
+
+LOST = [
+    ("Black leather wallet", "Black leather wallet with a student ID and two cards"),
+    ("Blue Jansport backpack", "Blue Jansport backpack with a laptop and chargers inside"),
+    ("Silver iPhone 13", "Silver iPhone 13 in a clear case with a cracked corner")
+]
+FOUND = [
+    ("Black wallet", "Found a black leather wallet with an ID near the library"),
+    ("Blue backpack", "Blue Jansport backpack left in a lecture hall, has a laptop"),
+    ("iPhone 13 silver", "Silver iPhone in a clear case found at the bus stop")
+]
+
+def item(title, description, item_type, email):
+    return {"title": title, "description": description, "type": item_type, "address": "1 Main St",
+            "city": "Evanston", "zipCode": "60208", "email": email}
+
+class FailingTransport:
+    def send(self, to, subject, body):
+        raise ConnectionRefusedError("SMTP server unavailable")
+
+def post_latency(client, rng, count):
+    samples = []
+    for _ in range(count):
+        started = time.perf_counter()
+        response = client.post('/api/items', json=item_payload(rng))
+        samples.append((time.perf_counter() - started) * 1000)
+        assert response.status_code == 201, response.get_json()
+    return samples
+
+def main():
+    parser = argparse.ArgumentParser(description="Check the background job queue and the write latency it saves")
+    parser.add_argument('--requests', type=int, default=200)
+    parser.add_argument('--seed', type=int, default=498)
+    args = parser.parse_args()
+
+    failures = []
+
+    def expect(label, actual, expected):
+        ok = actual == expected
+        print(f"{'ok' if ok else 'FAIL':<5} {label}: {actual}")
+        if not ok:
+            failures.append(label)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        outbox = os.path.join(tmp, 'outbox.jsonl')
+        app_module, app = load_app(f"sqlite:///{os.path.join(tmp, 'jobs.db')}", CACHE_MAX_ENTRIES=0,
+                                   MAIL_TRANSPORT=f'file:{outbox}', MATCH_DIGEST_MINUTES=0)
+        queue, mail = app_module.job_queue, app.extensions['mail']
+        client = app.test_client()
+        rng = new_rng(args.seed)
+        with app.app_context():
+            prepare_schema(app_module)
+            engine = app_module.db.engine
+
+            def drain():
+                return app_module.run_pending(queue, engine, app.app_context)
+
+            # Digests: three matches for one owner become one email
+            sent_before = len(mail.messages())
+            for title, description in LOST:
+                client.post('/api/items', json=item(title, description, 'lost', 'owner@example.com'))
+            drain()
+            found_ids = [client.post('/api/items', json=item(title, description, 'found', 'finder@example.com'))
+                         .get_json()['item']['id'] for title, description in FOUND]
+            drain()
+            digests = [message for message in mail.messages()[sent_before:] if message['to'] == 'owner@example.com']
+            expect("one digest for the owner", len(digests), 1)
+            expect("digest lists every match", digests[0]['subject'] if digests else None,
+                   "3 found items may match your lost items")
+            expect("finder not emailed", [m for m in mail.messages() if m['to'] == 'finder@example.com'], [])
+
+            # Editing a found item re-runs matching, but a pair already notified is not emailed again
+            client.put(f'/api/items/{found_ids[0]}', json={"description": "Black leather wallet, ID inside"})
+            drain()
+            expect("no repeat notification", len([m for m in mail.messages() if m['to'] == 'owner@example.com']), 1)
+
+            # Mail failure: the job goes back to the queue with a backoff, then succeeds
+            logging.getLogger('jobs').disabled = True
+            app.extensions['mail'] = FailingTransport()
+            client.post('/api/items', json=item("Red umbrella", "Red folding umbrella with a wooden handle", 'lost', 'second@example.com'))
+            client.post('/api/items', json=item("Red umbrella", "Red umbrella with wooden handle, by the gym", 'found', 'finder@example.com'))
+            drain()
+            Job = app_module.Job
+            failed = Job.query.filter_by(kind='match_email', batch_key='second@example.com').one_or_none()
+            expect("failed job requeued", (failed.attempts, failed.last_error.split(':')[0]) if failed else None,
+                   (1, 'ConnectionRefusedError'))
+            expect("retry is backed off", failed is not None and failed.run_at > failed.started_at, True)
+            app.extensions['mail'] = mail
+            logging.getLogger('jobs').disabled = False
+            Job.query.filter_by(status='queued').update({"run_at": failed.started_at})
+            app_module.db.session.commit()
+            drain()
+            expect("retry delivered", [m['subject'] for m in mail.messages() if m['to'] == 'second@example.com'],
+                   ["A found item may match your lost item"])
+
+            # A worker that dies holding a lease: the job comes back once the lease expires
+            queue.enqueue(engine, 'reconcile_stats', {})
+            kind, rows = queue.claim(engine)
+            queue.lease_seconds, lease = 0, queue.lease_seconds
+            time.sleep(0.01)
+            expect("expired lease requeued", (kind, queue.requeue_expired(engine)), ('reconcile_stats', 1))
+            queue.lease_seconds = lease
+            drain()
+
+            # Latency: enqueue only, vs. the same work done in the request before it returns
+            post_latency(client, rng, 20)
+            drain()
+            queued = post_latency(client, rng, args.requests)
+            started = time.perf_counter()
+            drain()
+            worker_ms = (time.perf_counter() - started) * 1000
+            app.config['MATCH_NOTIFY'] = False
+            original = app_module.create_item
+
+            def inline(*view_args):
+                response = original(*view_args)
+                payload = response[0].get_json()
+                app_module.find_matches_job({"item_id": payload['item']['id']})
+                drain()
+                return response
+            app.view_functions['api.create_item'] = inline
+            inline_samples = post_latency(client, rng, args.requests)
+            app.view_functions['api.create_item'] = original
+            app.config['MATCH_NOTIFY'] = True
+            for label, samples in (("queued", queued), ("inline", inline_samples)):
+                print(f"POST /api/items {label:<7} p50 {percentile(samples, 0.50):6.2f} ms  p95 {percentile(samples, 0.95):6.2f} ms")
+            print(f"worker drained {args.requests} find_matches jobs in {worker_ms:.0f} ms")
+
+            stats = client.get('/api/jobs').get_json()
+            expect("queue empty", stats['queued'], 0)
+            expect("kinds with latency", sorted(stats['latency']), ['find_matches', 'match_email', 'reconcile_stats'])
+            print(json.dumps(stats['latency']['find_matches']))
+            engine.dispose()
+
+    if failures:
+        print(f"{len(failures)} check(s) failed")
+        sys.exit(1)
+    print("Job queue checks passed")
+
+if __name__ == '__main__':
+    main()
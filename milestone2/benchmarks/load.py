@@ -0,0 +1,209 @@
+# Load driver: replays a weighted endpoint mix at fixed concurrency and saves a JSON report
+# Usage (from milestone2/):
+#   python -m benchmarks.load --target http://localhost:5001 --concurrency 16 --duration 30
+#   python -m benchmarks.load --database-url sqlite:///bench.db --concurrency 8 --duration 15   (in-process test client)
+# Compare two runs with: python -m benchmarks.report baseline.json candidate.json
+import argparse
+import http.client
+import json
+import os
+import subprocess
+import threading
+import time
+from datetime import datetime
+from urllib.parse import urlsplit
+
+from benchmarks.common import load_app, prepare_schema
+from benchmarks.report import summarize, print_summary
+from benchmarks.synthetic import item_payload, search_term, new_rng
+
+DEFAULT_MIX = {
+    'list': 35,
+    'get': 25,
+    'search': 15,
+    'stats': 10,
+    'create': 8,
+    'update': 5,
+    'delete': 2
+}
+RESULTS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'results')
+
+class HttpClient:
+    """One keep-alive connection per worker thread to a running server."""
+
+    def __init__(self, base_url):
+        parts = urlsplit(base_url)
+        self.host, self.port = parts.hostname, parts.port or 80
+        self.connection = None
+
+    def request(self, method, path, body=None, headers=None):
+        payload = json.dumps(body) if body is not None else None
+        headers = dict(headers or {})
+        if payload is not None:
+            headers['Content-Type'] = 'application/json'
+        for attempt in range(2):
+            if self.connection is None:
+                self.connection = http.client.HTTPConnection(self.host, self.port, timeout=30)
+            try:
+                self.connection.request(method, path, body=payload, headers=headers)
+                response = self.connection.getresponse()
+                data = response.read()
+                return response.status, data
+            except (http.client.HTTPException, ConnectionError):
+                self.connection.close()
+                self.connection = None
+                if attempt:
+                    raise
+
+class TestClient:
+    """Flask test client against the app module, no network involved."""
+
+    def __init__(self, app):
+        self.client = app.test_client()
+
+    def request(self, method, path, body=None):
+        response = self.client.open(path, method=method, json=body)
+        return response.status_code, response.get_data()
+
+class SharedState:
+    def __init__(self, max_id):
+        self.max_id = max(max_id, 1)
+        self.created = []
+        self.lock = threading.Lock()
+
+    def remember(self, item_id):
+        with self.lock:
+            self.created.append(item_id)
+            self.max_id = max(self.max_id, item_id)
+
+    def take_created(self):
+        with self.lock:
+            return self.created.pop() if self.created else None
+
+def run_operation(name, client, rng, state):
+    if name == 'list':
+        query = rng.choice(['', '?type=lost', '?type=found', '?limit=20'])
+        return client.request('GET', f'/api/items{query}')[0]
+    if name == 'get':
+        return client.request('GET', f'/api/items/{rng.randint(1, state.max_id)}')[0]
+    if name == 'search':
+        return client.request('GET', f'/api/search?q={search_term(rng)}')[0]
+    if name == 'stats':
+        return client.request('GET', '/api/stats')[0]
+    if name == 'create':
+        status, data = client.request('POST', '/api/items', item_payload(rng))
+        if status == 201:
+            state.remember(json.loads(data)['item']['id'])
+        return status
+    if name == 'update':
+        body = {'status': rng.choice(['active', 'resolved'])}
+        return client.request('PUT', f'/api/items/{rng.randint(1, state.max_id)}', body)[0]
+    if name == 'delete':
+        # Only delete rows this run created, so repeated runs don't hollow out the seeded data
+        item_id = state.take_created()
+        if item_id is None:
+            return client.request('GET', '/api/stats')[0]
+        return client.request('DELETE', f'/api/items/{item_id}')[0]
+    raise ValueError(f"Unknown operation {name}")
+
+def worker(worker_id, make_client, mix, state, deadline, max_requests, counter, samples, seed):
+    rng = new_rng(seed + worker_id)
+    client = make_client()
+    names = list(mix)
+    weights = [mix[name] for name in names]
+    local = []
+    while time.perf_counter() < deadline:
+        if max_requests:
+            with counter['lock']:
+                if counter['issued'] >= max_requests:
+                    break
+                counter['issued'] += 1
+        name = rng.choices(names, weights)[0]
+        started = time.perf_counter()
+        try:
+            status = run_operation(name, client, rng, state)
+        except Exception:
+            status = 0  # connection failure or timeout
+        local.append((name, status, time.perf_counter() - started))
+    samples.extend(local)
+
+def parse_mix(raw):
+    if not raw:
+        return dict(DEFAULT_MIX)
+    mix = {}
+    for part in raw.split(','):
+        name, _, weight = part.partition('=')
+        if name not in DEFAULT_MIX:
+            raise SystemExit(f"Unknown operation in --mix: {name}")
+        mix[name] = float(weight)
+    return mix
+
+def git_commit():
+    try:
+        return subprocess.check_output(['git', 'rev-parse', '--short', 'HEAD'], stderr=subprocess.DEVNULL).decode().strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+def main():
+    parser = argparse.ArgumentParser(description="Replay a weighted endpoint mix at fixed concurrency")
+    target = parser.add_mutually_exclusive_group(required=True)
+    target.add_argument('--target', help='base URL of a running server, e.g. http://localhost:5001')
+    target.add_argument('--database-url', help='run in-process with the Flask test client against this database')
+    parser.add_argument('--concurrency', type=int, default=8)
+    parser.add_argument('--duration', type=float, default=15, help='seconds')
+    parser.add_argument('--requests', type=int, default=0, help='stop after this many requests (0 = duration only)')
+    parser.add_argument('--mix', help='e.g. list=50,get=30,search=20 (default: %s)' %
+                        ','.join(f'{name}={weight}' for name, weight in DEFAULT_MIX.items()))
+    parser.add_argument('--seed', type=int, default=498)
+    parser.add_argument('--output', help='JSON report path (default: benchmarks/results/<timestamp>.json)')
+    args = parser.parse_args()
+
+    mix = parse_mix(args.mix)
+    if args.target:
+        make_client = lambda: HttpClient(args.target)
+    else:
+        app_module, app = load_app(args.database_url)
+        with app.app_context():
+            prepare_schema(app_module)
+        make_client = lambda: TestClient(app)
+
+    status, data = make_client().request('GET', '/api/items?limit=1&fields=id')
+    newest = json.loads(data)['items'] if status == 200 else []
+    state = SharedState(newest[0]['id'] if newest else 1)
+
+    samples = []
+    counter = {'issued': 0, 'lock': threading.Lock()}
+    started_at = datetime.utcnow()
+    started = time.perf_counter()
+    deadline = started + args.duration
+    threads = [
+        threading.Thread(target=worker, args=(i, make_client, mix, state, deadline, args.requests, counter, samples, args.seed))
+        for i in range(args.concurrency)
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - started
+
+    report = {
+        "meta": {
+            "started_at": started_at.isoformat(),
+            "git_commit": git_commit(),
+            "target": args.target or args.database_url,
+            "concurrency": args.concurrency,
+            "duration_seconds": round(elapsed, 3),
+            "mix": mix
+        },
+        **summarize(samples, elapsed)
+    }
+    print_summary(report)
+
+    output = args.output or os.path.join(RESULTS_DIR, f"load-{started_at.strftime('%Y%m%d-%H%M%S')}.json")
+    os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+    with open(output, 'w') as f:
+        json.dump(report, f, indent=2)
+    print(f"Saved {output}")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,67 @@
+# Recall/latency benchmark for the lost/found matching index on a synthetic corpus
+# Usage (from milestone2/): python -m benchmarks.match_benchmark [--found 20000] [--queries 1000] [--k 10]
+import argparse
+import random
+import statistics
+import time
+
+from matching import MatchIndex
+from benchmarks.common import percentile
+from benchmarks.synthetic import make_item
+
+def typo(word, rng):
+    if len(word) < 4:
+        return word
+    i = rng.randrange(1, len(word) - 1)
+    return word[:i] + word[i + 1] + word[i] + word[i + 2:]
+
+def perturb(text, rng):
+    # How a different person might describe the same object: dropped words, reordering and typos
+    words = [word for word in text.split() if rng.random() > 0.2] or text.split()
+    if rng.random() < 0.5:
+        rng.shuffle(words)
+    return ' '.join(typo(word, rng) if rng.random() < 0.15 else word for word in words)
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--found', type=int, default=20000, help='number of indexed found items')
+    parser.add_argument('--queries', type=int, default=1000, help='number of lost-item queries')
+    parser.add_argument('--k', type=int, default=10)
+    parser.add_argument('--seed', type=int, default=498)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    corpus = [(item_id, 'found') + make_item(rng) for item_id in range(1, args.found + 1)]
+
+    index = MatchIndex()
+    started = time.perf_counter()
+    index.rebuild(corpus)
+    build_seconds = time.perf_counter() - started
+
+    hits_at_1 = hits_at_k = 0
+    latencies = []
+    for _ in range(args.queries):
+        target_id, _, title, description = rng.choice(corpus)
+        query_title, query_description = perturb(title, rng), perturb(description, rng)
+        started = time.perf_counter()
+        ranked = index.match('lost', query_title, query_description, k=args.k)
+        latencies.append((time.perf_counter() - started) * 1000)
+        ids = [item_id for item_id, _ in ranked]
+        hits_at_1 += bool(ids) and ids[0] == target_id
+        hits_at_k += target_id in ids
+
+    # Incremental maintenance cost: one add + one remove per write
+    started = time.perf_counter()
+    for item_id in range(args.found + 1, args.found + 1001):
+        index.add(item_id, 'found', *make_item(rng))
+        index.remove(item_id)
+    update_ms = (time.perf_counter() - started)  # seconds for 1000 writes == ms per write
+
+    print(f"Indexed {args.found} found items in {build_seconds:.2f} s")
+    print(f"Queries: {args.queries}  recall@1: {hits_at_1 / args.queries:.3f}  recall@{args.k}: {hits_at_k / args.queries:.3f}")
+    print(f"Latency ms  p50: {percentile(latencies, 0.5):.2f}  p95: {percentile(latencies, 0.95):.2f}  "
+          f"p99: {percentile(latencies, 0.99):.2f}  mean: {statistics.mean(latencies):.2f}")
+    print(f"Incremental add+remove: {update_ms:.3f} ms per write")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,143 @@
+# Query-plan regression check: EXPLAIN the SQL behind each hot endpoint on a seeded database
+# tests/test_query_plans.py runs it on every test run against a fresh SQLite database; this CLI runs it against
+# any seeded database, e.g. a PostgreSQL one:
+#   python -m benchmarks.seed --database-url sqlite:///bench.db --items 100000
+#   python -m benchmarks.plan_check --database-url sqlite:///bench.db
+# The statements are captured from real requests through the test client, so the check follows the code.
+# Exits 1 if a plan scans a whole items/reports/users table, or sorts where an index should give the order.
+import argparse
+import json
+import sys
+
+from sqlalchemy import event
+from benchmarks.common import load_app, prepare_schema
+
+LARGE_TABLES = ('items', 'reports', 'users')
+
+def next_page(client, path):
+    cursor = client.get(path).get_json()['next_cursor']
+    return f"{path}&cursor={cursor}" if cursor else path
+
+# (label, path or callable(client) -> path, sort allowed). Ranked search orders by relevance, which no index holds.
+HOT_QUERIES = [
+    ('items: newest', '/api/items', False),
+    ('items: page 2', lambda client: next_page(client, '/api/items?limit=20'), False),
+    ('items: by type', '/api/items?type=lost', False),
+    ('items: by type, page 2', lambda client: next_page(client, '/api/items?type=found&limit=20'), False),
+    ('items: active', '/api/items?status=active', False),
+    ('items: active by type', '/api/items?type=lost&status=active', False),
+    ('items: resolved', '/api/items?status=resolved', False),
+    ('items: by city', '/api/items?city=Evanston', False),
+    ('items: date range', '/api/items?from=2026-01-01&to=2026-01-31', True),
+    ('items: histogram', '/api/items/histogram?from=2025-10-01&to=2026-09-30', False),
+    ('items: weekly histogram', '/api/items/histogram?bucket=week&type=lost&from=2025-10-01&to=2026-09-30', False),
+    ('items: detail', '/api/items/1', False),
+    ('items: nearby', '/api/items/nearby?zip=60208&radius_km=2', False),
+    ('items: list search', '/api/items?search=wallet', True),
+    ('search', '/api/search?q=wallet', True),
+    ('stats', '/api/stats', False),
+    ('reports: newest', '/api/reports', False),
+    ('reports: page 2', lambda client: next_page(client, '/api/reports?limit=20'), False),
+    ('users: newest', '/api/users', False)
+]
+
+def capture_selects(engine, client, path):
+    statements = []
+
+    def capture(conn, cursor, statement, parameters, context, executemany):
+        if statement.lstrip().upper().startswith(('SELECT', 'WITH')):
+            statements.append((statement, parameters))
+
+    event.listen(engine, 'before_cursor_execute', capture)
+    try:
+        response = client.get(path)
+    finally:
+        event.remove(engine, 'before_cursor_execute', capture)
+    return response.status_code, statements
+
+def postgres_problems(conn, statement, parameters, allow_sort):
+    plan = conn.exec_driver_sql("EXPLAIN (FORMAT JSON) " + statement, parameters).scalar()
+    if isinstance(plan, str):
+        plan = json.loads(plan)
+    problems, lines = [], []
+
+    def walk(node, depth):
+        lines.append('  ' * depth + node['Node Type'] + (f" on {node['Relation Name']}" if 'Relation Name' in node else ''))
+        if node['Node Type'] == 'Seq Scan' and node.get('Relation Name') in LARGE_TABLES:
+            problems.append(f"sequential scan on {node['Relation Name']}")
+        if node['Node Type'] in ('Sort', 'Incremental Sort') and not allow_sort:
+            problems.append(f"sort on {', '.join(node.get('Sort Key', []))}")
+        for child in node.get('Plans', []):
+            walk(child, depth + 1)
+
+    walk(plan[0]['Plan'], 0)
+    return problems, lines
+
+def sqlite_problems(conn, statement, parameters, allow_sort):
+    rows = conn.exec_driver_sql("EXPLAIN QUERY PLAN " + statement, parameters).all()
+    problems, lines = [], []
+    for row in rows:
+        detail = row[-1]
+        lines.append(detail)
+        # "SCAN items" reads the whole table, unless it walks rowid order under a LIMIT (ORDER BY id);
+        # "SCAN items USING INDEX ..." walks an index in order
+        for table in LARGE_TABLES:
+            if detail == f"SCAN {table}" and not (f"ORDER BY {table}.id" in statement and 'LIMIT' in statement):
+                problems.append(detail)
+        if 'USE TEMP B-TREE FOR ORDER BY' in detail and not allow_sort:
+            problems.append(detail)
+    return problems, lines
+
+def check_plans(app_module, app):
+    """Yield (label, path, problems, plans) for each hot query, plans being one list of lines per statement.
+
+    Needs an app context; the schema and migrations are brought up to date first.
+    """
+    prepare_schema(app_module)
+    engine = app_module.db.engine
+    with engine.begin() as conn:
+        for table in LARGE_TABLES:
+            conn.exec_driver_sql(f"ANALYZE {table}")
+    explain = postgres_problems if engine.dialect.name == 'postgresql' else sqlite_problems
+    client = app.test_client()
+
+    for label, path, allow_sort in HOT_QUERIES:
+        if callable(path):
+            path = path(client)
+        status, statements = capture_selects(engine, client, path)
+        problems, plans = [], []
+        with engine.connect() as conn:
+            for statement, parameters in statements:
+                statement_problems, lines = explain(conn, statement, parameters, allow_sort)
+                problems += statement_problems
+                plans.append(lines)
+        if status != 200:
+            problems.append(f"HTTP {status}")
+        yield label, path, problems, plans
+
+def main():
+    parser = argparse.ArgumentParser(description="Fail on sequential scans or sorts in hot query plans")
+    parser.add_argument('--database-url', required=True, help='seeded database, see benchmarks.seed')
+    parser.add_argument('--verbose', action='store_true', help='print every plan')
+    args = parser.parse_args()
+
+    app_module, app = load_app(args.database_url, CACHE_MAX_ENTRIES=0)
+    failures = 0
+    with app.app_context():
+        for label, path, problems, plans in check_plans(app_module, app):
+            failures += bool(problems)
+            print(f"{'FAIL' if problems else 'ok':<5} {label:<24} {path}")
+            for problem in problems:
+                print(f"        {problem}")
+            if args.verbose or problems:
+                for lines in plans:
+                    for line in lines:
+                        print(f"          | {line}")
+
+    if failures:
+        print(f"{failures} hot quer{'y' if failures == 1 else 'ies'} with a scan or sort")
+        sys.exit(1)
+    print("All hot query plans use indexes")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,96 @@
+# Read-replica routing check on local SQLite databases: one primary and two read-only copies of it
+# Usage (from milestone2/): python -m benchmarks.replica_check
+# Each copy gets a different title on item 1, so every response shows which database served it. Checks the
+# round-robin, read-your-writes after a POST, fallback when a replica fails its health check, and that writes
+# land on the primary. Exits 1 on any failure.
+# To run the app the same way: DATABASE_URL=sqlite:////tmp/primary.db \
+#   DATABASE_REPLICA_URLS="sqlite:///file:/tmp/replica_1.db?mode=ro&uri=true" python "Lab 5 app.py"
+import argparse
+import os
+import shutil
+import sqlite3
+import sys
+import tempfile
+import time
+
+from benchmarks.common import load_app, prepare_schema
+
+ITEM = {"title": "Red Backpack", "description": "Red backpack with a laptop", "type": "lost",
+        "address": "1 Main St", "city": "Evanston", "zipCode": "60208", "email": "owner@example.com"}
+
+def served_by(client):
+    return client.get('/api/items/1').get_json()['title']
+
+def main():
+    parser = argparse.ArgumentParser(description="Check read-replica routing, stickiness and fallback")
+    parser.add_argument('--sticky-seconds', type=float, default=0.5)
+    args = parser.parse_args()
+
+    failures = []
+
+    def expect(label, actual, expected):
+        ok = actual == expected
+        print(f"{'ok' if ok else 'FAIL':<5} {label}: {actual}")
+        if not ok:
+            failures.append(label)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        primary = os.path.join(tmp, 'primary.db')
+        replicas = [os.path.join(tmp, f'replica_{n}.db') for n in (1, 2)]
+
+        app_module, app = load_app(f'sqlite:///{primary}', CACHE_MAX_ENTRIES=0)
+        with app.app_context():
+            prepare_schema(app_module)
+            app_module.init_sample_data()
+            app_module.db.engine.dispose()
+        for n, path in enumerate(replicas, start=1):
+            shutil.copyfile(primary, path)
+            with sqlite3.connect(path) as conn:
+                conn.execute("UPDATE items SET title = ? WHERE id = 1", (f'replica_{n}',))
+
+        app_module, app = load_app(
+            f'sqlite:///{primary}', CACHE_MAX_ENTRIES=0, REPLICA_STICKY_SECONDS=args.sticky_seconds,
+            DATABASE_REPLICA_URLS=[f'sqlite:///file:{path}?mode=ro&uri=true' for path in replicas]
+        )
+        router = app.extensions['replicas']
+        router.check_all()
+        reader, writer = app.test_client(), app.test_client()
+
+        expect("round-robin", sorted(served_by(reader) for _ in range(4)), ['replica_1', 'replica_1', 'replica_2', 'replica_2'])
+        expect("list reads", {reader.get('/api/items').get_json()['items'][-1]['title'] for _ in range(2)}, {'replica_1', 'replica_2'})
+
+        created = writer.post('/api/items', json=ITEM)
+        expect("write status", created.status_code, 201)
+        new_id = created.get_json()['item']['id']
+        expect("write went to primary", sqlite3.connect(primary).execute(
+            "SELECT title FROM items WHERE id = ?", (new_id,)).fetchone(), (ITEM['title'],))
+        expect("writer reads own write", writer.get(f'/api/items/{new_id}').status_code, 200)
+        expect("writer reads primary", served_by(writer), 'Black Umbrella')
+        expect("other clients read replicas", reader.get(f'/api/items/{new_id}').status_code, 404)
+        time.sleep(args.sticky_seconds + 0.1)
+        expect("stickiness expires", served_by(writer).startswith('replica_'), True)
+
+        # An open SQLite handle outlives its file; drop the pooled connections so the next check reconnects
+        os.remove(replicas[1])
+        router.engines['replica_2'].dispose()
+        router.check_all()
+        expect("unhealthy replica skipped", {served_by(reader) for _ in range(4)}, {'replica_1'})
+        os.remove(replicas[0])
+        router.engines['replica_1'].dispose()
+        router.check_all()
+        expect("primary fallback", served_by(reader), 'Black Umbrella')
+        expect("replica status", {key: status['healthy'] for key, status in
+                                  reader.get('/api/replicas').get_json()['replicas'].items()},
+               {'replica_1': False, 'replica_2': False})
+
+        with app.app_context():
+            for engine in app_module.db.engines.values():
+                engine.dispose()
+
+    if failures:
+        print(f"{len(failures)} check(s) failed")
+        sys.exit(1)
+    print("Replica routing checks passed")
+
+if __name__ == '__main__':
+    main()
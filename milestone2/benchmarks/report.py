@@ -0,0 +1,89 @@
+# Summaries and regression comparison for load-test results
+# Usage (from milestone2/): python -m benchmarks.report baseline.json candidate.json [--threshold 10]
+import argparse
+import json
+import statistics
+import sys
+from collections import defaultdict
+
+from benchmarks.common import percentile
+
+def _latency_stats(latencies, count, errors, elapsed):
+    milliseconds = [latency * 1000 for latency in latencies]
+    return {
+        "requests": count,
+        "errors": errors,
+        "throughput_rps": round(count / elapsed, 2) if elapsed else 0.0,
+        "p50_ms": round(percentile(milliseconds, 0.50), 3),
+        "p95_ms": round(percentile(milliseconds, 0.95), 3),
+        "p99_ms": round(percentile(milliseconds, 0.99), 3),
+        "mean_ms": round(statistics.mean(milliseconds), 3),
+        "max_ms": round(max(milliseconds), 3)
+    }
+
+def summarize(samples, elapsed):
+    """samples: (operation, status, seconds) tuples. Errors are 5xx responses and connection failures."""
+    by_operation = defaultdict(list)
+    for sample in samples:
+        by_operation[sample[0]].append(sample)
+
+    endpoints = {}
+    for name, rows in sorted(by_operation.items()):
+        statuses = defaultdict(int)
+        for _, status, _ in rows:
+            statuses[str(status)] += 1
+        errors = sum(1 for _, status, _ in rows if status == 0 or status >= 500)
+        endpoints[name] = dict(_latency_stats([row[2] for row in rows], len(rows), errors, elapsed), statuses=dict(statuses))
+
+    overall = _latency_stats([row[2] for row in samples], len(samples),
+                             sum(endpoint["errors"] for endpoint in endpoints.values()), elapsed) if samples else {}
+    return {"overall": overall, "endpoints": endpoints}
+
+def print_summary(report):
+    print(f"{'operation':<10} {'requests':>9} {'errors':>7} {'req/s':>9} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9}")
+    rows = list(report["endpoints"].items()) + [("overall", report["overall"])]
+    for name, stats in rows:
+        if not stats:
+            continue
+        print(f"{name:<10} {stats['requests']:>9} {stats['errors']:>7} {stats['throughput_rps']:>9.1f} "
+              f"{stats['p50_ms']:>9.2f} {stats['p95_ms']:>9.2f} {stats['p99_ms']:>9.2f}")
+
+def compare(baseline, candidate, threshold):
+    """Print per-operation deltas; returns the list of regressions beyond threshold percent."""
+    regressions = []
+    names = sorted(set(baseline["endpoints"]) | set(candidate["endpoints"])) + ["overall"]
+    print(f"{'operation':<10} {'p95 base':>10} {'p95 new':>10} {'delta':>8} {'rps base':>10} {'rps new':>10} {'delta':>8}")
+    for name in names:
+        old = baseline["overall"] if name == "overall" else baseline["endpoints"].get(name)
+        new = candidate["overall"] if name == "overall" else candidate["endpoints"].get(name)
+        if not old or not new:
+            continue
+        p95_delta = (new["p95_ms"] - old["p95_ms"]) / old["p95_ms"] * 100 if old["p95_ms"] else 0.0
+        rps_delta = (new["throughput_rps"] - old["throughput_rps"]) / old["throughput_rps"] * 100 if old["throughput_rps"] else 0.0
+        flag = ''
+        if p95_delta > threshold or rps_delta < -threshold or new["errors"] > old["errors"]:
+            flag = '  REGRESSION'
+            regressions.append(name)
+        print(f"{name:<10} {old['p95_ms']:>10.2f} {new['p95_ms']:>10.2f} {p95_delta:>+7.1f}% "
+              f"{old['throughput_rps']:>10.1f} {new['throughput_rps']:>10.1f} {rps_delta:>+7.1f}%{flag}")
+    return regressions
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare two load-test JSON reports")
+    parser.add_argument('baseline')
+    parser.add_argument('candidate')
+    parser.add_argument('--threshold', type=float, default=10.0, help='allowed p95/throughput change in percent')
+    args = parser.parse_args()
+
+    with open(args.baseline) as f:
+        baseline = json.load(f)
+    with open(args.candidate) as f:
+        candidate = json.load(f)
+    regressions = compare(baseline, candidate, args.threshold)
+    if regressions:
+        print(f"Regressions beyond {args.threshold:g}%: {', '.join(regressions)}")
+        sys.exit(1)
+    print("No regressions")
+
+if __name__ == '__main__':
+    main()
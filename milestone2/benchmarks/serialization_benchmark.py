@@ -0,0 +1,68 @@
+# Microbenchmark: ORM hydration + hand-built dicts vs. column-level serializers on the item list
+# Usage (from milestone2/): python -m benchmarks.serialization_benchmark [--items 20000] [--page 5000] [--repeat 20]
+import argparse
+import time
+
+from benchmarks.common import load_app, percentile
+
+def orm_page(app_module, page):
+    # The pre-serializer path: full Item instances, attributes copied by hand
+    Item = app_module.Item
+    items = Item.query.order_by(Item.created_at.desc(), Item.id.desc()).limit(page).all()
+    result = [{
+        "id": item.id,
+        "title": item.title,
+        "description": item.description,
+        "type": item.type,
+        "location": item.location,
+        "email": item.email,
+        "date": item.date or item.created_at.strftime('%B %d'),
+        "status": item.status,
+        "created_at": item.created_at.isoformat()
+    } for item in items]
+    app_module.db.session.expunge_all()
+    return result
+
+def serializer_page(app_module, page, fields):
+    Item = app_module.Item
+    query, to_dict = app_module.item_list_serializer.select(app_module.db.session, fields)
+    rows = query.order_by(Item.created_at.desc(), Item.id.desc()).limit(page).all()
+    return [to_dict(row) for row in rows]
+
+def measure(label, fn, repeat):
+    fn()  # warm-up
+    samples = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - started) * 1000)
+    print(f"{label:<34} p50 {percentile(samples, 0.5):8.2f} ms   p95 {percentile(samples, 0.95):8.2f} ms")
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--items', type=int, default=20000)
+    parser.add_argument('--page', type=int, default=5000, help='rows serialized per call')
+    parser.add_argument('--repeat', type=int, default=20)
+    parser.add_argument('--database-url', default='sqlite://')
+    args = parser.parse_args()
+
+    app_module, app = load_app(args.database_url)
+    db = app_module.db
+    with app.app_context():
+        db.create_all()
+        if app_module.Item.query.count() < args.items:
+            rows = [app_module.item_values({
+                "title": f"Item {i}", "description": f"Synthetic description {i}", "type": 'lost' if i % 2 else 'found',
+                "address": "1 Main St", "city": "Evanston", "zipCode": "60208", "email": "bench@example.com"
+            }) for i in range(args.items)]
+            for start in range(0, len(rows), 1000):
+                app_module.insert_rows(db.session, app_module.Item.__table__, rows[start:start + 1000])
+
+        print(f"{args.page} rows per call, {args.repeat} runs")
+        measure("ORM hydration (all fields)", lambda: orm_page(app_module, args.page), args.repeat)
+        default_fields = app_module.item_list_serializer.default_fields
+        measure("serializer (default fields)", lambda: serializer_page(app_module, args.page, default_fields), args.repeat)
+        measure("serializer (fields=id,title)", lambda: serializer_page(app_module, args.page, ['id', 'title']), args.repeat)
+
+if __name__ == '__main__':
+    main()
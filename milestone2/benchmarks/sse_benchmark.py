@@ -0,0 +1,115 @@
+# Change-feed fan-out: many idle /api/items/stream subscribers on one uvicorn worker, then one write
+# Usage (from milestone2/): python -m benchmarks.sse_benchmark [--subscribers 2000] [--database-url sqlite:///sse.db]
+# Reports the server's thread count and RSS with the subscribers connected, the delay from POST /api/items
+# to each subscriber receiving its 'created' event, and whether a reconnect with Last-Event-ID replays the
+# event it missed. Needs a file descriptor limit above the subscriber count (ulimit -n).
+import argparse
+import asyncio
+import json
+import time
+import urllib.request
+from types import SimpleNamespace
+
+from benchmarks.asgi_benchmark import start_server
+from benchmarks.common import load_app, prepare_schema, percentile
+from benchmarks.synthetic import item_payload, new_rng
+
+def process_status(pid):
+    status = {}
+    with open(f'/proc/{pid}/status') as f:
+        for line in f:
+            name, _, value = line.partition(':')
+            status[name] = value.strip()
+    return int(status['Threads']), int(status['VmRSS'].split()[0]) / 1024
+
+def post_item(port, rng):
+    request = urllib.request.Request(
+        f'http://127.0.0.1:{port}/api/items', data=json.dumps(item_payload(rng)).encode(),
+        headers={'Content-Type': 'application/json'}, method='POST'
+    )
+    with urllib.request.urlopen(request, timeout=10) as response:
+        return json.loads(response.read())['item']['id']
+
+async def subscribe(port, last_event_id=None):
+    reader, writer = await asyncio.open_connection('127.0.0.1', port)
+    resume = f'Last-Event-ID: {last_event_id}\r\n' if last_event_id else ''
+    writer.write(f'GET /api/items/stream HTTP/1.1\r\nHost: bench\r\n{resume}\r\n'.encode())
+    await writer.drain()
+    while not (await reader.readline()).startswith(b'retry:'):
+        pass
+    return reader, writer
+
+async def next_event(reader):
+    """(id, name, data) of the next event on the stream; chunked-encoding size lines are skipped."""
+    event_id = name = None
+    while True:
+        line = (await reader.readline()).decode().rstrip('\r\n')
+        if line.startswith('id: '):
+            event_id = line[4:]
+        elif line.startswith('event: '):
+            name = line[7:]
+        elif line.startswith('data: '):
+            return event_id, name, json.loads(line[6:])
+
+async def run(args, pid):
+    loop = asyncio.get_running_loop()
+    rng = new_rng(args.seed)
+    threads_before, rss_before = process_status(pid)
+
+    subscribers = []
+    for start in range(0, args.subscribers, 200):
+        subscribers += await asyncio.gather(*[subscribe(args.port) for _ in range(start, min(start + 200, args.subscribers))])
+    await asyncio.sleep(1)
+    threads_after, rss_after = process_status(pid)
+
+    async def receive(reader):
+        event = await next_event(reader)
+        return time.perf_counter(), event
+
+    waiting = [asyncio.create_task(receive(reader)) for reader, _ in subscribers]
+    posted = time.perf_counter()
+    item_id = await loop.run_in_executor(None, post_item, args.port, rng)
+    received = await asyncio.gather(*waiting)
+    delays = [(at - posted) * 1000 for at, _ in received]
+    delivered = sum(1 for _, (_, name, data) in received if name == 'created' and data['id'] == item_id)
+
+    # Reconnect one subscriber after a write it missed, resuming from the event it last saw
+    last_id = received[0][1][0]
+    subscribers[0][1].close()
+    missed_id = await loop.run_in_executor(None, post_item, args.port, rng)
+    reader, writer = await subscribe(args.port, last_id)
+    _, name, data = await asyncio.wait_for(next_event(reader), 5)
+    writer.close()
+    for _, subscriber in subscribers[1:]:
+        subscriber.close()
+
+    print(f"{args.subscribers} idle subscribers on one uvicorn worker")
+    print(f"server threads  {threads_before} -> {threads_after}")
+    print(f"server RSS      {rss_before:.1f} -> {rss_after:.1f} MiB ({(rss_after - rss_before) * 1024 / args.subscribers:.1f} KiB per subscriber)")
+    print(f"delivered       {delivered}/{args.subscribers}")
+    print(f"fan-out ms      p50 {percentile(delays, 0.50):.1f}  p99 {percentile(delays, 0.99):.1f}  max {max(delays):.1f}")
+    print(f"resume          {'ok' if name == 'created' and data['id'] == missed_id else f'FAIL ({name} {data})'}")
+
+def main():
+    parser = argparse.ArgumentParser(description="Idle SSE subscribers and write-to-event fan-out latency")
+    parser.add_argument('--database-url', default='sqlite:///sse_bench.db', help='file database (not in-memory)')
+    parser.add_argument('--subscribers', type=int, default=2000)
+    parser.add_argument('--port', type=int, default=5111)
+    parser.add_argument('--seed', type=int, default=498)
+    args = parser.parse_args()
+
+    app_module, app = load_app(args.database_url)
+    with app.app_context():
+        prepare_schema(app_module)
+        # The server resolves relative SQLite paths the same way; hand it the absolute URL
+        database_url = str(app_module.db.engine.url)
+
+    process, _ = start_server('asgi', args.port, SimpleNamespace(database_url=database_url, workers=1, threads=1))
+    try:
+        asyncio.run(run(args, process.pid))
+    finally:
+        process.terminate()
+        process.wait()
+
+if __name__ == '__main__':
+    main()
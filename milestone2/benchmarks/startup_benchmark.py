@@ -0,0 +1,46 @@
+# Cold-start benchmark: module import, create_app() and time-to-first-request, each in a fresh interpreter
+# Usage (from milestone2/): python -m benchmarks.startup_benchmark [--runs 10] [--database-url sqlite:///bench.db]
+import argparse
+import json
+import statistics
+import subprocess
+import sys
+
+from benchmarks.common import APP_DIR
+
+# Runs in the child process; prints one JSON line of timings in seconds
+PROBE = '''
+import json, sys, time
+started = time.perf_counter()
+from benchmarks.common import load_module
+module = load_module()
+imported = time.perf_counter()
+app = module.create_app({'SQLALCHEMY_DATABASE_URI': sys.argv[1]})
+created = time.perf_counter()
+response = app.test_client().get('/api/items?limit=1')
+first = time.perf_counter()
+print(json.dumps({"import": imported - started, "create_app": created - imported,
+                  "first_request": first - created, "total": first - started, "status": response.status_code}))
+'''
+
+def run_probe(database_url):
+    output = subprocess.check_output([sys.executable, '-c', PROBE, database_url], cwd=APP_DIR)
+    return json.loads(output.decode().strip().splitlines()[-1])
+
+def main():
+    parser = argparse.ArgumentParser(description="Measure cold start and time-to-first-request")
+    parser.add_argument('--runs', type=int, default=10)
+    parser.add_argument('--database-url', default='sqlite:///startup_bench.db',
+                        help='database already set up with init-db (the first request reads items)')
+    args = parser.parse_args()
+
+    runs = [run_probe(args.database_url) for _ in range(args.runs)]
+    statuses = sorted({run['status'] for run in runs})
+    print(f"{args.runs} cold starts against {args.database_url} (first request status: {statuses})")
+    print(f"{'phase':<14} {'median ms':>10} {'min ms':>10} {'max ms':>10}")
+    for phase in ('import', 'create_app', 'first_request', 'total'):
+        values = [run[phase] * 1000 for run in runs]
+        print(f"{phase:<14} {statistics.median(values):>10.1f} {min(values):>10.1f} {max(values):>10.1f}")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,46 @@
+# Synthetic lost & found data shared by the seeding CLI, load driver and benchmarks
+import random
+from datetime import datetime, timedelta
+
+COLORS = ['black', 'blue', 'red', 'green', 'white', 'silver', 'brown', 'pink', 'grey', 'navy', 'purple', 'orange']
+OBJECTS = ['iphone', 'wallet', 'backpack', 'umbrella', 'jacket', 'keys', 'laptop', 'airpods', 'water bottle',
+           'scarf', 'headphones', 'id card', 'watch', 'sunglasses', 'notebook', 'charger', 'hat', 'glasses case']
+BRANDS = ['apple', 'samsung', 'nike', 'north face', 'patagonia', 'hydro flask', 'sony', 'dell', 'lenovo', 'coach',
+          'ray ban', 'herschel', 'jansport', 'bose', 'fossil', 'casio']
+DETAILS = ['with cracked screen', 'with stickers', 'with a keychain', 'size m', 'size l', 'with name tag',
+           'leather', 'canvas', 'with blue case', 'with student id inside', 'slightly scratched', 'engraved initials',
+           'with red strap', 'zipper broken', 'with charger', 'brand new']
+PLACES = ['library', 'student center', 'gym', 'dining hall', 'lecture hall', 'bus stop', 'cafe', 'lab', 'parking lot']
+STREETS = ['Sheridan Rd', 'Campus Dr', 'Chicago Ave', 'Orrington Ave', 'Davis St', 'Church St', 'Clark St', 'Main St']
+CITIES = [('Evanston', '60208'), ('Evanston', '60201'), ('Evanston', '60202'), ('Chicago', '60611'),
+          ('Chicago', '60614'), ('Chicago', '60637'), ('Skokie', '60076'), ('Wilmette', '60091')]
+
+def make_item(rng):
+    """(title, description) for a random object."""
+    title = f"{rng.choice(COLORS)} {rng.choice(BRANDS)} {rng.choice(OBJECTS)}"
+    description = f"{title} {rng.choice(DETAILS)} {rng.choice(DETAILS)} near the {rng.choice(PLACES)}"
+    return title, description
+
+def item_payload(rng):
+    """Request body for POST /api/items (also valid for /api/reports)."""
+    title, description = make_item(rng)
+    city, zip_code = rng.choice(CITIES)
+    return {
+        "title": title.title(),
+        "description": description.capitalize(),
+        "type": rng.choice(['lost', 'found']),
+        "address": f"{rng.randint(100, 2999)} {rng.choice(STREETS)}",
+        "city": city,
+        "zipCode": zip_code,
+        "email": f"user{rng.randint(1, 99999)}@example.com"
+    }
+
+def random_timestamp(rng, days=365, now=None):
+    now = now or datetime.utcnow()
+    return now - timedelta(seconds=rng.randint(0, days * 86400))
+
+def search_term(rng):
+    return rng.choice(OBJECTS + COLORS + BRANDS).split()[0]
+
+def new_rng(seed):
+    return random.Random(seed)
@@ -0,0 +1,138 @@
+# Round trips and latency of the write endpoints vs the load-then-write handlers they replaced
+# Usage (from milestone2/): python -m benchmarks.write_benchmark [--requests 300] [--rtt-ms 0.5] [--database-url sqlite://]
+# Round trips are counted the way psycopg2 talks to PostgreSQL: every statement, plus BEGIN and COMMIT
+# for non-autocommit transactions. --rtt-ms sleeps once per round trip to stand in for a network hop.
+import argparse
+import statistics
+import time
+
+from flask import jsonify, request
+from sqlalchemy import event
+from benchmarks.common import load_app, prepare_schema, percentile
+from benchmarks.synthetic import item_payload, new_rng
+
+class RoundTrips:
+    def __init__(self, engine, rtt):
+        self.count = 0
+        self.rtt = rtt
+        event.listen(engine, 'before_cursor_execute', self.statement)
+        for name in ('begin', 'commit', 'rollback'):
+            event.listen(engine, name, self.transaction)
+
+    def trip(self):
+        self.count += 1
+        if self.rtt:
+            time.sleep(self.rtt)
+
+    def statement(self, conn, cursor, statement, parameters, context, executemany):
+        self.trip()
+
+    def transaction(self, conn):
+        if conn.get_execution_options().get('isolation_level') != 'AUTOCOMMIT':
+            self.trip()
+
+def add_legacy_routes(app, m):
+    """The previous handlers, minus response formatting: SELECT first, then write through the ORM."""
+    User, Item, db = m.User, m.Item, m.db
+
+    def create_user():
+        data = request.get_json()
+        if User.query.filter_by(username=data['username']).first():
+            return jsonify({"error": "Username already exists"}), 409
+        if User.query.filter_by(email=data['email']).first():
+            return jsonify({"error": "Email already exists"}), 409
+        user = User(username=data['username'], password=data['password'], email=data['email'])
+        db.session.add(user)
+        db.session.commit()
+        return jsonify({"id": user.id}), 201
+
+    def create_item():
+        item = Item(**m.item_values(request.get_json()))
+        db.session.add(item)
+        db.session.commit()
+        m.response_cache.invalidate('item-lists', 'stats')
+        m.index_for_matching(item.id, item.type, item.title, item.description, item.status)
+        return jsonify({"id": item.id}), 201
+
+    def update_item(item_id):
+        item = db.session.get(Item, item_id)
+        if not item:
+            return jsonify({"error": "Item not found"}), 404
+        item.status = request.get_json()['status']
+        db.session.commit()
+        m.response_cache.invalidate('item-lists', 'stats', f'item:{item_id}')
+        m.index_for_matching(item.id, item.type, item.title, item.description, item.status)
+        return jsonify({"id": item.id})
+
+    def delete_item(item_id):
+        item = db.session.get(Item, item_id)
+        if not item:
+            return jsonify({"error": "Item not found"}), 404
+        db.session.delete(item)
+        db.session.commit()
+        m.response_cache.invalidate('item-lists', 'stats', f'item:{item_id}')
+        m.match_index.remove(item_id)
+        return jsonify({"message": "deleted"})
+
+    app.add_url_rule('/legacy/users', 'legacy_create_user', create_user, methods=['POST'])
+    app.add_url_rule('/legacy/items', 'legacy_create_item', create_item, methods=['POST'])
+    app.add_url_rule('/legacy/items/<int:item_id>', 'legacy_update_item', update_item, methods=['PUT'])
+    app.add_url_rule('/legacy/items/<int:item_id>', 'legacy_delete_item', delete_item, methods=['DELETE'])
+
+def run(client, trips, operation, prefix, requests, rng, created):
+    latencies, counts, statuses = [], [], set()
+    for n in range(requests):
+        if operation == 'create user':
+            method, path, body = 'POST', f'{prefix}/users', {
+                "username": f"{prefix.strip('/') or 'api'}_user_{n}", "password": "pw",
+                "email": f"{prefix.strip('/') or 'api'}_user_{n}@example.com"}
+        elif operation == 'create item':
+            method, path, body = 'POST', f'{prefix}/items', item_payload(rng)
+        elif operation == 'update item':
+            method, path, body = 'PUT', f'{prefix}/items/{created[n % len(created)]}', {
+                "status": rng.choice(['active', 'resolved'])}
+        else:
+            method, path, body = 'DELETE', f'{prefix}/items/{created.pop()}', None
+        before = trips.count
+        started = time.perf_counter()
+        response = client.open(path, method=method, json=body)
+        latencies.append((time.perf_counter() - started) * 1000)
+        counts.append(trips.count - before)
+        statuses.add(response.status_code)
+        if operation == 'create item':
+            data = response.get_json()
+            created.append(data['item']['id'] if 'item' in data else data['id'])
+    return {
+        "p50_ms": percentile(latencies, 0.50),
+        "p95_ms": percentile(latencies, 0.95),
+        "round_trips": statistics.mean(counts),
+        "statuses": sorted(statuses)
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare write-path round trips and latency")
+    parser.add_argument('--database-url', default='sqlite://')
+    parser.add_argument('--requests', type=int, default=300, help='requests per operation')
+    parser.add_argument('--rtt-ms', type=float, default=0.5, help='simulated network round trip (0 to disable)')
+    parser.add_argument('--seed', type=int, default=498)
+    args = parser.parse_args()
+
+    app_module, app = load_app(args.database_url)
+    add_legacy_routes(app, app_module)
+    with app.app_context():
+        prepare_schema(app_module)
+        trips = RoundTrips(app_module.db.engine, args.rtt_ms / 1000)
+        client = app.test_client()
+
+        print(f"{args.requests} requests per operation, simulated round trip {args.rtt_ms:g} ms")
+        print(f"{'operation':<12} {'handler':<8} {'round trips':>11} {'p50 ms':>8} {'p95 ms':>8}  statuses")
+        for prefix, label in (('/legacy', 'before'), ('/api', 'after')):
+            rng = new_rng(args.seed)
+            created = []
+            for operation in ('create user', 'create item', 'update item', 'delete item'):
+                result = run(client, trips, operation, prefix, args.requests, rng, created)
+                print(f"{operation:<12} {label:<8} {result['round_trips']:>11.1f} {result['p50_ms']:>8.2f} "
+                      f"{result['p95_ms']:>8.2f}  {result['statuses']}")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,95 @@
+# Bulk ingestion helpers for POST /api/items/bulk and /api/reports/bulk
+# Records arrive as a JSON array or as streamed NDJSON and are written in chunks,
+# one transaction per chunk, using COPY on PostgreSQL (psycopg2) and multi-row INSERT elsewhere
+import io
+import json
+from sqlalchemy import text
+from sqlalchemy.exc import IntegrityError, DataError
+
+CHUNK_SIZE = 1000
+MAX_RECORDS = 100000
+
+def iter_records(request):
+    """Yield (index, record_or_None, error_or_None) from a JSON array body or an NDJSON stream."""
+    if request.mimetype in ('application/x-ndjson', 'application/jsonl'):
+        index = 0
+        # Read line by line so large uploads are never held in memory at once
+        for line in request.stream:
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                record = json.loads(line)
+            except ValueError:
+                yield index, None, "Invalid JSON"
+            else:
+                yield index, record, None
+            index += 1
+        return
+
+    data = request.get_json(silent=True)
+    if not isinstance(data, list):
+        raise ValueError("Expected a JSON array or an application/x-ndjson body")
+    for index, record in enumerate(data):
+        yield index, record, None
+
+def chunked(records, size=CHUNK_SIZE):
+    chunk = []
+    for record in records:
+        chunk.append(record)
+        if len(chunk) >= size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+def _csv_field(value):
+    # NULL is an unquoted empty field; everything else is quoted so '' stays an empty string
+    if value is None:
+        return ''
+    return '"' + str(value).replace('"', '""') + '"'
+
+def _copy_rows(conn, table, rows):
+    # COPY can't return generated keys, so reserve the ids from the sequence first (one round trip)
+    ids = [row[0] for row in conn.execute(
+        text("SELECT nextval(pg_get_serial_sequence(:table, 'id')) FROM generate_series(1, :n)"),
+        {"table": table.name, "n": len(rows)}
+    )]
+    columns = list(rows[0].keys())
+    buffer = io.StringIO()
+    for row_id, row in zip(ids, rows):
+        buffer.write(','.join([str(row_id)] + [_csv_field(row[column]) for column in columns]))
+        buffer.write('\n')
+    buffer.seek(0)
+
+    cursor = conn.connection.cursor()
+    try:
+        cursor.copy_expert(
+            f"COPY {table.name} (id, {', '.join(columns)}) FROM STDIN WITH (FORMAT csv)", buffer
+        )
+    finally:
+        cursor.close()
+    return ids
+
+def insert_rows(session, table, rows):
+    """Insert a chunk of value dicts (all with the same keys) and commit; returns the new ids in order."""
+    conn = session.connection()
+    if conn.dialect.name == 'postgresql' and conn.dialect.driver == 'psycopg2':
+        ids = _copy_rows(conn, table, rows)
+    else:
+        # executemany is batched into multi-row INSERT ... RETURNING statements by SQLAlchemy
+        result = conn.execute(table.insert().returning(table.c.id, sort_by_parameter_order=True), rows)
+        ids = [row[0] for row in result]
+    session.commit()
+    return ids
+
+def insert_each(session, table, rows):
+    """Insert rows one transaction each, after their chunk failed; returns the new ids, None where a row failed."""
+    ids = []
+    for row in rows:
+        try:
+            ids.extend(insert_rows(session, table, [row]))
+        except (IntegrityError, DataError):
+            session.rollback()
+            ids.append(None)
+    return ids
@@ -0,0 +1,146 @@
+# In-process response cache for hot GET endpoints
+# Bounded LRU with TTL and a byte budget; write handlers evict entries by tag
+import functools
+import threading
+import time
+from collections import OrderedDict
+from urllib.parse import urlencode
+from flask import request, Response
+
+class LRUCache:
+    """Thread-safe LRU of serialized responses. Any object with the same get/set/invalidate/stats methods can replace it."""
+
+    def __init__(self, max_entries=1024, max_bytes=32 * 1024 * 1024, ttl_seconds=30):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.ttl_seconds = ttl_seconds
+        self._entries = OrderedDict()  # key -> (expires_at, body, status, mimetype, tags)
+        self._tag_keys = {}            # tag -> set of keys
+        self._tag_versions = {}        # tag -> int, bumped on every invalidation
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+        self.invalidations = 0
+
+    def versions(self, tags):
+        with self._lock:
+            return tuple(self._tag_versions.get(tag, 0) for tag in tags)
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            if entry[0] < time.monotonic():
+                self._remove(key)
+                self.expirations += 1
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[1:4]
+
+    def set(self, key, body, status, mimetype, tags, versions):
+        size = len(body)
+        if size > self.max_bytes:
+            return
+        with self._lock:
+            # A write invalidated one of our tags while the response was being built; don't store stale data
+            if tuple(self._tag_versions.get(tag, 0) for tag in tags) != versions:
+                return
+            if key in self._entries:
+                self._remove(key)
+            self._entries[key] = (time.monotonic() + self.ttl_seconds, body, status, mimetype, tags)
+            self._bytes += size
+            for tag in tags:
+                self._tag_keys.setdefault(tag, set()).add(key)
+            while len(self._entries) > self.max_entries or self._bytes > self.max_bytes:
+                oldest = next(iter(self._entries))
+                self._remove(oldest)
+                self.evictions += 1
+
+    def invalidate(self, *tags):
+        with self._lock:
+            for tag in tags:
+                self._tag_versions[tag] = self._tag_versions.get(tag, 0) + 1
+                for key in self._tag_keys.pop(tag, set()):
+                    if key in self._entries:
+                        self._remove(key)
+                        self.invalidations += 1
+
+    def clear(self):
+        with self._lock:
+            for tag in list(self._tag_keys):
+                self._tag_versions[tag] = self._tag_versions.get(tag, 0) + 1
+            self._entries.clear()
+            self._tag_keys.clear()
+            self._bytes = 0
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "bytes": self._bytes,
+                "max_entries": self.max_entries,
+                "max_bytes": self.max_bytes,
+                "ttl_seconds": self.ttl_seconds,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_ratio": round(self.hits / lookups, 4) if lookups else 0.0,
+                "evictions": self.evictions,
+                "expirations": self.expirations,
+                "invalidations": self.invalidations
+            }
+
+    def _remove(self, key):
+        _, body, _, _, tags = self._entries.pop(key)
+        self._bytes -= len(body)
+        for tag in tags:
+            keys = self._tag_keys.get(tag)
+            if keys is not None:
+                keys.discard(key)
+                if not keys:
+                    del self._tag_keys[tag]
+
+def make_key(path, args):
+    # Route path plus query args in a stable order, so ?a=1&b=2 and ?b=2&a=1 share an entry; re-encoded, so
+    # ?search=black%26type%3Dlost and ?search=black&type=lost don't
+    return path + '?' + urlencode(sorted(args))
+
+def cache_key():
+    return make_key(request.path, ((name, value) for name in request.args for value in request.args.getlist(name)))
+
+def cached(cache, tags, bypass=None):
+    """Cache successful responses of a GET view. tags is a callable taking the view kwargs and returning tag names.
+
+    bypass, if given, is called per request; when it returns True the view runs uncached.
+    """
+    def decorator(view):
+        @functools.wraps(view)
+        def wrapper(*args, **kwargs):
+            if bypass is not None and bypass():
+                return view(*args, **kwargs)
+            key = cache_key()
+            hit = cache.get(key)
+            if hit is not None:
+                body, status, mimetype = hit
+                response = Response(body, status=status, mimetype=mimetype)
+                response.headers['X-Cache'] = 'HIT'
+                return response
+
+            view_tags = tuple(tags(**kwargs))
+            versions = cache.versions(view_tags)
+            response = view(*args, **kwargs)
+            if not isinstance(response, Response):
+                return response
+            if response.status_code == 200:
+                cache.set(key, response.get_data(), response.status_code, response.mimetype, view_tags, versions)
+            response.headers['X-Cache'] = 'MISS'
+            return response
+        return wrapper
+    return decorator
@@ -0,0 +1,114 @@
+# Item event dates
+# occurred_on is the day an item was lost or found, a DATE column that the ?from=&to= list/search filters and
+# the /api/items/histogram grouped query run on. The "July 5" display string is derived from it on write.
+import functools
+from datetime import date, datetime, timedelta
+from sqlalchemy import select, update, bindparam, cast, func, Date
+
+HISTOGRAM_BUCKETS = ('day', 'week')
+DEFAULT_HISTOGRAM_BUCKETS = {'day': 90, 'week': 26}  # range shown when from= is not given
+MAX_HISTOGRAM_BUCKETS = 1000
+
+@functools.lru_cache(maxsize=4096)
+def display_date(day):
+    """'July 5' for a date (None for None); cached, since items share a few hundred distinct days."""
+    return f"{day:%B} {day.day}" if day else None
+
+def parse_day(value, name):
+    try:
+        return date.fromisoformat(value)
+    except (TypeError, ValueError):
+        raise ValueError(f"{name} must be a date (YYYY-MM-DD)")
+
+def date_range(args):
+    """(from, to) from ?from=&to=, inclusive; either may be None."""
+    start = parse_day(args['from'], 'from') if args.get('from') else None
+    end = parse_day(args['to'], 'to') if args.get('to') else None
+    if start and end and start > end:
+        raise ValueError("from must not be after to")
+    return start, end
+
+def filter_dates(query, args, model):
+    start, end = date_range(args)
+    if start:
+        query = query.filter(model.occurred_on >= start)
+    if end:
+        query = query.filter(model.occurred_on <= end)
+    return query
+
+def week_start(day):
+    return day - timedelta(days=day.weekday())
+
+def histogram_range(args, bucket, today):
+    """(first bucket start, last day) for a histogram request; defaults to the last few months ending today."""
+    start, end = date_range(args)
+    end = end or today
+    if start is None:
+        start = end - timedelta(days=DEFAULT_HISTOGRAM_BUCKETS[bucket] * (7 if bucket == 'week' else 1) - 1)
+    if bucket == 'week':
+        start = week_start(start)
+    if (end - start).days // (7 if bucket == 'week' else 1) >= MAX_HISTOGRAM_BUCKETS:
+        raise ValueError(f"Date range too long for bucket={bucket} (at most {MAX_HISTOGRAM_BUCKETS} buckets)")
+    return start, end
+
+def bucket_column(bucket, dialect, column):
+    """The bucket (day, or Monday of the week) a row falls in, computed by the database."""
+    if bucket == 'day':
+        return column
+    if dialect == 'postgresql':
+        return cast(func.date_trunc('week', column), Date)
+    # SQLite: forward to Sunday (or stay on it), then back six days
+    return func.date(column, 'weekday 0', '-6 days')
+
+def as_date(value):
+    # SQLite hands back date() results as text
+    return value if isinstance(value, date) else date.fromisoformat(str(value)[:10])
+
+def fill_buckets(counts, bucket, start, end):
+    """[{"start", "count"}] for every bucket from start to end, zero where no row fell."""
+    step = timedelta(days=7 if bucket == 'week' else 1)
+    buckets = []
+    day = start
+    while day <= end:
+        buckets.append({"start": day.isoformat(), "count": counts.get(day, 0)})
+        day += step
+    return buckets
+
+def legacy_occurred_on(text, created_at):
+    """occurred_on for a row saved before the column existed: its 'July 5' string in the year it was created.
+
+    The string was written from the local clock and created_at from UTC, so a day of skew is allowed;
+    rows whose string doesn't parse fall back to the day they were created.
+    """
+    created_at = created_at or datetime.utcnow()
+    if text:
+        for year in (created_at.year, created_at.year - 1):
+            try:
+                day = datetime.strptime(f"{text.strip()} {year}", '%B %d %Y').date()
+            except ValueError:
+                continue  # not a date, or February 29 outside a leap year
+            if day <= created_at.date() + timedelta(days=1):
+                return day
+    return created_at.date()
+
+def backfill_occurred_on(engine, table, batch_size=1000):
+    """Fill occurred_on, and rewrite the display string from it, for rows that lack it; yields each batch size."""
+    t = table.c
+    statement = (update(table).where(t.id == bindparam('row_id'))
+                 .values(occurred_on=bindparam('day'), date=bindparam('display')))
+    last_id = 0
+    while True:
+        with engine.begin() as conn:
+            rows = conn.execute(
+                select(t.id, t.date, t.created_at)
+                .where(t.id > last_id, t.occurred_on.is_(None)).order_by(t.id).limit(batch_size)
+            ).all()
+            if not rows:
+                return
+            params = []
+            for row in rows:
+                day = legacy_occurred_on(row.date, row.created_at)
+                params.append({"row_id": row.id, "day": day, "display": display_date(day)})
+            conn.execute(statement, params)
+        last_id = rows[-1].id
+        yield len(rows)
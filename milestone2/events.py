@@ -0,0 +1,258 @@
+# Item change feed for GET /api/items/stream (Server-Sent Events)
+# The write handlers publish created/updated/deleted events to an in-process broker, which keeps the last
+# buffer_size of them for Last-Event-ID resume. On PostgreSQL events travel through NOTIFY instead, and a
+# LISTEN thread in every worker feeds its own broker, so a subscriber sees writes made by any worker.
+#
+# Subscribers never get a thread of their own under ASGI: every stream coroutine on an event loop waits on
+# one shared asyncio.Event, which a publish sets with a single call_soon_threadsafe per loop. The Flask
+# stream (dev server, gunicorn) waits on a threading.Condition instead and holds a worker thread.
+import asyncio
+import itertools
+import json
+import logging
+import os
+import select
+import threading
+import time
+import uuid
+from collections import deque
+from sqlalchemy import text
+
+KEEPALIVE_SECONDS = 15
+RETRY_MS = 3000
+
+logger = logging.getLogger('events')
+
+class EventBroker:
+    def __init__(self, buffer_size=1000):
+        # Event ids are '<origin>-<n>': unique across workers without a database round trip, and the same
+        # in every worker's buffer, so a client can resume on whichever worker it reconnects to
+        self.origin = uuid.uuid4().hex[:8]
+        self._counter = itertools.count(1)
+        self._buffer = deque(maxlen=buffer_size)  # (seq, event id, name, data JSON), seq counts local arrivals
+        self._seq = 0
+        self._condition = threading.Condition()
+        self._loop_events = {}  # event loop -> asyncio.Event, replaced on every wake-up
+        self.transport = None
+        self.published = 0
+        self.delivered = 0
+        self.subscribers = 0
+
+    def publish(self, name, data):
+        """Send an event to every subscriber, in all workers when a transport is set. Never raises."""
+        message = json.dumps({"id": f"{self.origin}-{next(self._counter)}", "event": name, "data": data},
+                             separators=(',', ':'), default=str)
+        self.published += 1
+        try:
+            if self.transport is not None:
+                self.transport.send(message)
+            else:
+                self.deliver(message)
+        except Exception:
+            # The write already committed; a lost event only means clients refresh on their next reset
+            logger.exception("Could not publish %s event", name)
+
+    def deliver(self, message):
+        message = json.loads(message)
+        self._append(message["id"], message["event"], json.dumps(message["data"], separators=(',', ':')))
+
+    def reset(self):
+        """Tell subscribers events may have been missed (e.g. the LISTEN connection dropped)."""
+        self._append(None, 'reset', '{}')
+
+    def _append(self, event_id, name, data):
+        with self._condition:
+            self._seq += 1
+            self._buffer.append((self._seq, event_id, name, data))
+            self.delivered += 1
+            self._condition.notify_all()
+            loops = list(self._loop_events)
+        for loop in loops:
+            try:
+                loop.call_soon_threadsafe(self._wake, loop)
+            except RuntimeError:
+                # Loop closed
+                with self._condition:
+                    self._loop_events.pop(loop, None)
+
+    def _wake(self, loop):
+        # Runs on the loop itself; streams that already took the old event are woken, later ones get the new
+        with self._condition:
+            event = self._loop_events.get(loop)
+            self._loop_events[loop] = asyncio.Event()
+        if event is not None:
+            event.set()
+
+    def resume(self, last_event_id):
+        """Position to stream from: after last_event_id if it is still buffered, else the current end.
+
+        Returns (position, missed); missed means the client's event fell out of the buffer and it should refetch.
+        """
+        with self._condition:
+            if last_event_id:
+                for seq, event_id, _, _ in self._buffer:
+                    if event_id == last_event_id:
+                        return seq, False
+                return self._seq, True
+            return self._seq, False
+
+    def after(self, position):
+        """(events after position, new position, missed) where missed means the buffer overflowed past position."""
+        with self._condition:
+            if position >= self._seq:
+                return [], position, False
+            missed = not self._buffer or self._buffer[0][0] > position + 1
+            events = [entry for entry in self._buffer if entry[0] > position]
+            return events, self._seq, missed
+
+    def wait(self, position, timeout):
+        """Block the calling thread until there are events after position or timeout passes."""
+        with self._condition:
+            return self._condition.wait_for(lambda: self._seq > position, timeout)
+
+    async def wait_async(self, position, timeout):
+        loop = asyncio.get_running_loop()
+        with self._condition:
+            event = self._loop_events.setdefault(loop, asyncio.Event())
+            if self._seq > position:
+                return True
+        try:
+            await asyncio.wait_for(event.wait(), timeout)
+            return True
+        except asyncio.TimeoutError:
+            return False
+
+    def subscribed(self, change):
+        with self._condition:
+            self.subscribers += change
+
+    def stats(self):
+        with self._condition:
+            return {
+                "subscribers": self.subscribers,
+                "published": self.published,
+                "delivered": self.delivered,
+                "buffered": len(self._buffer),
+                "buffer_size": self._buffer.maxlen,
+                "transport": type(self.transport).__name__ if self.transport else None
+            }
+
+def last_event_id(headers, args):
+    """Last-Event-ID header, sent by EventSource on reconnect; ?last_event_id= for a first connect that resumes."""
+    return headers.get('Last-Event-ID') or args.get('last_event_id')
+
+def format_event(event_id, name, data):
+    head = f"id: {event_id}\n" if event_id else ""
+    return f"{head}event: {name}\ndata: {data}\n\n"
+
+def stream_start(broker, last_event_id):
+    """(first chunk, position) for a new subscriber."""
+    position, missed = broker.resume(last_event_id)
+    first = f"retry: {RETRY_MS}\n\n"
+    if missed:
+        first += format_event(None, 'reset', '{}')
+    return first, position
+
+def stream_chunk(broker, position):
+    """(chunk, new position) with the events after position, or a reset if some were dropped."""
+    events, position, missed = broker.after(position)
+    if missed:
+        return format_event(None, 'reset', '{}'), position
+    return ''.join(format_event(event_id, name, data) for _, event_id, name, data in events), position
+
+def sync_stream(broker, last_event_id):
+    """Generator of SSE text for a WSGI response."""
+    chunk, position = stream_start(broker, last_event_id)
+    broker.subscribed(1)
+    try:
+        yield chunk
+        while True:
+            if broker.wait(position, KEEPALIVE_SECONDS):
+                chunk, position = stream_chunk(broker, position)
+                if chunk:
+                    yield chunk
+            else:
+                yield ": keepalive\n\n"
+    finally:
+        broker.subscribed(-1)
+
+async def async_stream(broker, last_event_id):
+    """Async generator of SSE text for an ASGI response."""
+    chunk, position = stream_start(broker, last_event_id)
+    broker.subscribed(1)
+    try:
+        yield chunk
+        while True:
+            if await broker.wait_async(position, KEEPALIVE_SECONDS):
+                chunk, position = stream_chunk(broker, position)
+                if chunk:
+                    yield chunk
+            else:
+                yield ": keepalive\n\n"
+    finally:
+        broker.subscribed(-1)
+
+class PostgresNotify:
+    """Cross-worker transport: NOTIFY on publish, one LISTEN thread per process delivering to the broker.
+
+    LISTEN needs a session-level connection: behind PgBouncer in transaction mode, pass a listen_engine
+    connected to the database directly (EVENTS_LISTEN_URL).
+    """
+
+    def __init__(self, engine, broker, channel='item_events', listen_engine=None):
+        self.engine = engine
+        self.listen_engine = listen_engine or engine
+        self.broker = broker
+        self.channel = channel
+        self._lock = threading.Lock()
+        self._thread = None
+        self._pid = None
+        self._listening = threading.Event()
+
+    def send(self, message):
+        # Until this process is listening it would miss its own event
+        self.start()
+        self._listening.wait(timeout=1)
+        with self.engine.connect().execution_options(isolation_level='AUTOCOMMIT') as conn:
+            conn.execute(text("SELECT pg_notify(:channel, :message)"), {"channel": self.channel, "message": message})
+
+    def start(self):
+        # Threads don't survive fork(); each worker starts its own listener
+        if self._thread is not None and self._pid == os.getpid():
+            return
+        with self._lock:
+            if self._thread is None or self._pid != os.getpid():
+                self._pid = os.getpid()
+                self._listening = threading.Event()
+                self._thread = threading.Thread(target=self._listen, name='event-listener', daemon=True)
+                self._thread.start()
+
+    def _listen(self):
+        connected_before = False
+        while True:
+            raw = None
+            try:
+                raw = self.listen_engine.raw_connection()
+                raw.detach()  # never goes back to the pool
+                conn = raw.driver_connection
+                conn.autocommit = True
+                conn.cursor().execute(f"LISTEN {self.channel}")
+                if connected_before:
+                    # Anything sent while we were reconnecting is gone
+                    self.broker.reset()
+                connected_before = True
+                self._listening.set()
+                while True:
+                    if select.select([conn], [], [], KEEPALIVE_SECONDS) == ([], [], []):
+                        continue
+                    conn.poll()
+                    while conn.notifies:
+                        self.broker.deliver(conn.notifies.pop(0).payload)
+            except Exception:
+                logger.exception("LISTEN %s failed, reconnecting", self.channel)
+                if raw is not None:
+                    try:
+                        raw.close()
+                    except Exception:
+                        pass
+                time.sleep(1)
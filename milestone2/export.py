@@ -0,0 +1,151 @@
+# Streaming NDJSON/CSV export backed by a server-side cursor
+# Rows are fetched in batches and written out as they arrive, so memory stays flat for any table size.
+# Rows come out in (updated_at, id) order. An incremental pull passes the last row's updated_at and id back as
+# since and since_id, and gets every row written after that point: new and edited rows, rows archived (with
+# archived_at set) and rows deleted (only id, updated_at and deleted_at set, from the deletions log).
+import csv
+import io
+import json
+from datetime import date, datetime
+from flask import Response, stream_with_context
+from sqlalchemy import select, union_all, null, and_, or_, text
+
+BATCH_SIZE = 1000
+FORMATS = {
+    'ndjson': 'application/x-ndjson',
+    'csv': 'text/csv'
+}
+
+# Deletions are logged by triggers so every path (the API, CLI commands, psql) is covered. Rows the archive
+# mover deletes are already in items_archive by then and aren't logged: they show up as archived instead.
+# Timestamps are naive UTC with microseconds, as SQLAlchemy stores updated_at, so the cursor compares across both.
+POSTGRES_DDL = [
+    """
+    CREATE OR REPLACE FUNCTION log_deletion() RETURNS trigger AS $$
+    BEGIN
+        IF TG_TABLE_NAME = 'items' AND EXISTS (SELECT 1 FROM items_archive WHERE id = OLD.id) THEN
+            RETURN NULL;
+        END IF;
+        INSERT INTO deletions (table_name, row_id, deleted_at)
+        VALUES (TG_TABLE_NAME, OLD.id, clock_timestamp() AT TIME ZONE 'UTC');
+        RETURN NULL;
+    END
+    $$ LANGUAGE plpgsql
+    """,
+    "DROP TRIGGER IF EXISTS items_deletion_log ON items",
+    "CREATE TRIGGER items_deletion_log AFTER DELETE ON items FOR EACH ROW EXECUTE FUNCTION log_deletion()",
+    "DROP TRIGGER IF EXISTS reports_deletion_log ON reports",
+    "CREATE TRIGGER reports_deletion_log AFTER DELETE ON reports FOR EACH ROW EXECUTE FUNCTION log_deletion()",
+]
+
+SQLITE_DDL = [
+    """
+    CREATE TRIGGER IF NOT EXISTS items_deletion_log AFTER DELETE ON items
+    WHEN NOT EXISTS (SELECT 1 FROM items_archive WHERE id = old.id) BEGIN
+        INSERT INTO deletions (table_name, row_id, deleted_at)
+        VALUES ('items', old.id, strftime('%Y-%m-%d %H:%M:%f000', 'now'));
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS reports_deletion_log AFTER DELETE ON reports BEGIN
+        INSERT INTO deletions (table_name, row_id, deleted_at)
+        VALUES ('reports', old.id, strftime('%Y-%m-%d %H:%M:%f000', 'now'));
+    END
+    """,
+]
+
+def install_deletion_log(db):
+    """Create the deletion triggers on items and reports. Safe to run on every start."""
+    dialect = db.engine.dialect.name
+    if dialect not in ('postgresql', 'sqlite'):
+        return
+    with db.engine.begin() as conn:
+        for statement in POSTGRES_DDL if dialect == 'postgresql' else SQLITE_DDL:
+            conn.execute(text(statement))
+
+def parse_cursor(args):
+    """(since, since_id) from ?since=<ISO timestamp>&since_id=<id>, or None for a full export."""
+    value = args.get('since')
+    if not value:
+        return None
+    try:
+        since = datetime.fromisoformat(value)
+    except ValueError:
+        raise ValueError("since must be an ISO 8601 timestamp")
+    try:
+        since_id = int(args.get('since_id', 0))
+    except ValueError:
+        raise ValueError("since_id must be an integer")
+    return since, since_id
+
+def _after(timestamp_column, id_column, cursor):
+    since, since_id = cursor
+    return or_(timestamp_column > since, and_(timestamp_column == since, id_column > since_id))
+
+def changed_rows(table, Deletion, cursor, archive=None, include_archive=False):
+    """Selects for an export of table: its columns, then archived_at (when it has an archive) and deleted_at.
+
+    Without a cursor that's every live row, plus archived ones with include_archive; with one, only rows
+    written after it, archived rows and deletions included.
+    """
+    names = [column.name for column in table.columns]
+    extra = ['archived_at', 'deleted_at'] if archive is not None else ['deleted_at']
+    live = select(*table.columns, *[null().label(name) for name in extra])
+    if cursor is not None:
+        live = live.where(_after(table.c.updated_at, table.c.id, cursor))
+    selects = [live]
+    if archive is not None and include_archive:
+        archived = select(*[archive.c[name] for name in names], archive.c.archived_at, null().label('deleted_at'))
+        if cursor is not None:
+            archived = archived.where(_after(archive.c.updated_at, archive.c.id, cursor))
+        selects.append(archived)
+    if cursor is not None:
+        logged = {'id': Deletion.row_id, 'updated_at': Deletion.deleted_at, 'deleted_at': Deletion.deleted_at}
+        selects.append(
+            select(*[logged.get(name, null()).label(name) for name in names + extra])
+            .where(Deletion.table_name == table.name, _after(Deletion.deleted_at, Deletion.row_id, cursor))
+        )
+    return selects
+
+def _plain(value):
+    # datetime is a subclass of date, so this covers created_at as well as occurred_on
+    return value.isoformat() if isinstance(value, date) else value
+
+def _stream_rows(session, statement):
+    # stream_results opens a server-side cursor on PostgreSQL; yield_per bounds the client-side buffer
+    result = session.execute(statement.execution_options(stream_results=True, yield_per=BATCH_SIZE))
+    try:
+        for partition in result.partitions():
+            yield partition
+    finally:
+        result.close()
+
+def _ndjson(columns, partitions):
+    for rows in partitions:
+        yield ''.join(
+            json.dumps({column: _plain(value) for column, value in zip(columns, row)}) + '\n'
+            for row in rows
+        )
+
+def _csv(columns, partitions):
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(columns)
+    yield buffer.getvalue()
+    for rows in partitions:
+        buffer.seek(0)
+        buffer.truncate()
+        writer.writerows([_plain(value) for value in row] for row in rows)
+        yield buffer.getvalue()
+
+def export_response(session, selects, fmt, filename):
+    """Streaming response of the rows of changed_rows() selects, in (updated_at, id) order."""
+    if fmt not in FORMATS:
+        raise ValueError("format must be 'ndjson' or 'csv'")
+    rows = (selects[0] if len(selects) == 1 else union_all(*selects)).subquery()
+    columns = [column.name for column in rows.columns]
+    partitions = _stream_rows(session, select(rows).order_by(rows.c.updated_at, rows.c.id))
+    body = _ndjson(columns, partitions) if fmt == 'ndjson' else _csv(columns, partitions)
+    response = Response(stream_with_context(body), mimetype=FORMATS[fmt])
+    response.headers['Content-Disposition'] = f'attachment; filename="{filename}.{fmt}"'
+    return response
@@ -0,0 +1,67 @@
+# Zip-code geocoding and grid-cell proximity search
+# Items get latitude/longitude from an offline zip centroid table plus a coarse grid cell id.
+# A radius query only reads rows whose cell overlaps the search circle's bounding box.
+import csv
+import math
+import os
+
+EARTH_RADIUS_KM = 6371.0
+CELL_DEGREES = 0.1  # ~11 km of latitude per cell
+MAX_RADIUS_KM = 50
+# Bundled table covers the Chicago/Evanston area; point ZIP_CENTROIDS_PATH at a full Gazetteer file for national coverage
+DEFAULT_CENTROIDS = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'data', 'zip_centroids.csv')
+
+_centroids = {}
+
+def load_centroids(path=DEFAULT_CENTROIDS):
+    """Load zip centroids from our CSV (zip,latitude,longitude) or a Census Gazetteer ZCTA file (GEOID, INTPTLAT, INTPTLONG)."""
+    with open(path, newline='') as f:
+        sample = f.readline()
+        f.seek(0)
+        reader = csv.DictReader(f, delimiter='\t' if '\t' in sample else ',')
+        loaded = 0
+        for row in reader:
+            row = {key.strip(): value for key, value in row.items() if key}
+            zip_code = row.get('zip') or row.get('GEOID')
+            latitude = row.get('latitude') or row.get('INTPTLAT')
+            longitude = row.get('longitude') or row.get('INTPTLONG')
+            if not zip_code or latitude is None or longitude is None:
+                continue
+            _centroids[zip_code.strip()[:5]] = (float(latitude), float(longitude))
+            loaded += 1
+    return loaded
+
+def locate(zip_code):
+    """(latitude, longitude) for a zip code, or None when it isn't in the table."""
+    if not _centroids:
+        load_centroids(os.environ.get('ZIP_CENTROIDS_PATH', DEFAULT_CENTROIDS))
+    if not zip_code:
+        return None
+    return _centroids.get(str(zip_code).strip()[:5])
+
+def cell_for(latitude, longitude):
+    return f"{math.floor(latitude / CELL_DEGREES)}:{math.floor(longitude / CELL_DEGREES)}"
+
+def geo_values(zip_code):
+    point = locate(zip_code)
+    if point is None:
+        return {"latitude": None, "longitude": None, "geo_cell": None}
+    return {"latitude": point[0], "longitude": point[1], "geo_cell": cell_for(*point)}
+
+def cells_within(latitude, longitude, radius_km):
+    """Every grid cell overlapping the bounding box of the circle."""
+    lat_delta = math.degrees(radius_km / EARTH_RADIUS_KM)
+    # Longitude degrees shrink towards the poles; use the widest latitude in the box
+    widest = min(89.0, abs(latitude) + lat_delta)
+    lon_delta = math.degrees(radius_km / (EARTH_RADIUS_KM * math.cos(math.radians(widest))))
+    lat_cells = range(math.floor((latitude - lat_delta) / CELL_DEGREES), math.floor((latitude + lat_delta) / CELL_DEGREES) + 1)
+    lon_cells = range(math.floor((longitude - lon_delta) / CELL_DEGREES), math.floor((longitude + lon_delta) / CELL_DEGREES) + 1)
+    return [f"{lat_cell}:{lon_cell}" for lat_cell in lat_cells for lon_cell in lon_cells]
+
+def distance_km(lat1, lon1, lat2, lon2):
+    # Haversine great-circle distance
+    phi1, phi2 = math.radians(lat1), math.radians(lat2)
+    dphi = phi2 - phi1
+    dlambda = math.radians(lon2 - lon1)
+    a = math.sin(dphi / 2) ** 2 + math.cos(phi1) * math.cos(phi2) * math.sin(dlambda / 2) ** 2
+    return 2 * EARTH_RADIUS_KM * math.asin(math.sqrt(a))
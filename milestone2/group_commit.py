@@ -0,0 +1,183 @@
+# Group commit for high-rate single-row inserts
+# Request threads queue their INSERT and wait on a future; one writer thread drains the queue every
+# max_delay_ms or max_rows rows, whichever comes first, and writes each table's rows as one multi-row
+# INSERT ... RETURNING in one transaction. One commit (and one fsync) then covers the whole batch.
+#
+# Durability:
+#   sync  - the future resolves after the batch commit is durable (same guarantee as a per-request commit)
+#   async - the commit returns before the log is flushed (PostgreSQL synchronous_commit = off, SQLite
+#           synchronous = OFF): a crash can lose the last moments of acknowledged writes, never corrupt them
+#
+# A row still queued after wait_timeout is withdrawn and the caller gets WriteNotQueued, so a retry can't
+# duplicate it; a row whose batch is already being written is waited for, since it may well commit.
+import atexit
+import os
+import queue
+import threading
+import time
+from concurrent.futures import Future, TimeoutError as FutureTimeout
+from sqlalchemy import insert
+from sqlalchemy.exc import IntegrityError, DataError
+
+DURABILITY_MODES = ('sync', 'async')
+
+class WriteNotQueued(Exception):
+    """The row was withdrawn before the writer reached it: nothing was written and the request can be retried."""
+
+class GroupCommitWriter:
+    def __init__(self, engine, max_rows=500, max_delay_ms=5, durability='sync', wait_timeout=10):
+        if durability not in DURABILITY_MODES:
+            raise ValueError(f"durability must be one of {', '.join(DURABILITY_MODES)}")
+        self.engine = engine
+        self.max_rows = max_rows
+        self.max_delay = max_delay_ms / 1000
+        self.durability = durability
+        self.wait_timeout = wait_timeout
+        self._queue = queue.Queue()
+        self._lock = threading.Lock()
+        self._thread = None
+        self._pid = None
+        self.batches = 0
+        self.rows = 0
+        self.withdrawn = 0
+
+    def insert(self, table, values, returning):
+        """Queue one row and block until its batch commits; returns the RETURNING row or raises the row's error."""
+        future = self.submit(table, values, returning)
+        try:
+            return future.result(self.wait_timeout)
+        except FutureTimeout:
+            # Fails once the writer has taken the row, and then the batch's outcome is what counts
+            if future.cancel():
+                with self._lock:
+                    self.withdrawn += 1
+                raise WriteNotQueued(f"Not written within {self.wait_timeout} s; withdrawn from the queue")
+            return future.result()
+
+    def submit(self, table, values, returning):
+        self._ensure_started()
+        future = Future()
+        self._queue.put((table, tuple(returning), values, future))
+        return future
+
+    def stop(self):
+        """Flush whatever is queued and stop the writer thread."""
+        thread = self._thread
+        if thread is not None and thread.is_alive():
+            self._queue.put(None)
+            thread.join()
+        self._thread = None
+
+    def _ensure_started(self):
+        # Started lazily, and again in each forked worker: threads don't survive fork()
+        if self._thread is not None and self._pid == os.getpid():
+            return
+        with self._lock:
+            if self._thread is None or self._pid != os.getpid():
+                self._queue = queue.Queue()
+                self._pid = os.getpid()
+                self._thread = threading.Thread(target=self._run, name='group-commit', daemon=True)
+                self._thread.start()
+                atexit.register(self.stop)
+
+    def _run(self):
+        while True:
+            first = self._queue.get()
+            if first is None:
+                return
+            batch = [first]
+            deadline = time.monotonic() + self.max_delay
+            stopping = False
+            while len(batch) < self.max_rows:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    entry = self._queue.get(timeout=remaining)
+                except queue.Empty:
+                    break
+                if entry is None:
+                    stopping = True
+                    break
+                batch.append(entry)
+            self._flush(batch)
+            if stopping:
+                return
+
+    def _flush(self, batch):
+        # Drops rows whose callers gave up; the rest can no longer be withdrawn
+        batch = [entry for entry in batch if entry[3].set_running_or_notify_cancel()]
+        if not batch:
+            return
+        groups = {}
+        for table, returning, values, future in batch:
+            groups.setdefault((table, returning), []).append((values, future))
+        try:
+            with self._transaction() as conn:
+                results = []
+                for (table, returning), entries in groups.items():
+                    statement = insert(table).returning(*returning, sort_by_parameter_order=True)
+                    rows = conn.execute(statement, [values for values, _ in entries]).all()
+                    results.extend(zip(entries, rows))
+        except (IntegrityError, DataError):
+            # One bad row fails the whole batch; retry row by row so only that request gets the error
+            for (table, returning), entries in groups.items():
+                for values, future in entries:
+                    try:
+                        with self._transaction() as conn:
+                            future.set_result(conn.execute(insert(table).values(**values).returning(*returning)).first())
+                    except Exception as e:
+                        future.set_exception(e)
+            return
+        except Exception as e:
+            for _, _, _, future in batch:
+                future.set_exception(e)
+            return
+        self.batches += 1
+        self.rows += len(batch)
+        for (_, future), row in results:
+            future.set_result(row)
+
+    def _transaction(self):
+        return _Transaction(self.engine, self.durability == 'async')
+
+    def stats(self):
+        return {
+            "durability": self.durability,
+            "max_rows": self.max_rows,
+            "max_delay_ms": self.max_delay * 1000,
+            "batches": self.batches,
+            "rows": self.rows,
+            "mean_batch_size": round(self.rows / self.batches, 2) if self.batches else 0.0,
+            "withdrawn": self.withdrawn,
+            "queued": self._queue.qsize()
+        }
+
+class _Transaction:
+    """engine.begin(), with the commit relaxed for async durability."""
+
+    def __init__(self, engine, relaxed):
+        self.engine = engine
+        self.relaxed = relaxed
+
+    def __enter__(self):
+        # The connection autobegins on its first statement; the PRAGMA itself doesn't start a SQLite transaction
+        self.conn = self.engine.connect()
+        if self.relaxed and self.conn.dialect.name == 'sqlite':
+            self.conn.exec_driver_sql("PRAGMA synchronous = OFF")
+        elif self.relaxed and self.conn.dialect.name == 'postgresql':
+            self.conn.exec_driver_sql("SET LOCAL synchronous_commit = off")
+        return self.conn
+
+    def __exit__(self, exc_type, exc, traceback):
+        try:
+            if exc_type is None:
+                self.conn.commit()
+            else:
+                self.conn.rollback()
+            if self.relaxed and self.conn.dialect.name == 'sqlite':
+                # Connection-level setting; restore the default before the connection goes back to the pool
+                self.conn.exec_driver_sql("PRAGMA synchronous = FULL")
+        finally:
+            self.conn.close()
+        return False
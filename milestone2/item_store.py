@@ -0,0 +1,169 @@
+# Indexed, persistent in-memory item store for the Lab 4 backend
+# - primary index: dict id -> record
+# - secondary indexes: sorted (created_at, id) lists, one over every item and one per type, for ordered scans
+# - durability: append-only JSON-lines log, compacted into a snapshot every N writes
+# - one lock around every access, so it is safe under a multithreaded WSGI server
+import bisect
+import json
+import os
+import threading
+
+FIELDS = ('id', 'title', 'location', 'date', 'type', 'description', 'email', 'created_at', 'updated_at')
+
+class ItemRecord:
+    __slots__ = FIELDS
+
+    def __init__(self, **values):
+        for field in FIELDS:
+            setattr(self, field, values.get(field))
+
+    def to_dict(self):
+        data = {field: getattr(self, field) for field in FIELDS}
+        if data['updated_at'] is None:
+            del data['updated_at']
+        return data
+
+def _remove_key(keys, key):
+    position = bisect.bisect_left(keys, key)
+    if position < len(keys) and keys[position] == key:
+        del keys[position]
+
+class ItemStore:
+    def __init__(self, data_dir, snapshot_every=1000, fsync=False):
+        self.data_dir = data_dir
+        self.snapshot_every = snapshot_every
+        self.fsync = fsync
+        self._items = {}
+        self._by_type = {}
+        self._by_created = []
+        self._lock = threading.RLock()
+        self._writes_since_snapshot = 0
+        os.makedirs(data_dir, exist_ok=True)
+        self._snapshot_path = os.path.join(data_dir, 'snapshot.json')
+        self._log_path = os.path.join(data_dir, 'items.log')
+        torn = self._recover()
+        self._log = open(self._log_path, 'a', encoding='utf-8')
+        if torn:
+            # Don't append after a partial line; fold everything recovered into a fresh snapshot
+            self.snapshot()
+
+    # Reads
+
+    def __len__(self):
+        return len(self._items)
+
+    def get(self, item_id):
+        with self._lock:
+            record = self._items.get(item_id)
+            return record.to_dict() if record else None
+
+    def list(self, item_type=None):
+        """Items oldest first, optionally only one type."""
+        with self._lock:
+            if item_type is not None:
+                return [self._items[item_id].to_dict() for _, item_id in self._by_type.get(item_type, [])]
+            return [self._items[item_id].to_dict() for _, item_id in self._by_created]
+
+    def count(self, item_type=None):
+        with self._lock:
+            if item_type is not None:
+                return len(self._by_type.get(item_type, []))
+            return len(self._items)
+
+    # Writes
+
+    def put(self, item):
+        """Insert or replace an item (dict with an 'id'); returns the stored copy."""
+        with self._lock:
+            self._append({'op': 'put', 'item': item})
+            self._apply_put(item)
+            self._after_write()
+            return self._items[item['id']].to_dict()
+
+    def update(self, item_id, changes):
+        with self._lock:
+            record = self._items.get(item_id)
+            if record is None:
+                return None
+            item = dict(record.to_dict(), **changes)
+            return self.put(item)
+
+    def delete(self, item_id):
+        with self._lock:
+            if item_id not in self._items:
+                return None
+            self._append({'op': 'delete', 'id': item_id})
+            deleted = self._apply_delete(item_id)
+            self._after_write()
+            return deleted.to_dict()
+
+    def close(self):
+        with self._lock:
+            self._log.close()
+
+    # Index maintenance
+
+    def _apply_put(self, item):
+        item_id = item['id']
+        if item_id in self._items:
+            self._apply_delete(item_id)
+        record = ItemRecord(**item)
+        self._items[item_id] = record
+        # Both indexes are keyed on (created_at, id), so an updated item keeps its place
+        key = (record.created_at or '', item_id)
+        bisect.insort(self._by_type.setdefault(record.type, []), key)
+        bisect.insort(self._by_created, key)
+
+    def _apply_delete(self, item_id):
+        record = self._items.pop(item_id)
+        key = (record.created_at or '', item_id)
+        _remove_key(self._by_type.get(record.type, []), key)
+        _remove_key(self._by_created, key)
+        return record
+
+    # Persistence
+
+    def _append(self, entry):
+        self._log.write(json.dumps(entry, separators=(',', ':')) + '\n')
+        self._log.flush()
+        if self.fsync:
+            os.fsync(self._log.fileno())
+
+    def _after_write(self):
+        self._writes_since_snapshot += 1
+        if self._writes_since_snapshot >= self.snapshot_every:
+            self.snapshot()
+
+    def snapshot(self):
+        """Write every item to a new snapshot file atomically, then start an empty log."""
+        with self._lock:
+            temp_path = self._snapshot_path + '.tmp'
+            with open(temp_path, 'w', encoding='utf-8') as f:
+                json.dump([self._items[item_id].to_dict() for _, item_id in self._by_created], f)
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(temp_path, self._snapshot_path)
+            self._log.close()
+            self._log = open(self._log_path, 'w', encoding='utf-8')
+            self._writes_since_snapshot = 0
+
+    def _recover(self):
+        """Load the snapshot and replay the log; returns True if the log ended in a torn write."""
+        if os.path.exists(self._snapshot_path):
+            with open(self._snapshot_path, encoding='utf-8') as f:
+                for item in json.load(f):
+                    self._apply_put(item)
+        if os.path.exists(self._log_path):
+            with open(self._log_path, encoding='utf-8') as f:
+                for line in f:
+                    try:
+                        entry = json.loads(line)
+                    except ValueError:
+                        return True  # torn final write from a crash; everything before it is intact
+                    if entry['op'] == 'put':
+                        self._apply_put(entry['item'])
+                        self._writes_since_snapshot += 1
+                    elif entry['op'] == 'delete' and entry['id'] in self._items:
+                        self._apply_delete(entry['id'])
+                        self._writes_since_snapshot += 1
+        return False
@@ -0,0 +1,238 @@
+# Durable background jobs for work that follows a write (match notifications, maintenance)
+# A write handler enqueues a row in the jobs table (one INSERT on the same database) and returns. The run-jobs
+# command claims due jobs with a single UPDATE ... RETURNING (FOR UPDATE SKIP LOCKED on PostgreSQL, so several
+# worker processes can share the table), runs them on a thread pool and retries failures with exponential
+# backoff. A kind registered with batch_size > 1 gets up to that many due jobs with the same batch_key per
+# call, which is how match emails become one digest per recipient. A worker that dies mid-job loses its lease
+# after lease_seconds and the job runs again, so handlers must be safe to repeat.
+import json
+import logging
+import random
+import threading
+from datetime import datetime, timedelta
+from sqlalchemy import select, insert, update, delete, func, case
+from sqlalchemy.exc import IntegrityError
+from writes import execute_returning
+
+QUEUED, RUNNING, DONE, FAILED = 'queued', 'running', 'done', 'failed'
+
+logger = logging.getLogger('jobs')
+
+def _ms(start, end):
+    return (end - start).total_seconds() * 1000
+
+def _percentile(values, fraction):
+    if not values:
+        return None
+    values = sorted(values)
+    return round(values[min(len(values) - 1, int(len(values) * fraction))], 1)
+
+class JobQueue:
+    def __init__(self, table, lease_seconds=300, max_attempts=5, backoff_seconds=10, max_backoff_seconds=3600):
+        self.table = table
+        self.handlers = {}  # kind -> (function, batch_size)
+        self.lease_seconds = lease_seconds
+        self.max_attempts = max_attempts
+        self.backoff_seconds = backoff_seconds
+        self.max_backoff_seconds = max_backoff_seconds
+
+    def handler(self, kind, batch_size=1):
+        """Register function(payload), or function([payloads]) when batch_size > 1, to run jobs of this kind."""
+        def register(function):
+            self.handlers[kind] = (function, batch_size)
+            return function
+        return register
+
+    def _values(self, kind, payload, run_at, dedupe_key, batch_key):
+        return {
+            "kind": kind,
+            "payload": json.dumps(payload, separators=(',', ':'), default=str),
+            "status": QUEUED,
+            "attempts": 0,
+            "run_at": run_at,
+            "created_at": datetime.utcnow(),
+            "dedupe_key": dedupe_key,
+            "batch_key": batch_key
+        }
+
+    def enqueue(self, engine, kind, payload, run_at=None, dedupe_key=None, batch_key=None):
+        """Add one job, committed on its own; returns its id, or None when dedupe_key is already queued or done."""
+        values = self._values(kind, payload, run_at or datetime.utcnow(), dedupe_key, batch_key)
+        try:
+            row = execute_returning(engine, insert(self.table).values(**values).returning(self.table.c.id))
+        except IntegrityError:
+            if dedupe_key is None:
+                raise
+            return None
+        return row.id
+
+    def enqueue_many(self, engine, kind, payloads, run_at=None):
+        """Add one job per payload in a single INSERT."""
+        if not payloads:
+            return
+        run_at = run_at or datetime.utcnow()
+        with engine.begin() as conn:
+            conn.execute(insert(self.table), [self._values(kind, payload, run_at, None, None) for payload in payloads])
+
+    def claim(self, engine):
+        """Lease the oldest due job plus up to batch_size - 1 more of its kind and batch_key.
+
+        Returns (kind, rows), or (None, []) when nothing is due.
+        """
+        t = self.table.c
+        now = datetime.utcnow()
+        due = (t.status == QUEUED, t.run_at <= now)
+        with engine.connect().execution_options(isolation_level='AUTOCOMMIT') as conn:
+            oldest = conn.execute(
+                select(t.kind, t.batch_key).where(*due, t.kind.in_(list(self.handlers))).order_by(t.run_at, t.id).limit(1)
+            ).first()
+            if oldest is None:
+                return None, []
+            kind, batch_key = oldest
+            same_batch = t.batch_key == batch_key if batch_key is not None else t.batch_key.is_(None)
+            # One statement: the status check in its WHERE keeps two workers from leasing the same row
+            ids = (select(t.id).where(*due, t.kind == kind, same_batch).order_by(t.run_at, t.id)
+                   .limit(self.handlers[kind][1]).with_for_update(skip_locked=True))
+            rows = conn.execute(
+                update(self.table).where(t.id.in_(ids), t.status == QUEUED)
+                .values(status=RUNNING, started_at=now, attempts=t.attempts + 1)
+                .returning(t.id, t.payload, t.attempts)
+            ).all()
+        return kind, rows
+
+    def run(self, engine, kind, rows):
+        """Run a claimed batch and record the outcome; a failure retries the whole batch."""
+        function, batch_size = self.handlers[kind]
+        try:
+            payloads = [json.loads(row.payload) for row in rows]
+            if batch_size > 1:
+                function(payloads)
+            else:
+                function(payloads[0])
+        except Exception as e:
+            logger.exception("Job %s %s failed", kind, [row.id for row in rows])
+            self._retry(engine, rows, f"{type(e).__name__}: {e}"[:1000])
+            return False
+        with engine.begin() as conn:
+            conn.execute(update(self.table).where(self.table.c.id.in_([row.id for row in rows]))
+                         .values(status=DONE, finished_at=datetime.utcnow(), last_error=None))
+        return True
+
+    def backoff(self, attempts):
+        # Exponential backoff with jitter, so a batch that failed together doesn't retry together
+        delay = min(self.max_backoff_seconds, self.backoff_seconds * 2 ** (attempts - 1))
+        return delay * random.uniform(0.5, 1.0)
+
+    def _retry(self, engine, rows, error):
+        t = self.table.c
+        now = datetime.utcnow()
+        with engine.begin() as conn:
+            for row in rows:
+                if row.attempts >= self.max_attempts:
+                    values = {"status": FAILED, "finished_at": now}
+                else:
+                    values = {"status": QUEUED, "run_at": now + timedelta(seconds=self.backoff(row.attempts))}
+                conn.execute(update(self.table).where(t.id == row.id).values(last_error=error, **values))
+
+    def requeue_expired(self, engine):
+        """Return jobs whose worker died (lease expired) to the queue, or fail them when out of attempts."""
+        t = self.table.c
+        now = datetime.utcnow()
+        with engine.begin() as conn:
+            return conn.execute(
+                update(self.table)
+                .where(t.status == RUNNING, t.started_at < now - timedelta(seconds=self.lease_seconds))
+                .values(
+                    status=case((t.attempts >= self.max_attempts, FAILED), else_=QUEUED),
+                    run_at=now, last_error='lease expired'
+                )
+            ).rowcount
+
+    def prune(self, engine, retention_days):
+        """Delete finished jobs older than retention_days; their dedupe keys become free again."""
+        t = self.table.c
+        cutoff = datetime.utcnow() - timedelta(days=retention_days)
+        with engine.begin() as conn:
+            # Per kind, to stay on the (kind, finished_at) index
+            return sum(conn.execute(delete(self.table).where(
+                t.status == DONE, t.kind == kind, t.finished_at < cutoff
+            )).rowcount for kind in self.handlers)
+
+    def stats(self, engine, sample=1000):
+        """Queue depth by kind and status, age of the oldest due job, and wait/run times of each kind's last jobs."""
+        t = self.table.c
+        now = datetime.utcnow()
+        with engine.connect() as conn:
+            depth = conn.execute(
+                select(t.kind, t.status, func.count()).where(t.status != DONE).group_by(t.kind, t.status)
+            ).all()
+            oldest = conn.execute(select(func.min(t.run_at)).where(t.status == QUEUED, t.run_at <= now)).scalar()
+            recent = {kind: conn.execute(
+                select(t.run_at, t.started_at, t.finished_at)
+                .where(t.status == DONE, t.kind == kind).order_by(t.finished_at.desc()).limit(sample)
+            ).all() for kind in self.handlers}
+
+        kinds = {}
+        for kind, status, count in depth:
+            kinds.setdefault(kind, {})[status] = count
+        # wait is from when a job became due to when a worker picked it up; run is the handler itself
+        latency = {}
+        for kind, rows in recent.items():
+            if not rows:
+                continue
+            waits = [max(0.0, _ms(row.run_at, row.started_at)) for row in rows]
+            runs = [_ms(row.started_at, row.finished_at) for row in rows]
+            latency[kind] = {
+                "sampled": len(rows),
+                "wait_ms": {"p50": _percentile(waits, 0.50), "p95": _percentile(waits, 0.95)},
+                "run_ms": {"p50": _percentile(runs, 0.50), "p95": _percentile(runs, 0.95)}
+            }
+        return {
+            "depth": kinds,
+            "queued": sum(count for _, status, count in depth if status == QUEUED),
+            "oldest_due_seconds": round((now - oldest).total_seconds(), 1) if oldest else 0,
+            "latency": latency
+        }
+
+def run_pending(queue, engine, context):
+    """Run due jobs in this thread until none are left; returns the number of batches run."""
+    batches = 0
+    while True:
+        kind, rows = queue.claim(engine)
+        if not rows:
+            return batches
+        with context():
+            queue.run(engine, kind, rows)
+        batches += 1
+
+def work(queue, engine, context, concurrency=4, poll_seconds=1.0, retention_days=30, stop=None):
+    """Worker pool: concurrency threads claiming and running jobs until stop is set.
+
+    context() is entered around every batch (the Flask app context, so handlers get a fresh session).
+    This thread requeues expired leases and prunes old jobs meanwhile.
+    """
+    stop = stop or threading.Event()
+
+    def loop():
+        while not stop.is_set():
+            try:
+                if not run_pending(queue, engine, context):
+                    stop.wait(poll_seconds)
+            except Exception:
+                # Database unreachable or similar; the jobs stay queued
+                logger.exception("Job worker error")
+                stop.wait(poll_seconds)
+
+    threads = [threading.Thread(target=loop, name=f'job-worker-{n}', daemon=True) for n in range(concurrency)]
+    for thread in threads:
+        thread.start()
+    while not stop.is_set():
+        try:
+            if queue.requeue_expired(engine):
+                logger.warning("Requeued jobs with expired leases")
+            queue.prune(engine, retention_days)
+        except Exception:
+            logger.exception("Job housekeeping failed")
+        stop.wait(min(60, queue.lease_seconds / 2))
+    for thread in threads:
+        thread.join()
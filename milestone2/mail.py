@@ -0,0 +1,70 @@
+# Outgoing email for background jobs
+# MAIL_TRANSPORT picks where messages go: 'smtp' sends through SMTP_HOST, 'file:<path>' appends each message
+# to a JSON-lines file (local development and checks read it back), and 'log' only logs them.
+import json
+import logging
+import smtplib
+import threading
+from datetime import datetime
+from email.message import EmailMessage
+
+logger = logging.getLogger('mail')
+
+class LogTransport:
+    def send(self, to, subject, body):
+        logger.info("Mail to %s: %s", to, subject)
+
+class FileTransport:
+    def __init__(self, path):
+        self.path = path
+        self._lock = threading.Lock()
+
+    def send(self, to, subject, body):
+        line = json.dumps({"to": to, "subject": subject, "body": body, "sent_at": datetime.utcnow().isoformat()})
+        with self._lock, open(self.path, 'a', encoding='utf-8') as f:
+            f.write(line + '\n')
+
+    def messages(self):
+        try:
+            with open(self.path, encoding='utf-8') as f:
+                return [json.loads(line) for line in f if line.strip()]
+        except FileNotFoundError:
+            return []
+
+class SmtpTransport:
+    def __init__(self, host, port=587, sender='noreply@localhost', username=None, password=None, starttls=True, timeout=10):
+        self.host = host
+        self.port = port
+        self.sender = sender
+        self.username = username
+        self.password = password
+        self.starttls = starttls
+        self.timeout = timeout
+
+    def send(self, to, subject, body):
+        message = EmailMessage()
+        message['From'] = self.sender
+        message['To'] = to
+        message['Subject'] = subject
+        message.set_content(body)
+        # A connection per message; digests keep the volume low, and a failure raises so the job retries
+        with smtplib.SMTP(self.host, self.port, timeout=self.timeout) as smtp:
+            if self.starttls:
+                smtp.starttls()
+            if self.username:
+                smtp.login(self.username, self.password)
+            smtp.send_message(message)
+
+def transport_from_config(config):
+    name = config['MAIL_TRANSPORT']
+    if name.startswith('file:'):
+        return FileTransport(name[len('file:'):])
+    if name == 'smtp':
+        return SmtpTransport(
+            config['SMTP_HOST'], config['SMTP_PORT'], sender=config['MAIL_FROM'],
+            username=config['SMTP_USERNAME'] or None, password=config['SMTP_PASSWORD'] or None,
+            starttls=config['SMTP_STARTTLS']
+        )
+    if name == 'log':
+        return LogTransport()
+    raise ValueError(f"Unknown MAIL_TRANSPORT {name!r} (expected smtp, file:<path> or log)")
@@ -0,0 +1,120 @@
+# Lost <-> found matching
+# In-memory inverted index of character trigrams over item title/description, one per item type.
+# Documents use log-tf cosine-normalized weights and queries add idf (SMART lnc.ltc), so items
+# can be added and removed one at a time without re-weighting the rest of the index.
+import heapq
+import math
+import re
+import threading
+import time
+from collections import Counter, defaultdict
+
+TITLE_WEIGHT = 2  # title trigrams count twice as much as description trigrams
+MAX_DF_RATIO = 0.5  # skip trigrams that appear in more than half the candidates; they barely move the ranking
+
+def opposite_type(item_type):
+    return 'found' if item_type == 'lost' else 'lost'
+
+def trigrams(text):
+    counts = Counter()
+    for word in re.findall(r'[a-z0-9]+', text.lower()):
+        padded = f"  {word} "
+        for i in range(len(padded) - 2):
+            counts[padded[i:i + 3]] += 1
+    return counts
+
+def item_terms(title, description):
+    counts = trigrams(title or '')
+    for gram in counts:
+        counts[gram] *= TITLE_WEIGHT
+    counts.update(trigrams(description or ''))
+    return counts
+
+def _normalized(counts):
+    weights = {gram: 1 + math.log(count) for gram, count in counts.items()}
+    norm = math.sqrt(sum(weight * weight for weight in weights.values())) or 1.0
+    return {gram: weight / norm for gram, weight in weights.items()}
+
+class MatchIndex:
+    """Thread-safe trigram index of active items, partitioned by type."""
+
+    def __init__(self):
+        self._postings = {'lost': defaultdict(dict), 'found': defaultdict(dict)}  # type -> gram -> {id: weight}
+        self._docs = {}  # id -> (type, {gram: weight})
+        self._counts = Counter()  # type -> number of indexed items
+        self._lock = threading.RLock()
+        self.built_at = None
+
+    def __len__(self):
+        return len(self._docs)
+
+    def add(self, item_id, item_type, title, description):
+        if item_type not in self._postings:
+            return
+        vector = _normalized(item_terms(title, description))
+        with self._lock:
+            self._remove(item_id)
+            postings = self._postings[item_type]
+            for gram, weight in vector.items():
+                postings[gram][item_id] = weight
+            self._docs[item_id] = (item_type, vector)
+            self._counts[item_type] += 1
+
+    def rebuild(self, rows):
+        """Replace the contents with (id, type, title, description) rows; readers keep using the old data until the swap."""
+        fresh = MatchIndex()
+        for item_id, item_type, title, description in rows:
+            fresh.add(item_id, item_type, title, description)
+        with self._lock:
+            self._postings, self._docs, self._counts = fresh._postings, fresh._docs, fresh._counts
+            self.built_at = time.monotonic()
+
+    def remove(self, item_id):
+        with self._lock:
+            self._remove(item_id)
+
+    def clear(self):
+        with self._lock:
+            for postings in self._postings.values():
+                postings.clear()
+            self._docs.clear()
+            self._counts.clear()
+
+    def _remove(self, item_id):
+        doc = self._docs.pop(item_id, None)
+        if doc is None:
+            return
+        item_type, vector = doc
+        self._counts[item_type] -= 1
+        postings = self._postings[item_type]
+        for gram in vector:
+            entries = postings.get(gram)
+            if entries is not None:
+                entries.pop(item_id, None)
+                if not entries:
+                    del postings[gram]
+
+    def match(self, item_type, title, description, k=10, exclude=None):
+        """Top-k (id, score) candidates of the opposite type for the given text, best first."""
+        query = item_terms(title, description)
+        target = opposite_type(item_type)
+        with self._lock:
+            postings = self._postings[target]
+            candidates = self._counts[target]
+            if not candidates:
+                return []
+            weights = {}
+            for gram, count in query.items():
+                entries = postings.get(gram)
+                if not entries or (candidates > 20 and len(entries) > MAX_DF_RATIO * candidates):
+                    continue
+                weights[gram] = (1 + math.log(count)) * math.log(1 + candidates / len(entries))
+            norm = math.sqrt(sum(weight * weight for weight in weights.values())) or 1.0
+
+            scores = defaultdict(float)
+            for gram, weight in weights.items():
+                for doc_id, doc_weight in postings[gram].items():
+                    scores[doc_id] += weight * doc_weight
+        scores.pop(exclude, None)
+        best = heapq.nlargest(k, scores.items(), key=lambda pair: pair[1])
+        return [(doc_id, round(score / norm, 4)) for doc_id, score in best]
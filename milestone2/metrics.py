@@ -0,0 +1,163 @@
+# Per-request performance instrumentation
+# Records per route: latency, SQL statement count/time (SQLAlchemy engine events), JSON serialization
+# time and response size. Emits a Server-Timing header and renders Prometheus text for /api/metrics.
+import bisect
+import threading
+import time
+from collections import defaultdict
+from flask import g, request, has_request_context
+from flask.json.provider import DefaultJSONProvider
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+SIZE_BUCKETS = (256, 1024, 4096, 16384, 65536, 262144, 1048576, 4194304)
+QUERY_COUNT_BUCKETS = (0, 1, 2, 3, 5, 10, 20, 50, 100)
+
+class Histogram:
+    __slots__ = ('buckets', 'counts', 'total', 'count')
+
+    def __init__(self, buckets):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.total = 0.0
+        self.count = 0
+
+    def observe(self, value):
+        self.counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.total += value
+        self.count += 1
+
+class RouteStats:
+    __slots__ = ('latency', 'sql_time', 'sql_count', 'serialize_time', 'size', 'statuses', 'errors')
+
+    def __init__(self):
+        self.latency = Histogram(LATENCY_BUCKETS)
+        self.sql_time = Histogram(LATENCY_BUCKETS)
+        self.sql_count = Histogram(QUERY_COUNT_BUCKETS)
+        self.serialize_time = Histogram(LATENCY_BUCKETS)
+        self.size = Histogram(SIZE_BUCKETS)
+        self.statuses = defaultdict(int)
+        self.errors = defaultdict(int)
+
+class Metrics:
+    def __init__(self):
+        self._routes = defaultdict(RouteStats)  # (method, route) -> RouteStats
+        self._lock = threading.Lock()
+
+    def record(self, method, route, status, latency, sql_count, sql_time, serialize_time, size):
+        with self._lock:
+            stats = self._routes[(method, route)]
+            stats.statuses[status] += 1
+            stats.latency.observe(latency)
+            stats.sql_count.observe(sql_count)
+            stats.sql_time.observe(sql_time)
+            stats.serialize_time.observe(serialize_time)
+            if size is not None:
+                stats.size.observe(size)
+
+    def record_error(self, method, route, exception):
+        with self._lock:
+            self._routes[(method, route)].errors[type(exception).__name__] += 1
+
+    def render_prometheus(self):
+        lines = []
+        with self._lock:
+            routes = sorted(self._routes.items())
+
+            def histogram(name, help_text, attribute):
+                lines.append(f"# HELP {name} {help_text}")
+                lines.append(f"# TYPE {name} histogram")
+                for (method, route), stats in routes:
+                    hist = getattr(stats, attribute)
+                    labels = f'method="{method}",route="{route}"'
+                    running = 0
+                    for bound, bucket_count in zip(hist.buckets, hist.counts):
+                        running += bucket_count
+                        lines.append(f'{name}_bucket{{{labels},le="{bound:g}"}} {running}')
+                    lines.append(f'{name}_bucket{{{labels},le="+Inf"}} {hist.count}')
+                    lines.append(f'{name}_sum{{{labels}}} {hist.total:.6f}')
+                    lines.append(f'{name}_count{{{labels}}} {hist.count}')
+
+            lines.append("# HELP http_requests_total Requests handled, by route and status code")
+            lines.append("# TYPE http_requests_total counter")
+            for (method, route), stats in routes:
+                for status, count in sorted(stats.statuses.items()):
+                    lines.append(f'http_requests_total{{method="{method}",route="{route}",status="{status}"}} {count}')
+
+            lines.append("# HELP http_handler_errors_total Exceptions caught by route handlers, by exception type")
+            lines.append("# TYPE http_handler_errors_total counter")
+            for (method, route), stats in routes:
+                for exception, count in sorted(stats.errors.items()):
+                    lines.append(
+                        f'http_handler_errors_total{{method="{method}",route="{route}",exception="{exception}"}} {count}'
+                    )
+
+            histogram("http_request_duration_seconds", "Request latency", 'latency')
+            histogram("db_statement_duration_seconds", "Total SQL time per request", 'sql_time')
+            histogram("db_statements_per_request", "SQL statements executed per request", 'sql_count')
+            histogram("json_serialization_duration_seconds", "JSON encoding time per request", 'serialize_time')
+            histogram("http_response_size_bytes", "Response body size", 'size')
+        return '\n'.join(lines) + '\n'
+
+class TimedJSONProvider(DefaultJSONProvider):
+    """jsonify() provider that adds its encoding time to the current request's counters."""
+
+    def dumps(self, obj, **kwargs):
+        if not has_request_context():
+            return super().dumps(obj, **kwargs)
+        started = time.perf_counter()
+        try:
+            return super().dumps(obj, **kwargs)
+        finally:
+            g.serialize_time = g.get('serialize_time', 0.0) + time.perf_counter() - started
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    if context is not None:
+        context._metrics_started = time.perf_counter()
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    started = getattr(context, '_metrics_started', None)
+    if started is not None and has_request_context():
+        g.sql_count = g.get('sql_count', 0) + 1
+        g.sql_time = g.get('sql_time', 0.0) + time.perf_counter() - started
+
+def route_label():
+    return request.url_rule.rule if request.url_rule is not None else 'unmatched'
+
+def install_metrics(app, metrics):
+    """Wire the request hooks, JSON timing and SQL event listeners into the app."""
+    app.json_provider_class = TimedJSONProvider
+    app.json = TimedJSONProvider(app)
+
+    if not event.contains(Engine, 'before_cursor_execute', _before_cursor_execute):
+        # Listening on the Engine class covers every engine, including ones created later
+        event.listen(Engine, 'before_cursor_execute', _before_cursor_execute)
+        event.listen(Engine, 'after_cursor_execute', _after_cursor_execute)
+
+    @app.before_request
+    def start_timer():
+        g.request_started = time.perf_counter()
+
+    @app.after_request
+    def record_request(response):
+        started = g.get('request_started')
+        if started is None:
+            return response
+        latency = time.perf_counter() - started
+        sql_count = g.get('sql_count', 0)
+        sql_time = g.get('sql_time', 0.0)
+        serialize_time = g.get('serialize_time', 0.0)
+        size = None if response.is_streamed else response.calculate_content_length()
+
+        metrics.record(request.method, route_label(), response.status_code,
+                       latency, sql_count, sql_time, serialize_time, size)
+
+        app_time = max(latency - sql_time - serialize_time, 0.0)
+        response.headers['Server-Timing'] = (
+            f'db;dur={sql_time * 1000:.2f};desc="{sql_count} queries", '
+            f'serialize;dur={serialize_time * 1000:.2f}, '
+            f'app;dur={app_time * 1000:.2f}, '
+            f'total;dur={latency * 1000:.2f}'
+        )
+        return response
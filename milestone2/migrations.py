@@ -0,0 +1,132 @@
+# Versioned schema migrations
+# Each migration runs once, in version order, and is recorded in schema_migrations. On PostgreSQL indexes are
+# built CONCURRENTLY (outside a transaction, so item writes keep flowing); on SQLite a migration is one transaction.
+from datetime import datetime
+from sqlalchemy import text
+
+class CreateIndex:
+    __slots__ = ('name', 'table', 'columns', 'where')
+
+    def __init__(self, name, table, columns, where=None):
+        self.name = name
+        self.table = table
+        self.columns = columns
+        self.where = where
+
+    def apply(self, conn):
+        concurrently = ''
+        if conn.dialect.name == 'postgresql':
+            concurrently = 'CONCURRENTLY '
+            # A failed concurrent build leaves an invalid index behind that IF NOT EXISTS would skip
+            invalid = conn.execute(text(
+                "SELECT 1 FROM pg_index i JOIN pg_class c ON c.oid = i.indexrelid "
+                "WHERE c.relname = :name AND NOT i.indisvalid"
+            ), {"name": self.name}).first()
+            if invalid:
+                conn.execute(text(f"DROP INDEX CONCURRENTLY IF EXISTS {self.name}"))
+        sql = f"CREATE INDEX {concurrently}IF NOT EXISTS {self.name} ON {self.table} ({self.columns})"
+        if self.where:
+            sql += f" WHERE {self.where}"
+        conn.execute(text(sql))
+
+class FillColumn:
+    __slots__ = ('table', 'column', 'source')
+
+    def __init__(self, table, column, source):
+        self.table = table
+        self.column = column
+        self.source = source
+
+    def apply(self, conn):
+        conn.execute(text(f"UPDATE {self.table} SET {self.column} = {self.source} WHERE {self.column} IS NULL"))
+
+class Migration:
+    __slots__ = ('version', 'name', 'steps')
+
+    def __init__(self, version, name, steps):
+        self.version = version
+        self.name = name
+        self.steps = steps
+
+# Keyset pages order by (timestamp DESC, id DESC), so each index ends in those columns and serves the
+# filter, the ORDER BY and the cursor comparison in one range scan without a sort
+MIGRATIONS = [
+    Migration(1, 'list ordering indexes', [
+        CreateIndex('ix_items_created', 'items', 'created_at DESC, id DESC'),
+        CreateIndex('ix_items_type_created', 'items', 'type, created_at DESC, id DESC'),
+        CreateIndex('ix_reports_submitted', 'reports', 'submitted_at DESC, id DESC'),
+        CreateIndex('ix_reports_type_submitted', 'reports', 'type, submitted_at DESC, id DESC'),
+        CreateIndex('ix_users_created', 'users', 'created_at DESC, id DESC')
+    ]),
+    Migration(2, 'status and city filter indexes', [
+        CreateIndex('ix_items_status_created', 'items', 'status, created_at DESC, id DESC'),
+        CreateIndex('ix_items_city_created', 'items', 'city, created_at DESC, id DESC'),
+        # Most reads are of open items; these stay small as items get resolved
+        CreateIndex('ix_items_active_created', 'items', 'created_at DESC, id DESC', where="status = 'active'"),
+        CreateIndex('ix_items_active_type_created', 'items', 'type, created_at DESC, id DESC', where="status = 'active'")
+    ]),
+    # include_archived reads page the archive in the same order; the mover's batches come from the items indexes
+    Migration(3, 'items archive indexes', [
+        CreateIndex('ix_items_archive_created', 'items_archive', 'created_at DESC, id DESC'),
+        CreateIndex('ix_items_archive_type_created', 'items_archive', 'type, created_at DESC, id DESC')
+    ]),
+    # Workers find the oldest due job and then the rest of its batch; finished rows drop out of both indexes
+    Migration(4, 'job queue indexes', [
+        CreateIndex('ix_jobs_due', 'jobs', 'run_at, id', where="status = 'queued'"),
+        CreateIndex('ix_jobs_batch_due', 'jobs', 'kind, batch_key, run_at, id', where="status = 'queued'"),
+        CreateIndex('ix_jobs_running', 'jobs', 'started_at', where="status = 'running'"),
+        CreateIndex('ix_jobs_finished', 'jobs', 'kind, finished_at', where="status = 'done'")
+    ]),
+    # ?from=&to= ranges and the histogram's GROUP BY read occurred_on straight from these, without the table
+    Migration(5, 'occurred_on indexes', [
+        CreateIndex('ix_items_occurred', 'items', 'occurred_on, id'),
+        CreateIndex('ix_items_type_occurred', 'items', 'type, occurred_on, id'),
+        CreateIndex('ix_items_archive_occurred', 'items_archive', 'occurred_on, id')
+    ]),
+    # Incremental exports resume after an (updated_at, id) cursor; rows from before the column count as
+    # written when they were created
+    Migration(6, 'updated_at export indexes', [
+        FillColumn('items', 'updated_at', 'created_at'),
+        FillColumn('items_archive', 'updated_at', 'coalesce(archived_at, created_at)'),
+        FillColumn('reports', 'updated_at', 'submitted_at'),
+        CreateIndex('ix_items_updated', 'items', 'updated_at, id'),
+        CreateIndex('ix_items_archive_updated', 'items_archive', 'updated_at, id'),
+        CreateIndex('ix_reports_updated', 'reports', 'updated_at, id'),
+        CreateIndex('ix_deletions_table_deleted', 'deletions', 'table_name, deleted_at, row_id')
+    ])
+]
+
+def applied_versions(conn):
+    conn.execute(text(
+        "CREATE TABLE IF NOT EXISTS schema_migrations ("
+        "version INTEGER PRIMARY KEY, name VARCHAR(200) NOT NULL, applied_at TIMESTAMP NOT NULL)"
+    ))
+    return {row[0] for row in conn.execute(text("SELECT version FROM schema_migrations"))}
+
+def migrate(db):
+    """Apply pending migrations in order and return them. Safe to run on every deploy."""
+    engine = db.engine
+    with engine.begin() as conn:
+        applied = applied_versions(conn)
+
+    pending = [migration for migration in sorted(MIGRATIONS, key=lambda m: m.version) if migration.version not in applied]
+    for migration in pending:
+        if engine.dialect.name == 'postgresql':
+            # CREATE INDEX CONCURRENTLY can't run inside a transaction block
+            with engine.connect().execution_options(isolation_level='AUTOCOMMIT') as conn:
+                for step in migration.steps:
+                    step.apply(conn)
+            with engine.begin() as conn:
+                record(conn, migration)
+        else:
+            with engine.begin() as conn:
+                for step in migration.steps:
+                    step.apply(conn)
+                record(conn, migration)
+    return pending
+
+def record(conn, migration):
+    conn.execute(
+        text("INSERT INTO schema_migrations (version, name, applied_at) VALUES (:version, :name, :applied_at)"),
+        {"version": migration.version, "name": migration.name, "applied_at": datetime.utcnow()}
+    )
@@ -0,0 +1,98 @@
+# Keyset (cursor) pagination for list endpoints
+# Each page continues from the sort key of the last row seen, so deep pages cost the same as the first (no OFFSET)
+import base64
+import json
+from datetime import datetime
+from sqlalchemy import tuple_, and_, or_
+
+DEFAULT_LIMIT = 50
+MAX_LIMIT = 200
+
+def parse_limit(value, default=DEFAULT_LIMIT, maximum=MAX_LIMIT):
+    try:
+        limit = int(value) if value is not None else default
+    except ValueError:
+        raise ValueError("limit must be an integer")
+    if limit < 1:
+        raise ValueError("limit must be a positive integer")
+    return min(limit, maximum)
+
+def encode_cursor(values):
+    payload = json.dumps([v.isoformat() if isinstance(v, datetime) else v for v in values], separators=(',', ':'))
+    return base64.urlsafe_b64encode(payload.encode()).decode().rstrip('=')
+
+def decode_cursor(cursor, keys):
+    try:
+        padded = cursor + '=' * (-len(cursor) % 4)
+        values = json.loads(base64.urlsafe_b64decode(padded.encode()))
+    except (ValueError, TypeError):
+        raise ValueError("Invalid cursor")
+    if not isinstance(values, list) or len(values) != len(keys):
+        raise ValueError("Invalid cursor")
+    decoded = []
+    for value, (expression, _) in zip(values, keys):
+        try:
+            python_type = expression.type.python_type
+        except NotImplementedError:
+            python_type = None
+        try:
+            if python_type is datetime:
+                value = datetime.fromisoformat(value)
+            elif python_type in (int, float):
+                value = python_type(value)
+        except (ValueError, TypeError):
+            raise ValueError("Invalid cursor")
+        decoded.append(value)
+    return decoded
+
+def _after(keys, values):
+    # Rows strictly after the cursor position in the page order
+    if all(descending for _, descending in keys) or not any(descending for _, descending in keys):
+        # Row-value comparison, which PostgreSQL can satisfy directly from a composite index
+        columns = tuple_(*[expression for expression, _ in keys])
+        bound = tuple_(*values)
+        return columns < bound if keys[0][1] else columns > bound
+
+    # Mixed directions: (a > x) OR (a = x AND b < y) ...
+    clauses = []
+    for i, (expression, descending) in enumerate(keys):
+        step = expression < values[i] if descending else expression > values[i]
+        equal = [keys[j][0] == values[j] for j in range(i)]
+        clauses.append(and_(*equal, step))
+    return or_(*clauses)
+
+def page_query(query, keys, cursor=None, limit=DEFAULT_LIMIT):
+    """Restrict a Query or select() to one page: rows after the cursor plus the key columns, limit + 1 rows.
+
+    keys is a list of (expression, descending) pairs that ends in a unique column, e.g.
+    [(Item.created_at, True), (Item.id, True)]. Raises ValueError for a malformed cursor.
+    """
+    if cursor:
+        query = query.filter(_after(keys, decode_cursor(cursor, keys)))
+
+    query = query.add_columns(*[expression.label(f'_page_key_{i}') for i, (expression, _) in enumerate(keys)])
+    query = query.order_by(None).order_by(*[
+        expression.desc() if descending else expression.asc() for expression, descending in keys
+    ])
+    return query.limit(limit + 1)
+
+def page_result(rows, keys, limit=DEFAULT_LIMIT):
+    """(rows, next_cursor) from the rows fetched with page_query()."""
+    has_more = len(rows) > limit
+    rows = rows[:limit]
+
+    next_cursor = encode_cursor(list(rows[-1][-len(keys):])) if has_more else None
+    # Strip the key columns again; each result is a tuple of the query's own columns
+    return [row[:-len(keys)] for row in rows], next_cursor
+
+def merge_pages(results, keys, limit=DEFAULT_LIMIT):
+    """Rows for page_result() from several page_query() results that share the same key order."""
+    rows = [row for result in results for row in result]
+    # Stable sorts from the last key to the first give the combined page order
+    for i in reversed(range(len(keys))):
+        rows.sort(key=lambda row: row[i - len(keys)], reverse=keys[i][1])
+    return rows[:limit + 1]
+
+def paginate(query, keys, cursor=None, limit=DEFAULT_LIMIT):
+    """Return (rows, next_cursor) for one page, each row a tuple of the query's columns."""
+    return page_result(page_query(query, keys, cursor, limit).all(), keys, limit)
@@ -0,0 +1,164 @@
+# Connection pool configuration, pool telemetry and per-request statement timeouts
+# - engine_options(): pool size/overflow/timeout/recycle/pre-ping, or NullPool when PgBouncer does the pooling
+# - TimedQueuePool / TimedNullPool record checkout wait times, timeouts and connections in use (/api/pool)
+# - timeouts use SET LOCAL, which ends with the transaction, so no session state leaks through PgBouncer; it is
+#   issued as each connection begins, so ORM sessions, Core connections and engine.begin() blocks all get it
+import functools
+import threading
+import time
+from flask import g, current_app, has_request_context
+from sqlalchemy import event
+from sqlalchemy.exc import OperationalError, TimeoutError as PoolTimeoutError
+from sqlalchemy.engine import Engine
+from sqlalchemy.pool import QueuePool, NullPool
+from metrics import Histogram, LATENCY_BUCKETS
+
+class PoolStats:
+    def __init__(self):
+        self.wait = Histogram(LATENCY_BUCKETS)
+        self.max_wait = 0.0
+        self.timeouts = 0
+        self.checked_out = 0
+        self._lock = threading.Lock()
+
+    def checkout(self, seconds):
+        with self._lock:
+            self.wait.observe(seconds)
+            self.max_wait = max(self.max_wait, seconds)
+            self.checked_out += 1
+
+    def timed_out(self, seconds):
+        with self._lock:
+            self.wait.observe(seconds)
+            self.max_wait = max(self.max_wait, seconds)
+            self.timeouts += 1
+
+    def checkin(self):
+        with self._lock:
+            self.checked_out -= 1
+
+    def to_dict(self):
+        with self._lock:
+            count = self.wait.count
+            # Upper bound of the bucket holding the 95th percentile wait
+            p95, running = None, 0
+            for bound, bucket_count in zip(self.wait.buckets, self.wait.counts):
+                running += bucket_count
+                if count and running >= 0.95 * count:
+                    p95 = bound
+                    break
+            return {
+                "checked_out": self.checked_out,
+                "checkouts": count,
+                "timeouts": self.timeouts,
+                "wait_ms_mean": round(self.wait.total / count * 1000, 3) if count else 0.0,
+                "wait_ms_p95_upper": p95 * 1000 if p95 is not None else None,
+                "wait_ms_max": round(self.max_wait * 1000, 3)
+            }
+
+class TimedPool:
+    """Pool mixin timing each checkout: queueing for a free connection plus any new connect."""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.stats = PoolStats()
+
+    def _do_get(self):
+        started = time.perf_counter()
+        try:
+            connection = super()._do_get()
+        except PoolTimeoutError:
+            self.stats.timed_out(time.perf_counter() - started)
+            raise
+        self.stats.checkout(time.perf_counter() - started)
+        return connection
+
+    def _do_return_conn(self, record):
+        self.stats.checkin()
+        super()._do_return_conn(record)
+
+    def recreate(self):
+        # dispose() swaps in a new pool; keep the counters across it
+        pool = super().recreate()
+        pool.stats = self.stats
+        return pool
+
+class TimedQueuePool(TimedPool, QueuePool):
+    pass
+
+class TimedNullPool(TimedPool, NullPool):
+    pass
+
+def engine_options(config):
+    """SQLALCHEMY_ENGINE_OPTIONS for the configured database; SQLite keeps Flask-SQLAlchemy's defaults."""
+    if config['SQLALCHEMY_DATABASE_URI'].startswith('sqlite'):
+        return {}
+    if config['DB_PGBOUNCER']:
+        # PgBouncer owns the pool; hold a server connection only while it is checked out
+        return {'poolclass': TimedNullPool}
+    return {
+        'poolclass': TimedQueuePool,
+        'pool_size': config['DB_POOL_SIZE'],
+        'max_overflow': config['DB_MAX_OVERFLOW'],
+        'pool_timeout': config['DB_POOL_TIMEOUT'],
+        'pool_recycle': config['DB_POOL_RECYCLE'],
+        'pool_pre_ping': config['DB_POOL_PRE_PING']
+    }
+
+def pool_status(engine):
+    pool = engine.pool
+    status = {"pool": type(pool).__name__}
+    if isinstance(pool, QueuePool):
+        status.update(size=pool.size(), idle=pool.checkedin(), overflow=max(pool.overflow(), 0))
+    stats = getattr(pool, 'stats', None)
+    if stats is not None:
+        status.update(stats.to_dict())
+    return status
+
+def statement_timeout(config_key):
+    """Route decorator: run this request's SQL under the timeout (ms) in app.config[config_key]."""
+    def decorator(view):
+        @functools.wraps(view)
+        def wrapper(*args, **kwargs):
+            g.statement_timeout_ms = current_app.config[config_key]
+            return view(*args, **kwargs)
+        return wrapper
+    return decorator
+
+def current_timeout_ms():
+    if not has_request_context():
+        return None  # CLI commands and background work run unbounded
+    timeout = g.get('statement_timeout_ms')
+    return timeout if timeout is not None else current_app.config.get('DB_STATEMENT_TIMEOUT_MS')
+
+def _set_local_timeout(connection):
+    timeout = current_timeout_ms()
+    if not timeout or connection.dialect.name != 'postgresql':
+        return
+    # SET LOCAL does nothing outside a transaction block; autocommit writes open one for it (see writes.py)
+    if connection.get_execution_options().get('isolation_level') != 'AUTOCOMMIT':
+        connection.exec_driver_sql(f"SET LOCAL statement_timeout = {int(timeout)}")
+
+def _sqlite_deadline(conn, cursor, statement, parameters, context, executemany):
+    # SQLite has no statement_timeout; a progress handler aborts the statement with "interrupted".
+    # Set (or cleared) before every statement so a stale deadline never outlives its request.
+    if conn.dialect.name != 'sqlite' or conn.dialect.is_async:
+        return
+    timeout = current_timeout_ms()
+    raw = conn.connection.driver_connection
+    if timeout:
+        deadline = time.perf_counter() + timeout / 1000
+        raw.set_progress_handler(lambda: time.perf_counter() > deadline, 1000)
+    else:
+        raw.set_progress_handler(None, 0)
+
+def install_statement_timeouts():
+    if not event.contains(Engine, 'begin', _set_local_timeout):
+        event.listen(Engine, 'begin', _set_local_timeout)
+        event.listen(Engine, 'before_cursor_execute', _sqlite_deadline)
+
+def is_statement_timeout(exc):
+    if not isinstance(exc, OperationalError):
+        return False
+    # 57014 is query_canceled, raised by statement_timeout
+    return getattr(exc.orig, 'pgcode', None) == '57014' or 'interrupted' in str(exc.orig)
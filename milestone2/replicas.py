@@ -0,0 +1,137 @@
+# Read-replica routing for the GET handlers
+# DATABASE_REPLICA_URLS lists the replicas; each becomes a Flask-SQLAlchemy bind (replica_1, replica_2, ...).
+# Views marked @replica_read run their queries on the next healthy replica, round-robin. A background thread
+# pings every replica (and checks replay lag on PostgreSQL) so picking one never waits on the network, and
+# an unreachable or lagging replica drops out until it passes again; with none healthy, reads use the primary.
+# A client that just wrote gets a short-lived cookie and reads from the primary until it expires.
+import functools
+import itertools
+import logging
+import os
+import threading
+import time
+from flask import g, request, current_app, has_app_context
+from flask_sqlalchemy.session import Session
+
+STICKY_COOKIE = 'db_read_primary'
+WRITE_METHODS = ('POST', 'PUT', 'PATCH', 'DELETE')
+
+# Caught-up replicas report no lag even when the primary has been idle (replay timestamp is then old)
+POSTGRES_LAG_SQL = (
+    "SELECT CASE WHEN pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() THEN 0 "
+    "ELSE COALESCE(EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp()), 0) END"
+)
+
+logger = logging.getLogger('replicas')
+
+def replica_binds(urls):
+    return {f'replica_{n}': url for n, url in enumerate(urls, start=1)}
+
+def parse_urls(raw):
+    return [url.strip() for url in raw.split(',') if url.strip()]
+
+class ReplicaRouter:
+    def __init__(self, engines, check_interval=5, max_lag_seconds=10):
+        self.engines = engines  # bind key -> Engine
+        self.check_interval = check_interval
+        self.max_lag_seconds = max_lag_seconds
+        # Nothing is used until its first check passes
+        self.health = {key: {"healthy": False, "lag_seconds": None, "error": None, "checked_at": None} for key in engines}
+        self.reads = {key: 0 for key in engines}
+        self.primary_reads = 0
+        self._counter = itertools.count()
+        self._lock = threading.Lock()
+        self._thread = None
+        self._pid = None
+
+    def choose(self):
+        """Bind key of the next healthy replica, or None for the primary."""
+        self._ensure_started()
+        healthy = [key for key in self.engines if self.health[key]["healthy"]]
+        if not healthy:
+            self.primary_reads += 1
+            return None
+        key = healthy[next(self._counter) % len(healthy)]
+        self.reads[key] += 1
+        return key
+
+    def check(self, key):
+        engine = self.engines[key]
+        try:
+            with engine.connect() as conn:
+                lag = 0.0
+                if conn.dialect.name == 'postgresql':
+                    lag = float(conn.exec_driver_sql(POSTGRES_LAG_SQL).scalar() or 0)
+                else:
+                    conn.exec_driver_sql("SELECT 1")
+            healthy = lag <= self.max_lag_seconds
+            error = None if healthy else "replication lag"
+        except Exception as e:
+            lag, healthy, error = None, False, type(e).__name__
+        if healthy != self.health[key]["healthy"]:
+            logger.warning("Replica %s is %s%s", key, 'healthy' if healthy else 'unhealthy', f" ({error})" if error else '')
+        self.health[key] = {"healthy": healthy, "lag_seconds": lag, "error": error, "checked_at": time.time()}
+
+    def check_all(self):
+        for key in self.engines:
+            self.check(key)
+
+    def _ensure_started(self):
+        # One checker per process, started again in forked workers
+        if self._thread is not None and self._pid == os.getpid():
+            return
+        with self._lock:
+            if self._thread is None or self._pid != os.getpid():
+                self._pid = os.getpid()
+                self._thread = threading.Thread(target=self._run, name='replica-health', daemon=True)
+                self._thread.start()
+
+    def _run(self):
+        while True:
+            self.check_all()
+            time.sleep(self.check_interval)
+
+    def status(self):
+        return {
+            "replicas": {key: {**self.health[key], "reads": self.reads[key]} for key in self.engines},
+            "primary_reads": self.primary_reads
+        }
+
+class RoutingSession(Session):
+    """Session that sends every query to the replica picked for the current request, if any."""
+
+    def get_bind(self, mapper=None, clause=None, bind=None, **kwargs):
+        if bind is None and has_app_context():
+            key = g.get('read_bind')
+            if key is not None:
+                return self._db.engines[key]
+        return super().get_bind(mapper=mapper, clause=clause, bind=bind, **kwargs)
+
+def sticky(cookies):
+    """True while the client sending these cookies is inside its read-your-writes window."""
+    try:
+        return float(cookies.get(STICKY_COOKIE, 0)) > time.time()
+    except ValueError:
+        return False
+
+def replica_read(view):
+    """Run a read-only view on a replica, unless the client wrote recently or no replica is healthy."""
+    @functools.wraps(view)
+    def wrapper(*args, **kwargs):
+        router = current_app.extensions.get('replicas')
+        if router is not None and not sticky(request.cookies):
+            g.read_bind = router.choose()
+        return view(*args, **kwargs)
+    return wrapper
+
+def read_engine(db):
+    """Engine for Core reads in a @replica_read view."""
+    key = g.get('read_bind')
+    return db.engines[key] if key is not None else db.engine
+
+def stick_to_primary(response, seconds):
+    """Start (or extend) the read-your-writes window after a successful write."""
+    if request.method in WRITE_METHODS and response.status_code < 400 and seconds > 0:
+        response.set_cookie(STICKY_COOKIE, f"{time.time() + seconds:.3f}", max_age=int(seconds) + 1,
+                            httponly=True, samesite='Lax')
+    return response
@@ -0,0 +1,60 @@
+# Schema upkeep for databases created before newer model columns/indexes existed
+# db.create_all() only creates missing tables, so new columns and indexes are added here
+from sqlalchemy import MetaData, inspect, select, func, text
+from sqlalchemy.schema import CreateTable
+
+def add_missing_columns(db):
+    """ALTER TABLE ... ADD COLUMN for model columns the live tables lack, then create missing indexes."""
+    engine = db.engine
+    inspector = inspect(engine)
+    added = []
+    with engine.begin() as conn:
+        for table in db.metadata.sorted_tables:
+            if not inspector.has_table(table.name):
+                continue
+            existing = {column['name'] for column in inspector.get_columns(table.name)}
+            for column in table.columns:
+                if column.name in existing:
+                    continue
+                column_type = column.type.compile(dialect=engine.dialect)
+                conn.execute(text(f'ALTER TABLE {table.name} ADD COLUMN {column.name} {column_type}'))
+                added.append(f"{table.name}.{column.name}")
+        for table in db.metadata.sorted_tables:
+            for index in table.indexes:
+                index.create(conn, checkfirst=True)
+    return added
+
+def ensure_sqlite_autoincrement(db, table, id_tables=()):
+    """Rebuild a SQLite table created without AUTOINCREMENT (the model asks for it); returns True if rebuilt.
+
+    Without it SQLite hands out max(id) + 1, reusing the id of a newest row that was deleted or archived.
+    Follows SQLite's copy, drop, rename procedure, re-creating the table's indexes and triggers (search
+    and stats) from sqlite_master, and starts the sequence above every id in id_tables as well.
+    """
+    engine = db.engine
+    if engine.dialect.name != 'sqlite' or not table.dialect_options['sqlite']['autoincrement']:
+        return False
+    with engine.begin() as conn:
+        sql = conn.execute(text("SELECT sql FROM sqlite_master WHERE type = 'table' AND name = :name"),
+                           {"name": table.name}).scalar()
+        if sql is None or 'AUTOINCREMENT' in sql.upper():
+            return False
+        dependents = conn.execute(text(
+            "SELECT sql FROM sqlite_master WHERE tbl_name = :name AND type IN ('index', 'trigger') AND sql IS NOT NULL"
+        ), {"name": table.name}).scalars().all()
+        rebuilt = table.to_metadata(MetaData(), name=f"{table.name}_rebuild")
+        existing = {column['name'] for column in inspect(conn).get_columns(table.name)}
+        columns = ', '.join(column.name for column in table.columns if column.name in existing)
+        conn.execute(CreateTable(rebuilt))
+        conn.execute(text(f"INSERT INTO {rebuilt.name} ({columns}) SELECT {columns} FROM {table.name}"))
+        conn.execute(text(f"DROP TABLE {table.name}"))
+        conn.execute(text(f"ALTER TABLE {rebuilt.name} RENAME TO {table.name}"))
+        for statement in dependents:
+            conn.execute(text(statement))
+        floor = max([conn.execute(select(func.max(other.c.id))).scalar() or 0 for other in id_tables] or [0])
+        conn.execute(text("UPDATE sqlite_sequence SET seq = max(seq, :floor) WHERE name = :name"),
+                     {"floor": floor, "name": table.name})
+        conn.execute(text("INSERT INTO sqlite_sequence (name, seq) SELECT :name, :floor "
+                          "WHERE NOT EXISTS (SELECT 1 FROM sqlite_sequence WHERE name = :name)"),
+                     {"floor": floor, "name": table.name})
+    return True
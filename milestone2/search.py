@@ -0,0 +1,98 @@
+# Full-text search for the items table
+# PostgreSQL: weighted tsvector column (title > description > location) with a GIN index
+# SQLite (local testing): FTS5 shadow table kept in sync with triggers
+import re
+from sqlalchemy import text, func, literal, literal_column, table, column, cast, Double
+
+# Lightweight handle on the FTS5 table (not part of the model metadata, so create_all skips it)
+ITEMS_FTS = table('items_fts', column('rowid'), column('rank'))
+
+POSTGRES_DDL = [
+    """
+    ALTER TABLE items ADD COLUMN IF NOT EXISTS search_vector tsvector
+    GENERATED ALWAYS AS (
+        setweight(to_tsvector('english', coalesce(title, '')), 'A') ||
+        setweight(to_tsvector('english', coalesce(description, '')), 'B') ||
+        setweight(to_tsvector('english', coalesce(location, '')), 'C')
+    ) STORED
+    """,
+    "CREATE INDEX IF NOT EXISTS ix_items_search_vector ON items USING GIN (search_vector)",
+]
+
+SQLITE_DDL = [
+    """
+    CREATE VIRTUAL TABLE items_fts USING fts5(
+        title, description, location,
+        content='items', content_rowid='id', tokenize='porter unicode61'
+    )
+    """,
+    """
+    CREATE TRIGGER items_fts_insert AFTER INSERT ON items BEGIN
+        INSERT INTO items_fts(rowid, title, description, location)
+        VALUES (new.id, new.title, new.description, new.location);
+    END
+    """,
+    """
+    CREATE TRIGGER items_fts_delete AFTER DELETE ON items BEGIN
+        INSERT INTO items_fts(items_fts, rowid, title, description, location)
+        VALUES ('delete', old.id, old.title, old.description, old.location);
+    END
+    """,
+    """
+    CREATE TRIGGER items_fts_update AFTER UPDATE OF title, description, location ON items BEGIN
+        INSERT INTO items_fts(items_fts, rowid, title, description, location)
+        VALUES ('delete', old.id, old.title, old.description, old.location);
+        INSERT INTO items_fts(rowid, title, description, location)
+        VALUES (new.id, new.title, new.description, new.location);
+    END
+    """,
+    # Relevance weights for title, description and location
+    "INSERT INTO items_fts(items_fts, rank) VALUES ('rank', 'bm25(10.0, 4.0, 2.0)')",
+    # Index any rows that existed before the shadow table was created
+    "INSERT INTO items_fts(items_fts) VALUES ('rebuild')",
+]
+
+def install_search(db):
+    """Create the search column/index (PostgreSQL) or FTS5 table and triggers (SQLite). Safe to run on every start."""
+    dialect = db.engine.dialect.name
+    with db.engine.begin() as conn:
+        if dialect == 'postgresql':
+            for statement in POSTGRES_DDL:
+                conn.execute(text(statement))
+        elif dialect == 'sqlite':
+            exists = conn.execute(text(
+                "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'items_fts'"
+            )).first()
+            if not exists:
+                for statement in SQLITE_DDL:
+                    conn.execute(text(statement))
+
+def search_terms(raw):
+    # Keep word characters only so user input can never inject tsquery/FTS5 operators
+    return re.findall(r'\w+', raw.lower())
+
+def apply_search(dialect, query, model, terms):
+    """Filter an Item Query or select() to rows matching every term (prefix match) on the named dialect.
+
+    Returns (query, rank) where rank is an expression that sorts the best matches first in ascending order.
+    """
+    if dialect == 'postgresql':
+        tsquery = func.to_tsquery('english', ' & '.join(f"{term}:*" for term in terms))
+        vector = literal_column('items.search_vector')
+        # Negated and widened to double precision so the value round-trips exactly through a cursor
+        rank = -cast(func.ts_rank_cd(vector, tsquery), Double)
+        return query.filter(vector.op('@@')(tsquery)), rank
+
+    if dialect == 'sqlite':
+        match = ' '.join(f'"{term}"*' for term in terms)
+        query = query.join(ITEMS_FTS, ITEMS_FTS.c.rowid == model.id) \
+            .filter(text("items_fts MATCH :match").bindparams(match=match))
+        return query, cast(ITEMS_FTS.c.rank, Double)
+
+    # Other databases: portable case-insensitive substring match, unranked
+    for term in terms:
+        pattern = f"%{term}%"
+        query = query.filter(
+            model.title.ilike(pattern) | model.description.ilike(pattern) | model.location.ilike(pattern)
+        )
+    return query, literal(0.0)
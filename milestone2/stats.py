@@ -0,0 +1,131 @@
+# Item counters for /api/stats
+# item_stats holds one row per (type, status) and is kept current by database triggers,
+# so reading the stats never scans the items table
+from sqlalchemy import text
+
+POSTGRES_DDL = [
+    """
+    CREATE OR REPLACE FUNCTION item_stats_apply() RETURNS trigger AS $$
+    BEGIN
+        IF TG_OP = 'UPDATE' AND OLD.type IS NOT DISTINCT FROM NEW.type
+                AND OLD.status IS NOT DISTINCT FROM NEW.status THEN
+            RETURN NULL;
+        END IF;
+        IF TG_OP IN ('UPDATE', 'DELETE') THEN
+            UPDATE item_stats SET item_count = item_count - 1
+            WHERE type = OLD.type AND status = coalesce(OLD.status, 'active');
+        END IF;
+        IF TG_OP IN ('INSERT', 'UPDATE') THEN
+            INSERT INTO item_stats (type, status, item_count)
+            VALUES (NEW.type, coalesce(NEW.status, 'active'), 1)
+            ON CONFLICT (type, status) DO UPDATE SET item_count = item_stats.item_count + 1;
+        END IF;
+        RETURN NULL;
+    END
+    $$ LANGUAGE plpgsql
+    """,
+    "DROP TRIGGER IF EXISTS item_stats_trigger ON items",
+    """
+    CREATE TRIGGER item_stats_trigger
+    AFTER INSERT OR DELETE OR UPDATE OF type, status ON items
+    FOR EACH ROW EXECUTE FUNCTION item_stats_apply()
+    """,
+]
+
+SQLITE_DDL = [
+    """
+    CREATE TRIGGER IF NOT EXISTS item_stats_insert AFTER INSERT ON items BEGIN
+        INSERT INTO item_stats (type, status, item_count)
+        VALUES (new.type, coalesce(new.status, 'active'), 1)
+        ON CONFLICT (type, status) DO UPDATE SET item_count = item_count + 1;
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS item_stats_delete AFTER DELETE ON items BEGIN
+        UPDATE item_stats SET item_count = item_count - 1
+        WHERE type = old.type AND status = coalesce(old.status, 'active');
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS item_stats_update AFTER UPDATE OF type, status ON items
+    WHEN old.type IS NOT new.type OR old.status IS NOT new.status BEGIN
+        UPDATE item_stats SET item_count = item_count - 1
+        WHERE type = old.type AND status = coalesce(old.status, 'active');
+        INSERT INTO item_stats (type, status, item_count)
+        VALUES (new.type, coalesce(new.status, 'active'), 1)
+        ON CONFLICT (type, status) DO UPDATE SET item_count = item_count + 1;
+    END
+    """,
+]
+
+# Single grouped pass over items, used as the fallback and as the source of truth for reconciliation
+AGGREGATE_SQL = "SELECT type, coalesce(status, 'active'), COUNT(*) FROM items GROUP BY type, coalesce(status, 'active')"
+
+COUNTER_DIALECTS = ('postgresql', 'sqlite')
+
+def counters_supported(db):
+    return db.engine.dialect.name in COUNTER_DIALECTS
+
+def install_stats(db):
+    """Create the counter triggers and fill item_stats the first time. Safe to run on every start."""
+    if not counters_supported(db):
+        return
+    statements = POSTGRES_DDL if db.engine.dialect.name == 'postgresql' else SQLITE_DDL
+    with db.engine.begin() as conn:
+        for statement in statements:
+            conn.execute(text(statement))
+    with db.engine.connect() as conn:
+        empty = conn.execute(text("SELECT 1 FROM item_stats LIMIT 1")).first() is None
+    if empty:
+        reconcile_stats(db)
+
+def aggregate_counts(conn):
+    return {(row[0], row[1]): row[2] for row in conn.execute(text(AGGREGATE_SQL))}
+
+def stored_counts(conn):
+    return {(row[0], row[1]): row[2] for row in conn.execute(text("SELECT type, status, item_count FROM item_stats"))}
+
+def counts_from(conn):
+    """O(1) read from item_stats when the triggers are installed, one grouped query otherwise."""
+    if conn.dialect.name in COUNTER_DIALECTS:
+        return stored_counts(conn)
+    return aggregate_counts(conn)
+
+def read_counts(db):
+    with db.engine.connect() as conn:
+        return counts_from(conn)
+
+def reconcile_stats(db):
+    """Recompute item_stats from items and return the drift found as {(type, status): (stored, actual)}."""
+    with db.engine.begin() as conn:
+        if db.engine.dialect.name == 'postgresql':
+            # Hold off concurrent item writes so no trigger update lands between the count and the rewrite
+            conn.execute(text("LOCK TABLE items IN SHARE MODE"))
+        actual = aggregate_counts(conn)
+        stored = stored_counts(conn)
+        drift = {
+            key: (stored.get(key, 0), actual.get(key, 0))
+            for key in set(actual) | set(stored)
+            if stored.get(key, 0) != actual.get(key, 0)
+        }
+        conn.execute(text("DELETE FROM item_stats"))
+        for (item_type, status), count in actual.items():
+            conn.execute(
+                text("INSERT INTO item_stats (type, status, item_count) VALUES (:type, :status, :count)"),
+                {"type": item_type, "status": status, "count": count}
+            )
+    return drift
+
+def summarize(counts):
+    def total(item_type=None, status=None):
+        return sum(
+            count for (row_type, row_status), count in counts.items()
+            if (item_type is None or row_type == item_type) and (status is None or row_status == status)
+        )
+    return {
+        "total_items": total(),
+        "lost_items": total(item_type='lost'),
+        "found_items": total(item_type='found'),
+        "active_items": total(status='active'),
+        "resolved_items": total(status='resolved'),
+    }
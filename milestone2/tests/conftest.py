@@ -0,0 +1,7 @@
+# Tests import the app modules and benchmark helpers the way the CLIs do, from milestone2/
+import os
+import sys
+
+APP_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')
+if APP_DIR not in sys.path:
+    sys.path.insert(0, APP_DIR)
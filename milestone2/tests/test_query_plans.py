@@ -0,0 +1,29 @@
+# Query-plan regression tests: EXPLAIN the SQL behind each hot endpoint on a freshly seeded SQLite database
+# Run from milestone2/: python -m pytest tests
+# Seeds its own database through benchmarks.seed (schema, migrations, synthetic rows, ANALYZE) and fails when a
+# hot query's plan scans a whole items/reports/users table or sorts where an index should give the order.
+import pytest
+
+from benchmarks.common import load_app
+from benchmarks.plan_check import HOT_QUERIES, check_plans
+from benchmarks.seed import seed
+from benchmarks.synthetic import new_rng
+
+# Enough rows that the planner prefers the indexes, as it does at production sizes
+USERS, ITEMS, REPORTS = 2000, 20000, 2000
+
+@pytest.fixture(scope='module')
+def plans(tmp_path_factory):
+    database = tmp_path_factory.mktemp('plans') / 'plans.db'
+    app_module, app = load_app(f"sqlite:///{database}", CACHE_MAX_ENTRIES=0, MATCH_NOTIFY=False)
+    with app.app_context():
+        seed(app_module, new_rng(498), USERS, ITEMS, REPORTS)
+        results = {label: (path, problems, lines) for label, path, problems, lines in check_plans(app_module, app)}
+        app_module.db.engine.dispose()
+    return results
+
+@pytest.mark.parametrize('label', [label for label, _, _ in HOT_QUERIES])
+def test_hot_query_uses_indexes(plans, label):
+    path, problems, lines = plans[label]
+    details = '\n'.join(line for statement in lines for line in statement)
+    assert not problems, f"{path}: {', '.join(problems)}\n{details}"
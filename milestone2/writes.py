@@ -0,0 +1,40 @@
+# Single-round-trip write paths
+# Each write is one INSERT/UPDATE/DELETE ... RETURNING statement on an autocommit connection: no SELECT
+# before it, no separate BEGIN/COMMIT round trips, and uniqueness comes from the table's constraints
+# instead of a check-then-insert that two concurrent requests can both pass.
+# On PostgreSQL a request's statement timeout needs a transaction for its SET LOCAL, so there the statement
+# runs in BEGIN ... COMMIT instead.
+import re
+from sqlalchemy import insert, update, delete
+from pooling import current_timeout_ms
+
+def execute_returning(engine, statement):
+    """Run one write statement, committed on its own; returns the first RETURNING row or None."""
+    if engine.dialect.name == 'postgresql' and current_timeout_ms():
+        with engine.begin() as conn:
+            return conn.execute(statement).first()
+    with engine.connect().execution_options(isolation_level='AUTOCOMMIT') as conn:
+        return conn.execute(statement).first()
+
+def insert_row(engine, table, values, returning):
+    return execute_returning(engine, insert(table).values(**values).returning(*returning))
+
+def update_row(engine, table, row_id, changes, returning):
+    """None when no row has that id."""
+    return execute_returning(engine, update(table).where(table.c.id == row_id).values(**changes).returning(*returning))
+
+def delete_row(engine, table, row_id, returning):
+    """None when no row has that id."""
+    return execute_returning(engine, delete(table).where(table.c.id == row_id).returning(*returning))
+
+def unique_violation(error):
+    """Column named by a unique-constraint IntegrityError, or None for other integrity errors."""
+    orig = error.orig
+    # PostgreSQL (23505 unique_violation): 'Key (username)=(jiani) already exists.'
+    detail = getattr(getattr(orig, 'diag', None), 'message_detail', None)
+    if getattr(orig, 'pgcode', None) == '23505' and detail:
+        match = re.match(r'Key \((\w+)\)=', detail)
+        return match.group(1) if match else None
+    # SQLite: 'UNIQUE constraint failed: users.username'
+    match = re.search(r'UNIQUE constraint failed: \w+\.(\w+)', str(orig))
+    return match.group(1) if match else None
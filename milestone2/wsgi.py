@@ -0,0 +1,18 @@
+# WSGI entry point for production servers
+# Usage (from milestone2/): gunicorn --preload -w 4 -b 0.0.0.0:5001 wsgi:app
+# With --preload the app is built once in the master and forked into each worker; create_app()
+# opens no connections, and each worker drops inherited pool connections after the fork.
+import importlib.util
+import os
+import sys
+
+APP_DIR = os.path.dirname(os.path.abspath(__file__))
+if APP_DIR not in sys.path:
+    sys.path.insert(0, APP_DIR)
+
+# 'Lab 5 app.py' is not importable by name because of the spaces
+_spec = importlib.util.spec_from_file_location('lab5_app', os.path.join(APP_DIR, 'Lab 5 app.py'))
+lab5_app = importlib.util.module_from_spec(_spec)
+_spec.loader.exec_module(lab5_app)
+
+app = lab5_app.create_app()